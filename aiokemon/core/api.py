@@ -1,5 +1,5 @@
 import keyword
-from typing import Any, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Union
 
 import aiokemon.core.common as cmn
 
@@ -26,17 +26,117 @@ def sanitize_attribute(attr: str) -> str:
     return attr
 
 
+class InternPool:
+    """Flyweight pool shared by everything one client builds. Nearly every
+    resource repeats the same `{name, url}` references (the `en` language,
+    the `red` version, ...), so identical references are built once and the
+    same immutable object is handed out everywhere, meaning references can
+    be compared with `is`. Attribute names and reference strings are
+    interned as well.
+    """
+
+    def __init__(self) -> None:
+        self._strings = {}
+        self._references = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._references)
+
+    def string(self, s: str) -> str:
+        return self._strings.setdefault(s, s)
+
+    def reference(self, data: dict, factory: Callable[[dict, str], Any],
+                  key: str) -> Any:
+        """Returns the shared object for a reference, building it with
+        `factory(data, key)` the first time it's seen. References are shared
+        per key, since the object keeps its key (i.e. for `str()`).
+        """
+        ref_key = (factory, key, data['name'], data['url'])
+        obj = self._references.get(ref_key)
+        if obj is not None:
+            self.hits += 1
+            return obj
+        self.misses += 1
+        data = {'name': self.string(data['name']),
+                'url': self.string(data['url'])}
+        obj = self._references[ref_key] = factory(data, key)
+        return obj
+
+    def clear(self) -> None:
+        self._strings.clear()
+        self._references.clear()
+
+
+def is_reference(data: dict) -> bool:
+    """Whether a dict is a plain `{name, url}` reference."""
+    return len(data) == 2 and 'name' in data and 'url' in data
+
+
 class PokeAPIBase:
-    """Base class containing mostly convenience functions."""
+    """Base class containing mostly convenience functions.
 
-    def _safe_update(self, data: dict) -> None:
+    In lazy mode, the raw data dict is kept as-is and attributes are only
+    sanitized and wrapped the first time they are accessed. The wrapped value
+    is then stored on the instance, so later accesses are plain attribute
+    lookups.
+    """
+
+    _lazy = False
+
+    def _safe_update(self, data: dict, pool: Optional[InternPool] = None
+                     ) -> None:
         """Sanitizes all data keys so that they are valid Python
         identifiers and converts all sub-dicts into APIMetaData and all
         sub-lists into APIMetaData lists.
         """
+        if self._lazy:
+            raw = self.__dict__.get('_raw')
+            self.__dict__['_raw'] = data if raw is None else {**raw, **data}
+            self.__dict__.pop('_raw_keys', None)
+            return
         for k, v in data.items():
             k = sanitize_attribute(k)
-            self.__dict__[k] = new_pokeapimetadata(k, v)
+            if pool is not None:
+                k = pool.string(k)
+            self.__dict__[k] = new_pokeapimetadata(k, v, pool=pool)
+
+    def _get_raw_keys(self) -> Dict[str, str]:
+        """Maps sanitized attribute names to the raw data keys. Only built
+        when an attribute isn't already a raw key (i.e. it had hyphens).
+        """
+        raw_keys = self.__dict__.get('_raw_keys')
+        if raw_keys is None:
+            raw_keys = {sanitize_attribute(k): k for k in self._raw}
+            self.__dict__['_raw_keys'] = raw_keys
+        return raw_keys
+
+    def __getattr__(self, attr: str) -> Any:
+        """Only called when normal attribute lookup fails, which in lazy mode
+        means the attribute hasn't been materialized yet.
+        """
+        raw = self.__dict__.get('_raw')
+        if raw is not None and not attr.startswith('__'):
+            if attr in raw and not keyword.iskeyword(attr):
+                key = attr
+            else:
+                key = self._get_raw_keys().get(attr)
+            if key is not None:
+                value = new_pokeapimetadata(
+                    attr, raw[key], True, self.__dict__.get('_pool')
+                )
+                self.__dict__[attr] = value
+                return value
+        raise AttributeError(
+            f"'{type(self).__name__}' object has no attribute '{attr}'"
+        )
+
+    def __dir__(self) -> List[str]:
+        attrs = set(super().__dir__())
+        if '_raw' in self.__dict__:
+            attrs.update(self._get_raw_keys())
+        return sorted(attrs)
 
     @property
     def pokeapi_attrs(self) -> List[str]:
@@ -64,16 +164,22 @@ class PokeAPIResource(PokeAPIBase):
     ```
     """
 
-    def __init__(self, endpoint: str, data: dict, custom: Optional[dict] = None) -> None:
+    def __init__(self, endpoint: str, data: dict, custom: Optional[dict] = None,
+                 lazy: bool = False, pool: Optional[InternPool] = None
+                 ) -> None:
         """Creates an un-loaded APIResource class. Attributes and such can
         only be guaranteed once the async function _load is awaited.
         """
-        self._safe_update(data)
+        if lazy:
+            self._lazy = True
+            if pool is not None:
+                self._pool = pool
+        self._safe_update(data, pool)
         self._endpoint = endpoint
         self.name = data.get('name')
         self.id = data.get('id')
         if custom is not None:
-            self._safe_update(custom)
+            self._safe_update(custom, pool)
 
     def __str__(self) -> str:
         return self.name
@@ -85,9 +191,14 @@ class PokeAPIResource(PokeAPIBase):
 class PokeAPIMetaData(PokeAPIBase):
     """Simple class used for sub-dicts and -lists in a response JSON."""
 
-    def __init__(self, key: str, data: dict) -> None:
+    def __init__(self, key: str, data: dict, lazy: bool = False,
+                 pool: Optional[InternPool] = None) -> None:
         self._key = key
-        self._safe_update(data)
+        if lazy:
+            self._lazy = True
+            if pool is not None:
+                self._pool = pool
+        self._safe_update(data, pool)
 
     @property
     def is_resource(self) -> bool:
@@ -105,8 +216,10 @@ class PokeAPIMetaData(PokeAPIBase):
         if self.is_resource:
             url = getattr(self, 'url')
             json_data = await session.get_json(url)
-            endpoint, _ = cmn.break_url(url)
-            return PokeAPIResource(endpoint, json_data)
+            endpoint, _ = cmn.break_url(
+                url, getattr(session, '_base_url', cmn.BASE_URL)
+            )
+            return PokeAPIResource(endpoint, json_data, lazy=self._lazy)
         elif raise_error:
             raise AttributeError(
                 f'object {repr(self)} has no attribute "url" and thus cannot '
@@ -122,13 +235,43 @@ class PokeAPIMetaData(PokeAPIBase):
         return f'<APIMetaData object for key "{self._key}">'
 
 
-def new_pokeapimetadata(key: str, obj: Any) -> Any:
+class PokeAPIReference(PokeAPIMetaData):
+    """A `{name, url}` reference handed out by an InternPool. The same object
+    is shared by every resource the reference appears in, so it can't be
+    modified.
+    """
+
+    def __setattr__(self, attr: str, value: Any) -> None:
+        raise AttributeError(
+            f'{type(self).__name__} objects are shared and immutable.'
+        )
+
+    def __delattr__(self, attr: str) -> None:
+        raise AttributeError(
+            f'{type(self).__name__} objects are shared and immutable.'
+        )
+
+
+def new_pokeapireference(data: dict, key: str) -> PokeAPIReference:
+    reference = object.__new__(PokeAPIReference)
+    reference.__dict__.update(_key=key, name=data['name'], url=data['url'])
+    return reference
+
+
+def new_pokeapimetadata(key: str, obj: Any, lazy: bool = False,
+                        pool: Optional[InternPool] = None) -> Any:
     """Turns a dict or list of dicts into an APIMetaData object or a list of
-    APIMetaData objects and does nothing otherwise.
+    APIMetaData objects and does nothing otherwise. With a pool, `{name, url}`
+    references are shared PokeAPIReference objects.
     """
     if isinstance(obj, dict):
-        return PokeAPIMetaData(key, obj)
+        if pool is not None and is_reference(obj):
+            return pool.reference(obj, new_pokeapireference, key)
+        return PokeAPIMetaData(key, obj, lazy, pool)
     elif isinstance(obj, list) and all(isinstance(item, dict) for item in obj):
-        return [PokeAPIMetaData(key, item) for item in obj]
+        if pool is not None:
+            return [new_pokeapimetadata(key, item, lazy, pool)
+                    for item in obj]
+        return [PokeAPIMetaData(key, item, lazy) for item in obj]
     else:
         return obj
@@ -1,19 +1,33 @@
 import asyncio
 import json
+from pathlib import Path
 from types import TracebackType
 from typing import Any, Awaitable, Dict, Iterable, List, Optional, Type, Union
 
-from aiohttp import ClientSession
+from aiohttp import ClientResponseError, ClientSession
 
 import aiokemon.core.common as cmn
-from aiokemon.core.cache import cache_get, EmptyCache, PickleFileCache
-from aiokemon.core.matcher import ResourceMatcher
+from aiokemon.core.api import InternPool
+from aiokemon.core.cache import (BoundedLRU, cache_get, EmptyCache,
+                                 PickleFileCache)
+from aiokemon.core.fulltext import TEXT_ENDPOINTS, TextHit, TextIndex
+from aiokemon.core.localization import LocalizedMatch, LocalizedNameIndex
+from aiokemon.core.matcher import (RESOLVED_FILE_NAME, ResourceMatcher,
+                                   SearchHit, Suggestion)
+from aiokemon.core.metrics import ClientMetrics
+from aiokemon.core.tracing import make_tracer
 
 try:
     from tqdm import tqdm
 except ImportError:
     tqdm = None
 
+RETRY_STATUSES = {429, 503}
+RETRY_BACKOFF = 0.5
+NOT_FOUND_TTL = 3600.0
+NOT_FOUND_CACHE_SIZE = 4096
+BULK_CONCURRENCY = 50
+
 
 async def gather_with_progress(awaitables: Iterable[Awaitable],
                                desc: Optional[str] = None) -> List[Any]:
@@ -41,23 +55,115 @@ async def gather_with_progress(awaitables: Iterable[Awaitable],
 class PokeAPIClientBase:
     """Base session manager for PokéAPI. Pokeapi.co requires client-side
     caching, so a cache is recommended. PickleFileCache is used by default.
+
+    `base_url` can be used to point the client at a PokéAPI mirror or a local
+    stand-in server (see testing/mock_server.py).
+
+    `tracer` receives a timing span for each phase of every request (see
+    aiokemon.core.tracing). It can be a tracer such as OpenTelemetryTracer or
+    a plain callback that takes a Span.
+
+    `metrics` collects request latency, cache, retry and error counters (see
+    aiokemon.core.metrics). Requests that get a 429 or 503 are retried up to
+    `max_retries` times.
+
+    With `lazy`, resources keep their raw JSON data and only build attribute
+    objects the first time each attribute is accessed. With `models`,
+    resources are instead built as the generated `__slots__` model classes
+    from aiokemon.core.models.
+
+    With `intern`, every resource the client builds shares one InternPool,
+    so identical `{name, url}` references become a single immutable object.
+
+    `match` turns on fuzzy matching of resource names for every request.
+    `suggest` works either way. If `matcher_index` is a file path, the
+    matcher's indexes are loaded from it on start and saved to it on close
+    (see `warm_up` to build them all up front). Fuzzy matches the matcher
+    remembers are kept in `resolved_file` whether or not there's a matcher
+    index. It defaults to a file in the cache's directory; with no file and
+    a cache that has no directory (or `should_cache=False`), they aren't
+    saved.
+
+    `search_text` searches the descriptions of cached moves, items,
+    abilities and species. If `text_index` is a file path, that index is
+    loaded from it on start and saved to it on close instead of being built
+    from the cache.
+
+    URLs that get a 404 are remembered for `not_found_ttl` seconds, and
+    requesting them again raises the same error without a request. Pass
+    `not_found_ttl=None` to turn that off.
+
+    Concurrent requests for the same URL share a single request.
     """
 
     def __init__(self, session: Optional[ClientSession] = None, *,
-                 match: bool = True, cache=None, should_cache: bool = True
-                 ) -> None:
+                 match: bool = True, cache=None, should_cache: bool = True,
+                 base_url: Optional[str] = None, tracer=None,
+                 metrics: Optional[ClientMetrics] = None,
+                 max_retries: int = 0, lazy: bool = False,
+                 models: bool = False, intern: bool = False,
+                 matcher_index: Optional[Union[str, Path]] = None,
+                 text_index: Optional[Union[str, Path]] = None,
+                 resolved_file: Optional[Union[str, Path]] = None,
+                 not_found_ttl: Optional[float] = NOT_FOUND_TTL) -> None:
         self._session = session or ClientSession()
-        self._matcher = ResourceMatcher() if match else None
+        self._base_url = base_url or cmn.BASE_URL
+        self._tracer = make_tracer(tracer)
+        self._metrics = metrics or ClientMetrics()
+        self._max_retries = max_retries
+        self._lazy = lazy
+        self._models = models
+        self._pool = InternPool() if intern else None
+        self._match = match
+        self._matcher = ResourceMatcher()
+        self._matcher_index = matcher_index
+        self._localized = None
+        self._text_index = text_index
+        self._text = None
+        self._not_found = None
+        # url -> task getting its response text
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        if not_found_ttl:
+            self._not_found = BoundedLRU(NOT_FOUND_CACHE_SIZE, not_found_ttl)
+        if matcher_index is not None:
+            self._matcher.load(matcher_index, self._base_url)
+        if text_index is not None:
+            self._text = TextIndex()
+            if not self._text.load(text_index):
+                self._text = None
         if should_cache:
             self._cache = cache or PickleFileCache()
         else:
             self._cache = EmptyCache()
+        if resolved_file is None and self._cache.cache_dir is not None:
+            resolved_file = Path(self._cache.cache_dir) / RESOLVED_FILE_NAME
+        self._resolved_file = resolved_file
+        if resolved_file is not None:
+            self._matcher.load_resolved(resolved_file, self._base_url)
 
     async def close(self) -> None:
-        """Ends the session and dumps the cache."""
+        """Ends the session and dumps the cache, remembered fuzzy matches,
+        matcher index and text index.
+        """
+        self._matcher.cancel_loads()
         if self._session:
             await self._session.close()
         self._cache.safe_dump()
+        if self._resolved_file is not None:
+            self._matcher.safe_dump_resolved(self._resolved_file,
+                                             self._base_url)
+        if self._matcher_index is not None:
+            self._matcher.safe_dump(self._matcher_index, self._base_url)
+        if self._text_index is not None and self._text is not None:
+            self._text.safe_dump(self._text_index)
+
+    @property
+    def metrics(self) -> ClientMetrics:
+        return self._metrics
+
+    @property
+    def intern_pool(self) -> Optional[InternPool]:
+        return self._pool
 
     @cache_get
     async def _get_response_text(self, endpoint: str,
@@ -65,13 +171,80 @@ class PokeAPIClientBase:
                                  querystring: Optional[str] = None,
                                  url: Optional[str] = None
                                  ) -> str:
-        """Queries the PokeAPI server and returns the response text."""
+        """Queries the PokeAPI server and returns the response text. Responses
+        with a 429 or 503 status are retried up to `max_retries` times,
+        waiting as long as the Retry-After header asks if it has one.
+
+        ## Raises
+        `aiohttp.ClientResponseError` for error statuses, including 404s
+        remembered from earlier requests.
+        """
         if url is None:
-            url = cmn.join_url(endpoint, resource, querystring=querystring)
-        async with self._session.get(url) as response:
-            response.raise_for_status()
-            response_text = await response.text()
-        return response_text
+            url = cmn.join_url(endpoint, resource, querystring=querystring,
+                               base_url=self._base_url)
+        if self._not_found is not None:
+            not_found = self._not_found.get(url)
+            if not_found is not None:
+                self._metrics.not_found_hits.inc(endpoint)
+                raise ClientResponseError(
+                    not_found.request_info, not_found.history,
+                    status=not_found.status, message=not_found.message,
+                    headers=not_found.headers
+                )
+        for attempt in range(self._max_retries + 1):
+            with self._tracer.span('network', endpoint, url) as span, \
+                    self._metrics.track_request(endpoint):
+                async with self._session.get(url) as response:
+                    span.set('status', response.status)
+                    if (response.status in RETRY_STATUSES
+                            and attempt < self._max_retries):
+                        self._metrics.errors.inc(
+                            endpoint, str(response.status)
+                        )
+                        delay = self._retry_delay(response, attempt)
+                    else:
+                        try:
+                            response.raise_for_status()
+                        except ClientResponseError as e:
+                            if (e.status == 404
+                                    and self._not_found is not None):
+                                self._not_found.put(url, e)
+                            raise
+                        body = await response.read()
+                        self._metrics.response_bytes.inc(
+                            endpoint, amount=len(body)
+                        )
+                        return body.decode(response.get_encoding())
+            self._metrics.retries.inc(endpoint)
+            await asyncio.sleep(delay)
+
+    async def _get_shared_text(self, endpoint: str, url: str) -> str:
+        """Gets the response text of a URL. If another caller is already
+        getting it, waits for that request instead of sending a second
+        one.
+        """
+        task = self._in_flight.get(url)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._get_response_text(endpoint, url=url)
+            )
+            self._in_flight[url] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(url, None))
+        else:
+            self._metrics.deduplicated.inc(endpoint)
+        # Shielded so one caller being cancelled doesn't cancel the request
+        # for everyone else waiting on it
+        return await asyncio.shield(task)
+
+    @staticmethod
+    def _retry_delay(response, attempt: int) -> float:
+        """Seconds to wait before retrying. Uses the Retry-After header when
+        it's given in seconds, and exponential backoff otherwise.
+        """
+        try:
+            return float(response.headers['Retry-After'])
+        except (KeyError, ValueError):
+            return RETRY_BACKOFF * 2 ** attempt
 
     async def _get_json(self, endpoint: str, resource: Optional[str] = None,
                         querystring: Optional[str] = None
@@ -88,21 +261,139 @@ class PokeAPIClientBase:
             raise ValueError(
                 "resource OR querystring can have a value, but not both."
             )
-        if self._matcher is not None and isinstance(resource, str):
-            resource = await self._matcher.best_match(endpoint, resource, self)
-        url = cmn.join_url(endpoint, resource, querystring=querystring)
-        response_text = await self._get_response_text(endpoint, url=url)
-        json_data = json.loads(response_text)
+        if self._match and isinstance(resource, str):
+            with self._tracer.span('match', endpoint, query=resource) as span:
+                resource = await self._matcher.best_match(
+                    endpoint, resource, self
+                )
+                span.set('resource', resource)
+        url = cmn.join_url(endpoint, resource, querystring=querystring,
+                           base_url=self._base_url)
+        response_text = await self._get_shared_text(endpoint, url)
+        with self._tracer.span('json', endpoint, url):
+            json_data = json.loads(response_text)
         if isinstance(json_data, dict):
             json_data['url'] = url
+            if self._localized is not None:
+                self._localized.add_resource(endpoint, json_data)
+            if self._text is not None and endpoint in TEXT_ENDPOINTS:
+                self._text.add_resource(endpoint, json_data)
         return json_data
 
+    async def suggest(self, endpoint: str, query: str, k: int = 5,
+                      max_distance: Optional[int] = None,
+                      min_confidence: float = 0.0) -> List[Suggestion]:
+        """Returns up to `k` scored "did you mean" suggestions for a
+        resource name (see `ResourceMatcher.suggest`). Use it to reject bad
+        input before requesting the wrong resource.
+        """
+        return await self._matcher.suggest(
+            endpoint, query, self, k, max_distance, min_confidence
+        )
+
+    async def warm_up(self, endpoints: Optional[Iterable[str]] = None
+                      ) -> None:
+        """Loads the matcher's name indexes for the given endpoints (all of
+        them by default) concurrently, so no later request waits on one.
+        """
+        await self._matcher.warm_up(self, endpoints)
+
+    async def search(self, query: str, k: int = 10, max_distance: int = 2,
+                     endpoints: Optional[Iterable[str]] = None
+                     ) -> List[SearchHit]:
+        """Searches resource names of every endpoint (or only the given
+        ones) at once and returns up to `k` `(endpoint, name, score)` hits,
+        best first (see `UniversalIndex.search`).
+
+        Given endpoints that haven't been loaded yet are loaded first.
+        Without `endpoints`, only the endpoints that are already loaded are
+        searched, and the rest start loading in the background, so each
+        keystroke of an autocomplete returns right away and finds more as
+        they load. Use `warm_up` to load everything up front instead.
+        """
+        if endpoints is None:
+            self._matcher.load_in_background(self)
+        else:
+            endpoints = list(endpoints)
+            await self._matcher.warm_up(self, endpoints)
+        return self._matcher.search(query, k, max_distance, endpoints)
+
+    @property
+    def localized_names(self) -> LocalizedNameIndex:
+        """Index of the localized names of every cached resource. It's
+        built from the cache on first use, then every resource the client
+        gets afterwards is added to it.
+        """
+        if self._localized is None:
+            self._localized = LocalizedNameIndex()
+            try:
+                self._localized.add_from_cache(self._cache)
+            except NotImplementedError:
+                pass
+        return self._localized
+
+    def lookup_localized(self, query: str,
+                         language: Optional[Union[str, Iterable[str]]] = None,
+                         k: int = 5, max_distance: int = 1,
+                         endpoints: Optional[Iterable[str]] = None
+                         ) -> List[LocalizedMatch]:
+        """Finds resources by their name in any language (or the given
+        ones), i.e. `Glurak` or `リザードン` -> `charizard`. Only cached
+        resources are searched and no requests are made (see
+        `LocalizedNameIndex.lookup`).
+        """
+        return self.localized_names.lookup(
+            query, language, k, max_distance, endpoints
+        )
+
+    @property
+    def text_index(self) -> TextIndex:
+        """Full-text index of the descriptions of every cached move, item,
+        ability and species. Like `localized_names`, it's built from the
+        cache on first use (unless it was loaded from `text_index`) and
+        every resource the client gets afterwards is added to it.
+        """
+        if self._text is None:
+            self._text = TextIndex()
+            try:
+                self._text.add_from_cache(self._cache)
+            except NotImplementedError:
+                pass
+        return self._text
+
+    def search_text(self, query: str, language: Optional[str] = 'en',
+                    k: int = 10, endpoints: Optional[Iterable[str]] = None
+                    ) -> List[TextHit]:
+        """Finds resources by what their effects, flavor text or genus say,
+        i.e. `'lowers speed'` -> `icy-wind`, ranked with BM25. Only cached
+        resources are searched and no requests are made (see
+        `TextIndex.search`).
+        """
+        return self.text_index.search(query, language, k, endpoints)
+
     async def get_available_resources(self, endpoint: str) -> dict:
         """Queries an endpoint for all its existing resources."""
-        response_text = await self._get_response_text(
-            endpoint, querystring='limit=100000'
-        )
-        return json.loads(response_text)
+        url = cmn.join_url(endpoint, querystring='limit=100000',
+                           base_url=self._base_url)
+        return json.loads(await self._get_shared_text(endpoint, url))
+
+    async def get_all_json(self, endpoint: str,
+                           concurrency: int = BULK_CONCURRENCY) -> List[Dict]:
+        """Bulk fetcher: gets the JSON data of every resource of an
+        endpoint, with at most `concurrency` requests in flight. Resources
+        are requested by id, so cached ones cost nothing.
+        """
+        listing = await self.get_available_resources(endpoint)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(url: str) -> Dict:
+            _, resource = cmn.break_url(url, self._base_url)
+            async with semaphore:
+                return await self._get_json(endpoint, resource)
+
+        return await asyncio.gather(*(
+            fetch(res['url']) for res in listing.get('results', [])
+        ))
 
     async def __aenter__(self) -> 'PokeAPIClientBase':
         return self
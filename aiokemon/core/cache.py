@@ -1,7 +1,9 @@
 import pickle
+import time
 import zlib
-from collections import UserDict
-from typing import Any, Callable, Coroutine, Dict, List, Optional, Union
+from collections import OrderedDict, UserDict
+from typing import (Any, Callable, Coroutine, Dict, Hashable, Iterator, List,
+                    Optional, Tuple, Union)
 from pathlib import Path
 
 import aiokemon.core.common as cmn
@@ -19,7 +21,17 @@ class BaseCache:
     data: JSONSerializable)`: Puts the cached data into the cache.
     - `has(endpoint: str, resource: str, url: str)`: Checks if the data exists
     in the cache.
+
+    Caches can also implement `values(self, endpoint: str)`, which yields
+    every cached response of an endpoint. It's only needed by features that
+    build local indexes out of the cache (i.e. localized name lookups).
+
+    Caches that live in a directory can set `cache_dir` to it, so the
+    client can save other small files (i.e. remembered fuzzy matches) next
+    to the cached data.
     """
+    cache_dir: Optional[Path] = None
+
     def __init__(self) -> None:
         self._has_changed = False
 
@@ -35,6 +47,9 @@ class BaseCache:
     def safe_dump(self, *args, **kwargs) -> bool:
         raise NotImplementedError('Cache needs a `safe_dump` method to work.')
 
+    def values(self, endpoint: str) -> Iterator[str]:
+        raise NotImplementedError('Cache has no `values` method.')
+
 
 class EmptyCache(BaseCache):
     """Cache class used when no caching is desired."""
@@ -48,6 +63,9 @@ class EmptyCache(BaseCache):
     def safe_dump(self, *args, **kwargs) -> bool:
         pass
 
+    def values(self, endpoint: str) -> Iterator[str]:
+        return iter(())
+
 
 class PickleLoader(UserDict):
     """Custom dict class created to act like a defaultdict that loads cached
@@ -105,6 +123,10 @@ class PickleFileCache(BaseCache):
         super().__init__()
         self._cache_dict = PickleLoader(cache_dir, *args, **kwargs)
 
+    @property
+    def cache_dir(self) -> Path:
+        return self._cache_dict.cache_dir
+
     def get(self, endpoint: str, key: str) -> Union[Dict, List, None]:
         cached_data = self._cache_dict[endpoint].get(key)
         # Decompress bytes and decode to UTF-8 string
@@ -119,6 +141,16 @@ class PickleFileCache(BaseCache):
     def has(self, endpoint: str, key: str) -> bool:
         return key in self._cache_dict[endpoint]
 
+    def values(self, endpoint: str) -> Iterator[str]:
+        # Don't create (and later dump) empty caches of unused endpoints
+        if (
+            endpoint not in self._cache_dict
+            and not self._cache_dict.get_file_path(endpoint).exists()
+        ):
+            return
+        for cached_data in self._cache_dict[endpoint].values():
+            yield zlib.decompress(cached_data).decode('utf-8')
+
     def safe_dump(self) -> None:
         if not self._has_changed:
             return
@@ -143,6 +175,60 @@ class PickleFileCache(BaseCache):
             self._cache_dict.dump_dict(endpoint, self._cache_dict[endpoint])
 
 
+_missing = object()
+
+
+class BoundedLRU:
+    """A dict-like cache that holds at most `maxsize` items and evicts the
+    least recently used one when it's full. If `ttl` is given, items also
+    expire that many seconds after they were put.
+    """
+
+    def __init__(self, maxsize: int = 4096,
+                 ttl: Optional[float] = None) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # key -> (expiry time or None, value)
+        self._data = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _missing) is not _missing
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            return default
+        expires, value = item
+        if expires is not None and expires <= time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        self._data[key] = (expires, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.pop(key, None)
+        return default if item is None else item[1]
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        """Unexpired items, least recently used first."""
+        now = time.monotonic()
+        return [(key, value) for key, (expires, value) in self._data.items()
+                if expires is None or expires > now]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
 def cache_get(get_coro: Callable[..., Coroutine[Any, None, str]]):
     async def cache_wrapper(session, endpoint: str,
                             resource: Optional[str] = None,
@@ -150,13 +236,19 @@ def cache_get(get_coro: Callable[..., Coroutine[Any, None, str]]):
                             url: Optional[str] = None
                             ) -> Union[Dict, List, None]:
         if url is None:
-            url = cmn.join_url(endpoint, resource, querystring=querystring)
-        if session._cache.has(endpoint, url):
-            return session._cache.get(endpoint, url)
+            url = cmn.join_url(endpoint, resource, querystring=querystring,
+                               base_url=session._base_url)
+        with session._tracer.span('cache', endpoint, url) as span:
+            is_cached = session._cache.has(endpoint, url)
+            span.set('cache', 'hit' if is_cached else 'miss')
+            session._metrics.observe_cache(endpoint, is_cached)
+            if is_cached:
+                return session._cache.get(endpoint, url)
         json_data = await get_coro(
             session, endpoint, resource, querystring, url
         )
-        session._cache.put(endpoint, url, json_data)
+        with session._tracer.span('cache_put', endpoint, url):
+            session._cache.put(endpoint, url, json_data)
         return json_data
 
     return cache_wrapper
@@ -1,8 +1,9 @@
 import json
-from typing import Optional, Union
+from typing import Any, Optional, Union
 
 from aiokemon.core.api import PokeAPIResource, new_pokeapimetadata
 from aiokemon.core.common import Resource
+from aiokemon.core.models import build_model, model_for
 from aiokemon.endpoints import *
 
 from aiokemon.core.base_client import PokeAPIClientBase, gather_with_progress
@@ -23,7 +24,23 @@ class PokeAPIClient(PokeAPIClientBase):
         PokeAPIResource object.
         """
         pokeapi_data = await self._get_json(endpoint, resource, querystring)
-        return PokeAPIResource(endpoint, pokeapi_data)
+        with self._tracer.span('hydrate', endpoint, pokeapi_data.get('url')):
+            if self._models:
+                return model_for(endpoint).from_dict(pokeapi_data, self._pool)
+            return PokeAPIResource(
+                endpoint, pokeapi_data, lazy=self._lazy, pool=self._pool
+            )
+
+    def _wrap_data(self, key: str, data: Any, source: type) -> Any:
+        """Wraps extra data attached to a resource the same way the resource
+        itself was built. `source` is the data's type-hinting class.
+        """
+        if not self._models:
+            return new_pokeapimetadata(key, data, self._lazy, self._pool)
+        model = build_model(source)
+        if isinstance(data, list):
+            return [model.from_dict(item, self._pool) for item in data]
+        return model.from_dict(data, self._pool)
 
     async def berry(self, resource: Resource) -> Berry:
         """Returns a berry resource.
@@ -349,8 +366,9 @@ class PokeAPIClient(PokeAPIClientBase):
         pokeapi_data = await self._get_response_text(
             'pokemon', url=pkmn.location_area_encounters
         )
-        pkmn.location_area_encounters = new_pokeapimetadata(
-            'location_area_encounters', json.loads(pokeapi_data)
+        pkmn.location_area_encounters = self._wrap_data(
+            'location_area_encounters', json.loads(pokeapi_data),
+            LocationAreaEncounter
         )
         return pkmn
 
@@ -396,8 +414,8 @@ class PokeAPIClient(PokeAPIClientBase):
         pokeapi_data = await self._get_response_text(
             'evolution-chain', url=pkmn.evolution_chain.url
         )
-        pkmn.evolution_chain = new_pokeapimetadata(
-            'evolution_chain', json.loads(pokeapi_data)
+        pkmn.evolution_chain = self._wrap_data(
+            'evolution_chain', json.loads(pokeapi_data), EvolutionChain
         )
         return pkmn
 
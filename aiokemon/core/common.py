@@ -57,19 +57,23 @@ Resource = Union[str, int]
 backslashes = re.compile(r'/+')
 
 
-def join_url(*url_parts: str, querystring: Optional[str] = None) -> str:
+def join_url(*url_parts: Union[str, int], querystring: Optional[str] = None,
+             base_url: str = BASE_URL) -> str:
     """Returns a URL by stripping the components of trailing forward slashes
     and then joining them with forward slashes. Ignores falsy parts.
     """
-    url = BASE_URL + '/'.join(part.strip('/') for part in url_parts if part)
+    url = base_url + '/'.join(
+        str(part).strip('/') for part in url_parts if part
+    )
     if querystring:
         url += '?' + querystring.lstrip('?')
     return url
 
 
-def break_url(url: str) -> Tuple[str, Union[str, None]]:
+def break_url(url: str, base_url: str = BASE_URL
+              ) -> Tuple[str, Union[str, None]]:
     """Breaks apart a URL into the endpoint and resource."""
-    if BASE_URL not in url:
+    if base_url not in url:
         raise ValueError(f'URL must be for PokéAPI. Got "{url}" instead.')
     url_path = urlparse(url).path.strip('/')
     path_components = backslashes.split(url_path)
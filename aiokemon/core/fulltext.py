@@ -0,0 +1,354 @@
+"""
+Full-text search over the descriptions in PokéAPI: move, item and ability
+effects, flavor text and species genera. Each resource's text in each
+language is one document of an inverted index ranked with BM25, and
+resources can be added (or re-added) one at a time as they get cached.
+
+```python
+>>> index = TextIndex()
+>>> index.add_from_cache(PickleFileCache())
+>>> index.search('lowers speed', k=2, endpoints=['move'])
+[TextHit(endpoint='move', name='icy-wind', language='en', score=7.31),
+TextHit(endpoint='move', name='bulldoze', language='en', score=7.02)]
+>>> index.search('lives in volcanoes', endpoints=['pokemon-species'])[0].name
+'magcargo'
+```
+"""
+
+import json
+import math
+import pickle
+import re
+import unicodedata
+from collections import Counter
+from pathlib import Path
+from typing import (Dict, Iterable, Iterator, List, NamedTuple, Optional,
+                    Tuple, Union)
+
+from aiokemon.core.cache import BASE_CACHE_DIR, BaseCache
+
+TEXT_INDEX_FILE = BASE_CACHE_DIR / 'text_index.pickle'
+INDEX_VERSION = 2
+TEXT_ENDPOINTS = ('ability', 'item', 'move', 'pokemon-species')
+# lists of localized entries, and the keys of those entries that hold text
+TEXT_LISTS = ('effect_entries', 'flavor_text_entries', 'genera')
+TEXT_KEYS = ('effect', 'short_effect', 'flavor_text', 'text', 'genus')
+BM25_K1 = 1.2
+BM25_B = 0.75
+ENGLISH_STOP_WORDS = frozenset((
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in',
+    'is', 'it', 'its', 'of', 'on', 'or', 's', 'that', 'the', 'this', 'to',
+    'which', 'with'
+))
+word = re.compile(r'\w+')
+# scripts written without spaces, which are indexed as character bigrams
+unspaced = re.compile(r'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff]')
+
+
+class TextHit(NamedTuple):
+    endpoint: str
+    name: str
+    language: str
+    score: float
+
+
+def _stem(token: str) -> str:
+    """Strips common English inflections so `lowers`, `lowered` and
+    `lowering` all match `lower`. Deliberately light: it only has to make
+    queries and descriptions agree, not produce real stems.
+    """
+    if len(token) > 4 and token.endswith('ies'):
+        return token[:-3] + 'y'
+    if token.endswith('eed'):
+        # speed, need
+        return token
+    for suffix in ('ing', 'ed'):
+        if len(token) - len(suffix) >= 3 and token.endswith(suffix):
+            return token[:-len(suffix)]
+    if len(token) > 4 and token.endswith(('ches', 'shes', 'sses', 'xes',
+                                          'oes')):
+        return token[:-2]
+    if len(token) > 3 and token.endswith('s') \
+            and not token.endswith(('ss', 'us', 'is')):
+        token = token[:-1]
+    # so raise, raised and raises agree
+    if len(token) > 4 and token.endswith('e') and not token.endswith('ee'):
+        token = token[:-1]
+    return token
+
+
+def tokenize(text: str, language: Optional[str] = None) -> List[str]:
+    """Splits text into casefolded index terms. English drops stop words
+    and gets light stemming; runs of Japanese or Chinese characters become
+    overlapping character bigrams.
+    """
+    text = unicodedata.normalize('NFKC', text).casefold()
+    tokens = []
+    for token in word.findall(text):
+        if unspaced.search(token):
+            if len(token) == 1:
+                tokens.append(token)
+            tokens.extend(token[i:i + 2] for i in range(len(token) - 1))
+        elif language == 'en':
+            if token not in ENGLISH_STOP_WORDS:
+                tokens.append(_stem(token))
+        else:
+            tokens.append(token)
+    return tokens
+
+
+def localized_texts(data: dict) -> Dict[str, List[str]]:
+    """Every distinct description of a resource, by language."""
+    texts: Dict[str, Dict[str, None]] = {}
+    for list_key in TEXT_LISTS:
+        for entry in data.get(list_key) or ():
+            language = (entry.get('language') or {}).get('name')
+            if not language:
+                continue
+            for key in TEXT_KEYS:
+                text = entry.get(key)
+                if text:
+                    # flavor text is full of line breaks and form feeds
+                    texts.setdefault(language, {}).setdefault(
+                        ' '.join(text.split())
+                    )
+    return {language: list(language_texts)
+            for language, language_texts in texts.items()}
+
+
+class TextIndex:
+    """An inverted index from terms to the documents that hold them. A
+    document is all the text of one resource in one language, so searches
+    can be limited to languages and endpoints. Re-adding a resource
+    replaces its documents.
+    """
+
+    def __init__(self) -> None:
+        self._terms: Dict[str, int] = {}
+        # term id -> {document id: term frequency}
+        self._postings: List[Dict[int, int]] = []
+        # document id -> (endpoint, name, language) and its term ids
+        self._documents: List[Optional[Tuple[str, str, str]]] = []
+        self._document_terms: List[Tuple[int, ...]] = []
+        self._lengths: List[int] = []
+        self._ids: Dict[Tuple[str, str, str], int] = {}
+        self._free: List[int] = []
+        # language -> [number of documents, total length]
+        self._language_stats: Dict[str, List[int]] = {}
+        # language -> {term id: number of documents that hold it}
+        self._frequencies: Dict[str, Dict[int, int]] = {}
+        self._has_changed = False
+
+    def __len__(self) -> int:
+        """Number of documents in the index."""
+        return len(self._ids)
+
+    @property
+    def languages(self) -> List[str]:
+        return sorted(language for language, (count, _)
+                      in self._language_stats.items() if count)
+
+    def _remove(self, document: int) -> None:
+        _, _, language = self._documents[document]
+        frequencies = self._frequencies[language]
+        for term in self._document_terms[document]:
+            del self._postings[term][document]
+            frequencies[term] -= 1
+            if not frequencies[term]:
+                del frequencies[term]
+        stats = self._language_stats[language]
+        stats[0] -= 1
+        stats[1] -= self._lengths[document]
+        del self._ids[self._documents[document]]
+        self._documents[document] = None
+        self._document_terms[document] = ()
+        self._lengths[document] = 0
+        self._free.append(document)
+
+    def _add(self, key: Tuple[str, str, str], counts: Counter) -> None:
+        if self._free:
+            document = self._free.pop()
+        else:
+            document = len(self._documents)
+            self._documents.append(None)
+            self._document_terms.append(())
+            self._lengths.append(0)
+        frequencies = self._frequencies.setdefault(key[2], {})
+        term_ids = []
+        for token, count in counts.items():
+            term = self._terms.get(token)
+            if term is None:
+                term = self._terms[token] = len(self._postings)
+                self._postings.append({})
+            self._postings[term][document] = count
+            frequencies[term] = frequencies.get(term, 0) + 1
+            term_ids.append(term)
+        length = sum(counts.values())
+        self._documents[document] = key
+        self._document_terms[document] = tuple(term_ids)
+        self._lengths[document] = length
+        self._ids[key] = document
+        stats = self._language_stats.setdefault(key[2], [0, 0])
+        stats[0] += 1
+        stats[1] += length
+
+    def _is_indexed(self, key: Tuple[str, str, str], counts: Counter) -> bool:
+        """Whether a document is indexed with exactly these term counts
+        (or, for no terms, isn't indexed at all).
+        """
+        document = self._ids.get(key)
+        if document is None:
+            return not counts
+        if len(self._document_terms[document]) != len(counts):
+            return False
+        for token, count in counts.items():
+            term = self._terms.get(token)
+            if term is None or self._postings[term].get(document) != count:
+                return False
+        return True
+
+    def add_resource(self, endpoint: str, data: dict) -> bool:
+        """Indexes the descriptions of a resource's JSON data in every
+        language, replacing what was indexed for it before. Resources that
+        are already indexed with the same text are left alone. Returns False
+        if it has no text to index.
+        """
+        name = data.get('name')
+        if not name:
+            return False
+        texts = localized_texts(data)
+        counts = {
+            language: Counter(tokenize(' '.join(language_texts), language))
+            for language, language_texts in texts.items()
+        }
+        languages = set(counts).union(self._language_stats)
+        if all(self._is_indexed((endpoint, name, language),
+                                counts.get(language, Counter()))
+               for language in languages):
+            return bool(texts)
+        for language in languages:
+            key = (endpoint, name, language)
+            if key in self._ids:
+                self._remove(self._ids[key])
+        for language, language_counts in counts.items():
+            if language_counts:
+                self._add((endpoint, name, language), language_counts)
+        self._has_changed = True
+        return bool(texts)
+
+    def add_from_cache(self, cache: BaseCache,
+                       endpoints: Iterable[str] = TEXT_ENDPOINTS) -> int:
+        """Indexes every cached resource of the given endpoints and returns
+        how many had text.
+
+        ## Raises
+        `NotImplementedError` if the cache has no `values` method.
+        """
+        added = 0
+        for endpoint in endpoints:
+            for text in cache.values(endpoint):
+                data = json.loads(text)
+                if isinstance(data, dict) and self.add_resource(endpoint,
+                                                                data):
+                    added += 1
+        return added
+
+    def _scores(self, terms: List[int], language: Optional[str],
+                endpoints: Optional[set]) -> Iterator[Tuple[int, float]]:
+        """BM25 scores of every document that holds any of the terms. Each
+        language has its own document count, document frequencies and
+        average length, so a small language isn't drowned out by English.
+        """
+        scores: Dict[int, float] = {}
+        for term in terms:
+            for document, count in self._postings[term].items():
+                key = self._documents[document]
+                if language is not None and key[2] != language:
+                    continue
+                if endpoints is not None and key[0] not in endpoints:
+                    continue
+                total, length = self._language_stats[key[2]]
+                frequency = self._frequencies[key[2]][term]
+                idf = math.log(1 + (total - frequency + 0.5)
+                               / (frequency + 0.5))
+                norm = 1 - BM25_B + BM25_B * (self._lengths[document]
+                                              / (length / total))
+                scores[document] = scores.get(document, 0.0) + (
+                    idf * count * (BM25_K1 + 1) / (count + BM25_K1 * norm)
+                )
+        return iter(scores.items())
+
+    def search(self, query: str, language: Optional[str] = 'en',
+               k: int = 10, endpoints: Optional[Iterable[str]] = None
+               ) -> List[TextHit]:
+        """The `k` resources whose descriptions best match the query, best
+        first, in one language (English by default) or in all of them with
+        `language=None`.
+        """
+        tokens = tokenize(query, language)
+        terms = [self._terms[token] for token in dict.fromkeys(tokens)
+                 if token in self._terms]
+        if not terms:
+            return []
+        if endpoints is not None:
+            endpoints = set(endpoints)
+        ranked = sorted(self._scores(terms, language, endpoints),
+                        key=lambda item: (-item[1], self._documents[item[0]]))
+        return [TextHit(*self._documents[document], round(score, 2))
+                for document, score in ranked[:k]]
+
+    def dump(self, file_path: Union[str, Path] = TEXT_INDEX_FILE) -> None:
+        file_path = Path(file_path)
+        if not file_path.parent.is_dir():
+            file_path.parent.mkdir(parents=True)
+        data = {
+            'version': INDEX_VERSION,
+            'terms': self._terms,
+            'postings': self._postings,
+            'documents': self._documents,
+            'document_terms': self._document_terms,
+            'lengths': self._lengths,
+            'free': self._free,
+            'language_stats': self._language_stats,
+            'frequencies': self._frequencies,
+        }
+        with open(file_path, 'wb') as pickle_file:
+            pickle.dump(data, pickle_file, pickle.HIGHEST_PROTOCOL)
+        self._has_changed = False
+
+    def safe_dump(self, file_path: Union[str, Path] = TEXT_INDEX_FILE
+                  ) -> None:
+        """Dumps the index only if a resource was added since the last dump
+        or load.
+        """
+        if self._has_changed:
+            self.dump(file_path)
+
+    def load(self, file_path: Union[str, Path] = TEXT_INDEX_FILE) -> bool:
+        """Replaces the index with one saved by `dump`. Returns False (and
+        loads nothing) if the file doesn't exist or was saved by another
+        version.
+        """
+        file_path = Path(file_path)
+        if not file_path.exists():
+            return False
+        with open(file_path, 'rb') as pickle_file:
+            pickle_data = pickle_file.read()
+        if not pickle_data:
+            return False
+        data = pickle.loads(pickle_data)
+        if data.get('version') != INDEX_VERSION:
+            return False
+        self._terms = data['terms']
+        self._postings = data['postings']
+        self._documents = data['documents']
+        self._document_terms = data['document_terms']
+        self._lengths = data['lengths']
+        self._free = data['free']
+        self._language_stats = data['language_stats']
+        self._frequencies = data['frequencies']
+        self._ids = {key: document
+                     for document, key in enumerate(self._documents)
+                     if key is not None}
+        self._has_changed = False
+        return True
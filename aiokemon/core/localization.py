@@ -0,0 +1,155 @@
+"""
+Lookups of resources by their localized names. Most resources have a `names`
+list with their name in every language PokéAPI knows, so an index of those
+lets `Glurak`, `リザードン` or `dracaufeu` resolve to `charizard` without any
+requests, as long as the resources have been cached.
+
+```python
+>>> index = LocalizedNameIndex()
+>>> index.add_from_cache(PickleFileCache())
+>>> index.lookup('Glurak', k=1)
+[LocalizedMatch(endpoint='pokemon-species', name='charizard', language='de',
+localized_name='Glurak', score=0)]
+```
+"""
+
+import json
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+import aiokemon.core.common as cmn
+from aiokemon.core.cache import BaseCache
+from aiokemon.core.matcher import UniversalIndex
+from aiokemon.utils.text import normalize_name
+
+
+class LocalizedMatch(NamedTuple):
+    """A resource found by one of its localized names. `score` works like it
+    does for SearchHit, on the normalized names.
+    """
+    endpoint: str
+    name: str
+    language: str
+    localized_name: str
+    score: int
+
+
+class LocalizedNameIndex:
+    """Maps normalized localized names to the resources they belong to, with
+    one fuzzy index per language (see UniversalIndex). Resources are added
+    one at a time, so the index can be built from a cache and then kept up
+    to date as new resources come in.
+    """
+
+    def __init__(self) -> None:
+        # Each language's index maps normalized names to the
+        # `(endpoint, name)` pairs of their resources instead of endpoints
+        self._languages: Dict[str, UniversalIndex] = {}
+        # (language, normalized name) -> the name as PokéAPI writes it
+        self._localized_names: Dict[tuple, str] = {}
+        self._resources = set()
+
+    def __len__(self) -> int:
+        """Number of resources in the index."""
+        return len(self._resources)
+
+    @property
+    def languages(self) -> List[str]:
+        return sorted(self._languages)
+
+    def add_resource(self, endpoint: str, data: dict) -> bool:
+        """Adds every localized name of a resource's JSON data. Returns
+        False if it has no names to add.
+        """
+        name = data.get('name')
+        names = data.get('names')
+        if not name or not isinstance(names, list):
+            return False
+        resource = (endpoint, name)
+        for entry in names:
+            localized_name = entry.get('name')
+            language = (entry.get('language') or {}).get('name')
+            if not localized_name or not language:
+                continue
+            normalized = normalize_name(localized_name)
+            if not normalized:
+                continue
+            index = self._languages.get(language)
+            if index is None:
+                index = self._languages[language] = UniversalIndex()
+            index.add(resource, (normalized,))
+            self._localized_names.setdefault(
+                (language, normalized), localized_name
+            )
+        self._resources.add(resource)
+        return True
+
+    def add_from_cache(self, cache: BaseCache,
+                       endpoints: Optional[Iterable[str]] = None) -> int:
+        """Adds every cached resource of the given endpoints (all of them by
+        default) and returns how many had names.
+
+        ## Raises
+        `NotImplementedError` if the cache has no `values` method.
+        """
+        added = 0
+        for endpoint in endpoints or sorted(cmn.VALID_ENDPOINTS):
+            for text in cache.values(endpoint):
+                data = json.loads(text)
+                if not isinstance(data, dict):
+                    continue
+                if self.add_resource(endpoint, data):
+                    added += 1
+        return added
+
+    def lookup(self, query: str,
+               language: Optional[Union[str, Iterable[str]]] = None,
+               k: int = 5, max_distance: int = 1,
+               endpoints: Optional[Iterable[str]] = None
+               ) -> List[LocalizedMatch]:
+        """Finds up to `k` resources with a localized name close to the
+        query, best first, in the given language(s) or in every language.
+        A resource named the same in several languages is only returned
+        once.
+        """
+        if language is None:
+            languages = self.languages
+        elif isinstance(language, str):
+            languages = [language]
+        else:
+            languages = list(language)
+        search = normalize_name(query)
+        if not search:
+            return []
+        if endpoints is not None:
+            endpoints = set(endpoints)
+        matches = []
+        for language in languages:
+            index = self._languages.get(language)
+            if index is None:
+                continue
+            accept = None
+            if endpoints is not None:
+                def accept(resource: Tuple[str, str]) -> bool:
+                    return resource[0] in endpoints
+
+            for normalized, score, resources in index.matches(
+                (search,), k, max_distance, accept
+            ):
+                localized_name = self._localized_names[
+                    (language, normalized)
+                ]
+                for endpoint, name in resources:
+                    if endpoints is None or endpoint in endpoints:
+                        matches.append((
+                            (score, len(normalized), name, language),
+                            LocalizedMatch(endpoint, name, language,
+                                           localized_name, score)
+                        ))
+        matches.sort(key=lambda t: t[0])
+        results = []
+        seen = set()
+        for _, match in matches:
+            if (match.endpoint, match.name) not in seen:
+                seen.add((match.endpoint, match.name))
+                results.append(match)
+        return results[:k]
@@ -1,20 +1,265 @@
+import asyncio
+import math
+import pickle
 import re
-from typing import Tuple
+import time
+from functools import partial
+from pathlib import Path
+from typing import (Callable, Dict, Hashable, Iterable, List, NamedTuple,
+                    Optional, Set, Tuple, Union)
 
 import aiokemon.core.common as cmn
-from aiokemon.utils.text import levenshtein_osa
+from aiokemon.core.cache import BASE_CACHE_DIR, BoundedLRU
+from aiokemon.utils.bktree import BKTree
+from aiokemon.utils.text import levenshtein, levenshtein_osa
 
 and_pokemon = re.compile(r'\s?(pok[eé]mon|and)\s?', re.IGNORECASE)
 non_alphanumerical = re.compile(r'[^a-z0-9]', re.IGNORECASE)
 
+MATCHER_INDEX_FILE = BASE_CACHE_DIR / 'matcher_index.pickle'
+# Saved in the cache's directory; not `.pickle`, so it's never mistaken
+# for an endpoint's cache file
+RESOLVED_FILE_NAME = 'resolved_matches.pkl'
+INDEX_VERSION = 1
+RESOLVED_CACHE_SIZE = 4096
+# seconds before a background load that failed is tried again
+BACKGROUND_RETRY_DELAY = 30.0
+
+
+class Suggestion(NamedTuple):
+    """A scored fuzzy match. `distance` is the OSA distance between the
+    formatted query and `name`, and `confidence` scales it to between 0.0
+    (nothing in common) and 1.0 (exact match) by the length of the longer
+    of the two.
+    """
+    name: str
+    distance: int
+    confidence: float
+
+
+class SearchHit(NamedTuple):
+    """A hit of a search across every endpoint. `score` is the OSA distance
+    between the query and the closest prefix of `name`, so it's 0 whenever
+    `name` starts with the query.
+    """
+    endpoint: str
+    name: str
+    score: int
+
+
+def confidence(search: str, name: str, distance: int) -> float:
+    longest = max(len(search), len(name))
+    return 1.0 - distance / longest if longest else 1.0
+
+
+class UniversalIndex:
+    """Index over the resource names of every loaded endpoint at once, for
+    search boxes that don't know what kind of resource was typed. Endpoints
+    are added as they load, so the index grows with the matcher instead of
+    being rebuilt.
+
+    Names are stored in a trie. A search walks it while keeping one row of
+    the OSA distance matrix per trie node, so every name sharing a prefix
+    shares that work, and whole branches are dropped as soon as no cell of
+    the row is within the distance limit. Because a name matches as soon as
+    any of its prefixes does, partially typed names work for autocomplete.
+    Names shared by several endpoints (i.e. `dragon` is both a type and an
+    egg group) are stored once and give one hit per endpoint.
+    """
+
+    def __init__(self) -> None:
+        self._endpoints: Dict[str, Set[str]] = {}
+        # Each node maps a character to its child node, and '' to the name
+        # ending at it
+        self._trie = {}
+
+    def __len__(self) -> int:
+        return len(self._endpoints)
+
+    def add(self, endpoint: str, names: Iterable[str]) -> None:
+        for name in names:
+            endpoints = self._endpoints.get(name)
+            if endpoints is not None:
+                endpoints.add(endpoint)
+                continue
+            self._endpoints[name] = {endpoint}
+            node = self._trie
+            for char in name:
+                node = node.setdefault(char, {})
+            node[''] = name
+
+    @staticmethod
+    def _shortest(node: dict, k: int,
+                  accept: Optional[Callable[[str], bool]]) -> List[str]:
+        """Up to `k` of the shortest names in a subtree, found breadth-first
+        so big subtrees (like everything starting with `p`) aren't walked
+        in full.
+        """
+        names = []
+        level = [node]
+        while level and len(names) < k:
+            found = []
+            next_level = []
+            for current in level:
+                for char, child in current.items():
+                    if char:
+                        next_level.append(child)
+                    elif accept is None or accept(child):
+                        found.append(child)
+            names.extend(sorted(found))
+            level = next_level
+        return names[:k]
+
+    def _walk(self, query: str, max_distance: int, k: int,
+              accept: Optional[Callable[[str], bool]],
+              hits: Dict[str, int]) -> None:
+        """Adds every name with a prefix within `max_distance` of the query
+        to `hits`, keeping each name's best score.
+        """
+        m = len(query)
+        first_row = list(range(m + 1))
+        # (node, last char, its row, the row before it, best prefix score)
+        stack = [(self._trie, '', first_row, None, first_row[m])]
+        while stack:
+            node, last_char, prev, prev_prev, best = stack.pop()
+            if best <= max_distance and min(prev) >= best:
+                # No deeper prefix can beat the score already reached, so
+                # the shortest names below here are all that's needed
+                for name in self._shortest(node, k, accept):
+                    if best < hits.get(name, max_distance + 1):
+                        hits[name] = best
+                continue
+            for char, child in node.items():
+                if not char:
+                    # The name ending here, scored by its best prefix
+                    if (
+                        best <= max_distance
+                        and best < hits.get(child, max_distance + 1)
+                        and (accept is None or accept(child))
+                    ):
+                        hits[child] = best
+                    continue
+                row = [prev[0] + 1]
+                for i in range(1, m + 1):
+                    q_char = query[i - 1]
+                    value = min(prev[i] + 1, row[i - 1] + 1,
+                                prev[i - 1] + (q_char != char))
+                    if (
+                        i > 1 and prev_prev is not None
+                        and q_char == last_char and query[i - 2] == char
+                    ):
+                        value = min(value, prev_prev[i - 2] + 1)
+                    row.append(value)
+                if min(row) <= max_distance:
+                    stack.append(
+                        (child, char, row, prev, min(best, row[m]))
+                    )
+
+    def _searches(self, query: str) -> Set[str]:
+        """Formats a query like a resource name, forwards and reversed."""
+        split_query = non_alphanumerical.split(query.lower().strip())
+        searches = {'-'.join(split_query), '-'.join(reversed(split_query))}
+        searches.discard('')
+        return searches
+
+    def _ranked(self, searches: Set[str], k: int, max_distance: int,
+                accept: Optional[Callable[[str], bool]] = None
+                ) -> List[Tuple[str, int]]:
+        """Returns up to `k` `(name, score)` pairs for the formatted
+        searches, best first. The distance limit is raised one step at a
+        time until there are `k` names.
+        """
+        hits = {}
+        for distance in range(max_distance + 1):
+            hits = {}
+            for search in searches:
+                self._walk(search, distance, k, accept, hits)
+            if len(hits) >= k:
+                break
+        ranked = sorted(hits, key=lambda n: (hits[n], len(n), n))
+        return [(name, hits[name]) for name in ranked[:k]]
+
+    def matches(self, searches: Iterable[str], k: int = 10,
+                max_distance: int = 2,
+                accept: Optional[Callable[[Hashable], bool]] = None
+                ) -> List[Tuple[str, int, List[Hashable]]]:
+        """Up to `k` `(name, score, endpoints)` for searches that are
+        already formatted like the stored names (`search` formats its query
+        itself), best first. `endpoints` are what the name was added under,
+        and with `accept`, only names added under an endpoint it accepts
+        count.
+        """
+        name_accept = None
+        if accept is not None:
+            def name_accept(name: str) -> bool:
+                return any(accept(endpoint)
+                           for endpoint in self._endpoints[name])
+
+        return [
+            (name, score, sorted(self._endpoints[name]))
+            for name, score in self._ranked(set(searches), k, max_distance,
+                                            name_accept)
+        ]
+
+    def search(self, query: str, k: int = 10, max_distance: int = 2,
+               endpoints: Optional[Iterable[str]] = None) -> List[SearchHit]:
+        """Returns up to `k` hits for the query, best first: names starting
+        with the query, then names with a prefix within `max_distance` of
+        it. Ties go to shorter names. The distance limit is raised one step
+        at a time and the search stops as soon as there are `k` names, so a
+        query with plenty of exact prefix matches never does a fuzzy walk.
+        """
+        searches = self._searches(query)
+        if not searches:
+            return []
+        accept = None
+        if endpoints is not None:
+            endpoints = set(endpoints)
+            accept = endpoints.__contains__
+        results = []
+        for name, score, name_endpoints in self.matches(
+            searches, k, max_distance, accept
+        ):
+            for endpoint in name_endpoints:
+                if endpoints is None or endpoint in endpoints:
+                    results.append(SearchHit(endpoint, name, score))
+        return results[:k]
+
 
 class ResourceMatcher:
     """Uses fuzzy string matching to find the closest-matching resource
     when the given one doesn't exist.
+
+    Each endpoint's names are indexed in a BKTree the first time the endpoint
+    is loaded, so a search only computes distances to a small part of the
+    endpoint instead of every name in it. Matches are still ranked by OSA
+    distance; the tree uses the Levenshtein distance, which is a true metric
+    and never more than twice the OSA distance, so no closer match can be
+    pruned away. Both distances are bit-parallel, and OSA scoring bails out
+    early on names that can't beat the best match so far.
+
+    Concurrent first queries for an endpoint share a single load, and
+    `warm_up` loads many endpoints at once ahead of time. The built indexes
+    can be saved with `dump` and read back with `load` so a fresh process
+    doesn't have to request and rebuild them. Every loaded endpoint is also
+    added to a UniversalIndex used by `search`.
+
+    The last `resolved_cache_size` fuzzy matches are remembered, so
+    repeating a misspelling skips the search. They're saved on their own
+    with `dump_resolved` and read back with `load_resolved`.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, resolved_cache_size: int = RESOLVED_CACHE_SIZE
+                 ) -> None:
         self._loaded_endpoints = {}
+        self._indexes = {}
+        self._resolved = BoundedLRU(resolved_cache_size)
+        self._universal = UniversalIndex()
+        self._loading = {}
+        # endpoint -> when its last background load failed
+        self._failed: Dict[str, float] = {}
+        self._has_changed = False
+        self._resolved_changed = False
 
     async def _load_endpoint(self, endpoint: str, session):
         """If an endpoint doesn't exist in the endpoint_resources dict, it is
@@ -24,8 +269,208 @@ class ResourceMatcher:
         `ValueError` if the endpoint is not valid.
         """
         results = await session.get_available_resources(endpoint)
-        resource_names = {res['name'] for res in results.get('results', [])}
+        # Some endpoints (i.e. machine) only list URLs, not names
+        resource_names = {
+            res['name'] for res in results.get('results', []) if 'name' in res
+        }
+        self._indexes[endpoint] = BKTree(
+            levenshtein, sorted(resource_names)
+        )
         self._loaded_endpoints[endpoint] = resource_names
+        self._universal.add(endpoint, resource_names)
+        self._failed.pop(endpoint, None)
+        self._has_changed = True
+
+    def _start_load(self, endpoint: str, session) -> asyncio.Future:
+        """Starts loading an endpoint, or returns the load that's already
+        running for it.
+        """
+        task = self._loading.get(endpoint)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._load_endpoint(endpoint, session)
+            )
+            self._loading[endpoint] = task
+            task.add_done_callback(
+                lambda _: self._loading.pop(endpoint, None)
+            )
+        return task
+
+    async def _ensure_loaded(self, endpoint: str, session) -> None:
+        """Loads an endpoint unless it's already loaded. If another caller
+        is already loading it, waits for that load instead of starting a
+        second one.
+        """
+        if endpoint in self._loaded_endpoints:
+            return
+        # Shielded so one caller being cancelled doesn't cancel the load
+        # for everyone else waiting on it
+        await asyncio.shield(self._start_load(endpoint, session))
+
+    def load_in_background(self, session,
+                           endpoints: Optional[Iterable[str]] = None
+                           ) -> None:
+        """Starts loading the given endpoints (every valid endpoint by
+        default) that aren't loaded or loading yet, without waiting for
+        them. An endpoint whose load failed isn't tried again for
+        `BACKGROUND_RETRY_DELAY` seconds, so calling this on every keystroke
+        doesn't repeat failing requests.
+
+        ## Raises
+        `ValueError` if any endpoint is not valid.
+        """
+        if endpoints is None:
+            endpoints = sorted(cmn.VALID_ENDPOINTS)
+        endpoints = list(endpoints)
+        for endpoint in endpoints:
+            self._validate_endpoint(endpoint)
+        now = time.monotonic()
+        for endpoint in endpoints:
+            if (
+                endpoint in self._loaded_endpoints
+                or endpoint in self._loading
+                or now - self._failed.get(endpoint, -math.inf)
+                < BACKGROUND_RETRY_DELAY
+            ):
+                continue
+            self._start_load(endpoint, session).add_done_callback(
+                partial(self._background_done, endpoint)
+            )
+
+    def _background_done(self, endpoint: str, task: asyncio.Future) -> None:
+        # Retrieving the exception also keeps asyncio from logging it as
+        # never retrieved
+        if not task.cancelled() and task.exception() is not None:
+            self._failed[endpoint] = time.monotonic()
+
+    def cancel_loads(self) -> None:
+        """Cancels every endpoint load that's still running."""
+        for task in list(self._loading.values()):
+            task.cancel()
+
+    async def warm_up(self, session,
+                      endpoints: Optional[Iterable[str]] = None) -> None:
+        """Loads the given endpoints (every valid endpoint by default)
+        concurrently, so no later query has to wait for a load.
+
+        ## Raises
+        `ValueError` if any endpoint is not valid.
+        """
+        if endpoints is None:
+            endpoints = sorted(cmn.VALID_ENDPOINTS)
+        endpoints = list(endpoints)
+        for endpoint in endpoints:
+            self._validate_endpoint(endpoint)
+        await asyncio.gather(*(
+            self._ensure_loaded(endpoint, session) for endpoint in endpoints
+        ))
+
+    def dump(self, file_path: Union[str, Path] = MATCHER_INDEX_FILE,
+             base_url: str = cmn.BASE_URL) -> None:
+        """Pickles every loaded endpoint's names and index to a file.
+        `base_url` is saved with them so indexes built from one server are
+        never loaded for another.
+        """
+        file_path = Path(file_path)
+        if not file_path.parent.is_dir():
+            file_path.parent.mkdir(parents=True)
+        data = {
+            'version': INDEX_VERSION,
+            'base_url': base_url,
+            'endpoints': {
+                endpoint: (names, self._indexes[endpoint])
+                for endpoint, names in self._loaded_endpoints.items()
+            },
+        }
+        with open(file_path, 'wb') as pickle_file:
+            pickle.dump(data, pickle_file, pickle.HIGHEST_PROTOCOL)
+        self._has_changed = False
+
+    def safe_dump(self, file_path: Union[str, Path] = MATCHER_INDEX_FILE,
+                  base_url: str = cmn.BASE_URL) -> None:
+        """Dumps the indexes only if an endpoint was loaded since the last
+        dump or load.
+        """
+        if self._has_changed:
+            self.dump(file_path, base_url)
+
+    def load(self, file_path: Union[str, Path] = MATCHER_INDEX_FILE,
+             base_url: str = cmn.BASE_URL) -> bool:
+        """Loads indexes saved by `dump`, keeping any endpoints that are
+        already loaded. Returns False (and loads nothing) if the file
+        doesn't exist or was saved for another version or server.
+        """
+        file_path = Path(file_path)
+        if not file_path.exists():
+            return False
+        with open(file_path, 'rb') as pickle_file:
+            pickle_data = pickle_file.read()
+        if not pickle_data:
+            return False
+        data = pickle.loads(pickle_data)
+        if (
+            data.get('version') != INDEX_VERSION
+            or data.get('base_url') != base_url
+        ):
+            return False
+        for endpoint, (names, index) in data['endpoints'].items():
+            if endpoint not in self._loaded_endpoints:
+                self._loaded_endpoints[endpoint] = names
+                self._indexes[endpoint] = index
+                self._universal.add(endpoint, names)
+        return True
+
+    @staticmethod
+    def _read_resolved(file_path: Path) -> Dict[str, list]:
+        """The remembered matches saved in a file, by base URL."""
+        if not file_path.exists():
+            return {}
+        with open(file_path, 'rb') as pickle_file:
+            pickle_data = pickle_file.read()
+        if not pickle_data:
+            return {}
+        data = pickle.loads(pickle_data)
+        if data.get('version') != INDEX_VERSION:
+            return {}
+        return data['resolved']
+
+    def dump_resolved(self, file_path: Union[str, Path],
+                      base_url: str = cmn.BASE_URL) -> None:
+        """Pickles the remembered fuzzy matches to a file under
+        `base_url`, keeping the ones saved there for other servers.
+        """
+        file_path = Path(file_path)
+        if not file_path.parent.is_dir():
+            file_path.parent.mkdir(parents=True)
+        resolved = self._read_resolved(file_path)
+        resolved[base_url] = self._resolved.items()
+        data = {'version': INDEX_VERSION, 'resolved': resolved}
+        with open(file_path, 'wb') as pickle_file:
+            pickle.dump(data, pickle_file, pickle.HIGHEST_PROTOCOL)
+        self._resolved_changed = False
+
+    def safe_dump_resolved(self, file_path: Union[str, Path],
+                           base_url: str = cmn.BASE_URL) -> None:
+        """Dumps the remembered matches only if there's a new one since the
+        last dump or load.
+        """
+        if self._resolved_changed:
+            self.dump_resolved(file_path, base_url)
+
+    def load_resolved(self, file_path: Union[str, Path],
+                      base_url: str = cmn.BASE_URL) -> bool:
+        """Loads the fuzzy matches `dump_resolved` saved for `base_url`,
+        keeping the ones already remembered. Returns False (and loads
+        nothing) if the file doesn't exist, was saved by another version or
+        has nothing for that server.
+        """
+        resolved = self._read_resolved(Path(file_path))
+        if base_url not in resolved:
+            return False
+        for key, match in resolved[base_url]:
+            if key not in self._resolved:
+                self._resolved.put(key, match)
+        return True
 
     def _validate_endpoint(self, endpoint: str) -> None:
         """Validates a given endpoint.
@@ -47,32 +492,95 @@ class ResourceMatcher:
         split_resource = non_alphanumerical.split(resource_attempt)
         return '-'.join(split_resource), '-'.join(reversed(split_resource))
 
-    def _add_matches(self, endpoint: str, search: str, matches: list) -> None:
-        """Computes string distance between the search and the actual endpoint
-        for each resource in the endpoint and adds it to the matches list.
+    def _nearest(self, endpoint: str, search: str,
+                 max_score: Optional[int] = None
+                 ) -> Tuple[Optional[str], Optional[int]]:
+        """Finds the resource with the lowest OSA distance to the search."""
+        return self._indexes[endpoint].nearest(
+            search, levenshtein_osa, slack=2, max_score=max_score,
+            bounded=True
+        )
+
+    async def suggest(self, endpoint: str, query: str, session, k: int = 5,
+                      max_distance: Optional[int] = None,
+                      min_confidence: float = 0.0) -> List[Suggestion]:
+        """Returns up to `k` resources of an endpoint closest to the query,
+        best first. Resources further than `max_distance` away or with a
+        confidence below `min_confidence` are left out, so an empty list
+        means nothing is a plausible match. Only the endpoint's resource
+        list is ever requested, never the resources themselves.
+
+        ## Raises
+        `ValueError` if the endpoint is not valid.
+        """
+        self._validate_endpoint(endpoint)
+        await self._ensure_loaded(endpoint, session)
+        if query in self._loaded_endpoints[endpoint]:
+            return [Suggestion(query, 0, 1.0)]
+
+        index = self._indexes[endpoint]
+        scores = {}
+        for search in set(self._get_searches(endpoint, query)):
+            for name, distance in index.nearest_k(
+                search, k, levenshtein_osa, slack=2, max_score=max_distance,
+                bounded=True
+            ):
+                score = (distance, -confidence(search, name, distance))
+                scores[name] = min(scores.get(name, score), score)
+        ranked = sorted(scores.items(), key=lambda t: (t[1], t[0]))[:k]
+        suggestions = [
+            Suggestion(name, distance, -negative_confidence)
+            for name, (distance, negative_confidence) in ranked
+        ]
+        return [s for s in suggestions if s.confidence >= min_confidence]
+
+    def search(self, query: str, k: int = 10, max_distance: int = 2,
+               endpoints: Optional[Iterable[str]] = None) -> List[SearchHit]:
+        """Searches the names of every loaded endpoint (or only the given
+        ones) at once. Nothing gets loaded or requested, so this is cheap
+        enough to run on every keystroke; use `warm_up` or
+        `load_in_background` to load the endpoints.
         """
-        for resource in self._loaded_endpoints[endpoint]:
-            matches.append((resource, levenshtein_osa(resource, search)))
+        return self._universal.search(query, k, max_distance, endpoints)
 
     async def best_match(self, endpoint: str, resource: str, session) -> str:
         """Finds the best match for a given resource of a given endpoint."""
         self._validate_endpoint(endpoint)
-        if endpoint not in self._loaded_endpoints:
-            await self._load_endpoint(endpoint, session)
+        await self._ensure_loaded(endpoint, session)
 
         # Don't need to bother searching if it's an exact match
         if resource in self._loaded_endpoints[endpoint]:
+            session._metrics.observe_match(endpoint, False, 0.0)
             return resource
+        match = self._resolved.get((endpoint, resource))
+        if match is not None:
+            session._metrics.observe_match(
+                endpoint, True, 0.0, memoized=True
+            )
+            return match
 
-        matches = []
+        start = time.perf_counter()
         search, search_reversed = self._get_searches(endpoint, resource)
-        self._add_matches(endpoint, search, matches)
+        match, score = self._nearest(endpoint, search)
 
         # Many alt forms in PokeAPI are listed as [alt]-[name] rather than
         # [name]-[alt], i.e. shield-aegislash. So if our search is not the same
         # forwards and backwards, we'll also test the reversed search
-        if search != search_reversed:
-            self._add_matches(endpoint, search_reversed, matches)
+        if search != search_reversed and score:
+            reversed_match, reversed_score = self._nearest(
+                endpoint, search_reversed, max_score=score
+            )
+            if (
+                reversed_match is not None
+                and (reversed_score, reversed_match) < (score, match)
+            ):
+                match, score = reversed_match, reversed_score
 
-        matches.sort(key=lambda t: t[1])
-        return matches[0][0]
+        session._metrics.observe_match(
+            endpoint, True, time.perf_counter() - start
+        )
+        # Nothing to match against, so let PokéAPI decide
+        match = resource if match is None else match
+        self._resolved.put((endpoint, resource), match)
+        self._resolved_changed = True
+        return match
@@ -0,0 +1,307 @@
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from aiohttp import ClientResponseError
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    """Escapes a label value as required by the Prometheus text format."""
+    return (
+        str(value).replace('\\', r'\\').replace('"', r'\"')
+        .replace('\n', r'\n')
+    )
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ''
+    pairs = ','.join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values)
+    )
+    return '{' + pairs + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    """Base class for a metric family. Values are kept per tuple of label
+    values, in the order of `label_names`.
+    """
+
+    type_ = 'untyped'
+
+    def __init__(self, name: str, help_: str,
+                 label_names: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help_
+        self.label_names = tuple(label_names)
+        self._values = {}
+
+    def reset(self) -> None:
+        self._values.clear()
+
+    def _header(self) -> List[str]:
+        return [f'# HELP {self.name} {self.help}',
+                f'# TYPE {self.name} {self.type_}']
+
+    def samples(self) -> Dict[Labels, float]:
+        return dict(self._values)
+
+    def to_prometheus(self) -> List[str]:
+        lines = self._header()
+        for labels, value in sorted(self._values.items()):
+            lines.append(
+                f'{self.name}{_format_labels(self.label_names, labels)} '
+                f'{_format_value(value)}'
+            )
+        return lines
+
+
+class Counter(Metric):
+    """A value that only goes up."""
+
+    type_ = 'counter'
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def get(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def total(self) -> float:
+        return sum(self._values.values())
+
+
+class Gauge(Counter):
+    """A value that can go up and down."""
+
+    type_ = 'gauge'
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+
+class Histogram(Metric):
+    """Counts observations into cumulative buckets like a Prometheus
+    histogram. Bucket counts are stored per bucket and only summed up when
+    they get exported.
+    """
+
+    type_ = 'histogram'
+
+    def __init__(self, name: str, help_: str,
+                 label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        super().__init__(name, help_, label_names)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, value: float, *labels: str) -> None:
+        state = self._values.get(labels)
+        if state is None:
+            # [per-bucket counts, sum, count]
+            state = self._values[labels] = [[0] * len(self.buckets), 0.0, 0]
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+        state[2] += 1
+
+    def samples(self) -> Dict[Labels, dict]:
+        return {
+            labels: {'count': count, 'sum': sum_,
+                     'buckets': dict(zip(self.buckets,
+                                         self._cumulative(counts)))}
+            for labels, (counts, sum_, count) in self._values.items()
+        }
+
+    def quantile(self, q: float, *labels: str) -> Optional[float]:
+        """Estimates a quantile the same way Prometheus' histogram_quantile
+        does, by interpolating linearly inside the matching bucket.
+        """
+        state = self._values.get(labels)
+        if state is None or not state[2]:
+            return None
+        counts, _, count = state
+        rank = q * count
+        lower_bound = 0.0
+        seen = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            if seen + bucket_count >= rank and bucket_count:
+                if bound == float('inf'):
+                    return lower_bound
+                return lower_bound + (bound - lower_bound) * (
+                    (rank - seen) / bucket_count
+                )
+            seen += bucket_count
+            lower_bound = bound
+        return lower_bound
+
+    @staticmethod
+    def _cumulative(counts: List[int]) -> List[int]:
+        total = 0
+        cumulative = []
+        for count in counts:
+            total += count
+            cumulative.append(total)
+        return cumulative
+
+    def to_prometheus(self) -> List[str]:
+        lines = self._header()
+        names = self.label_names + ('le',)
+        for labels, (counts, sum_, count) in sorted(self._values.items()):
+            for bound, total in zip(self.buckets, self._cumulative(counts)):
+                bucket_labels = _format_labels(
+                    names, labels + (_format_value(bound),)
+                )
+                lines.append(f'{self.name}_bucket{bucket_labels} {total}')
+            label_str = _format_labels(self.label_names, labels)
+            lines.append(f'{self.name}_sum{label_str} {_format_value(sum_)}')
+            lines.append(f'{self.name}_count{label_str} {count}')
+        return lines
+
+
+class ClientMetrics:
+    """In-process metrics for a PokeAPIClientBase. Everything is plain
+    Python counters updated from the event loop, so reading them costs
+    nothing and no third-party client library is needed. Use
+    `to_prometheus` to get a text-format snapshot for a /metrics endpoint
+    and `snapshot` for a plain dict.
+    """
+
+    def __init__(self, prefix: str = 'aiokemon',
+                 buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.request_duration = Histogram(
+            f'{prefix}_request_duration_seconds',
+            'Latency of HTTP requests to PokéAPI.', ('endpoint',), buckets
+        )
+        self.in_flight = Gauge(
+            f'{prefix}_in_flight_requests',
+            'HTTP requests to PokéAPI currently in flight.'
+        )
+        self.cache_requests = Counter(
+            f'{prefix}_cache_requests_total',
+            'Cache lookups by result (hit or miss).', ('endpoint', 'result')
+        )
+        self.retries = Counter(
+            f'{prefix}_retries_total',
+            'HTTP requests retried after a 429 or 503.', ('endpoint',)
+        )
+        self.errors = Counter(
+            f'{prefix}_errors_total',
+            'Failed HTTP requests by status code or exception type.',
+            ('endpoint', 'status')
+        )
+        self.response_bytes = Counter(
+            f'{prefix}_response_bytes_total',
+            'Bytes of response bodies received from PokéAPI.', ('endpoint',)
+        )
+        self.match_duration = Histogram(
+            f'{prefix}_match_duration_seconds',
+            'Time spent fuzzy matching resource names.', ('endpoint',), buckets
+        )
+        self.not_found_hits = Counter(
+            f'{prefix}_not_found_cache_hits_total',
+            'Requests for resources that recently 404ed, answered without '
+            'a request.', ('endpoint',)
+        )
+        self.deduplicated = Counter(
+            f'{prefix}_deduplicated_requests_total',
+            'Requests that joined an identical request already in flight.',
+            ('endpoint',)
+        )
+        self.matches = Counter(
+            f'{prefix}_matches_total',
+            'Resource name lookups by kind (exact, fuzzy or memoized).',
+            ('endpoint', 'kind')
+        )
+        self.in_flight.set(0)
+
+    @property
+    def metrics(self) -> List[Metric]:
+        return [value for value in vars(self).values()
+                if isinstance(value, Metric)]
+
+    @contextmanager
+    def track_request(self, endpoint: str) -> Iterator[None]:
+        """Times a single HTTP request and keeps the in-flight gauge and
+        error counters up to date.
+        """
+        self.in_flight.inc()
+        start = time.perf_counter()
+        try:
+            yield
+        except ClientResponseError as e:
+            self.errors.inc(endpoint, str(e.status))
+            raise
+        except Exception as e:
+            self.errors.inc(endpoint, type(e).__name__)
+            raise
+        finally:
+            self.in_flight.dec()
+            self.request_duration.observe(
+                time.perf_counter() - start, endpoint
+            )
+
+    def observe_cache(self, endpoint: str, hit: bool) -> None:
+        self.cache_requests.inc(endpoint, 'hit' if hit else 'miss')
+
+    def observe_match(self, endpoint: str, fuzzy: bool, duration: float,
+                      memoized: bool = False) -> None:
+        """Counts a name lookup. Memoized lookups are fuzzy matches that
+        were answered from the matcher's memo, so they aren't timed.
+        """
+        if memoized:
+            self.matches.inc(endpoint, 'memoized')
+            return
+        self.matches.inc(endpoint, 'fuzzy' if fuzzy else 'exact')
+        if fuzzy:
+            self.match_duration.observe(duration, endpoint)
+
+    def cache_hit_ratio(self, endpoint: Optional[str] = None) -> float:
+        """Fraction of cache lookups that were hits, for one endpoint or
+        overall. Returns 0.0 if there haven't been any lookups.
+        """
+        hits = misses = 0
+        for (ep, result), count in self.cache_requests.samples().items():
+            if endpoint is not None and ep != endpoint:
+                continue
+            if result == 'hit':
+                hits += count
+            else:
+                misses += count
+        total = hits + misses
+        return hits / total if total else 0.0
+
+    def reset(self) -> None:
+        for metric in self.metrics:
+            if metric is not self.in_flight:
+                metric.reset()
+
+    def snapshot(self) -> dict:
+        """Returns every metric's current samples as a dict keyed by metric
+        name, plus the overall cache hit ratio.
+        """
+        snapshot = {metric.name: metric.samples() for metric in self.metrics}
+        snapshot['cache_hit_ratio'] = self.cache_hit_ratio()
+        return snapshot
+
+    def to_prometheus(self) -> str:
+        """Returns all metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.to_prometheus())
+        return '\n'.join(lines) + '\n'
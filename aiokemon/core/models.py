@@ -0,0 +1,301 @@
+"""
+Builds real model classes from the type-hinting classes in
+aiokemon.endpoints.*. Those classes only exist for type hints, so by default
+every object a client returns is a PokeAPIResource or PokeAPIMetaData with
+its own `__dict__`, and every key of every object gets sanitized on the fly.
+
+The classes built here instead have `__slots__` for every annotated
+attribute and a `from_dict` constructor whose source is generated and
+compiled once per class, with the raw key -> attribute table worked out
+ahead of time. Keys that PokéAPI returns but the docs don't list are still
+kept (in `_extra`), so no data is lost if the docs are out of date.
+
+```python
+>>> Model = build_model(Pokemon)
+>>> breloom = Model.from_dict(json_data)
+```
+"""
+
+import keyword
+import re
+import typing
+from typing import Any, Callable, Dict, List, Optional, Type
+
+import aiokemon.core.common as cmn
+from aiokemon.core.api import (InternPool, PokeAPIMetaData, PokeAPIResource,
+                               is_reference, new_pokeapimetadata,
+                               sanitize_attribute)
+
+_MISSING = object()
+_PRIMITIVES = {int, str, bool, float, type(None)}
+camel_case_boundary = re.compile(r'(?<!^)(?=[A-Z])')
+_models: Dict[type, type] = {}
+
+
+class PokeAPIModel:
+    """Base class of all generated model classes. Mirrors the convenience
+    functions of PokeAPIResource and PokeAPIMetaData so generated models can
+    be used the same way.
+    """
+
+    __slots__ = ('_extra',)
+    _endpoint: Optional[str] = None
+    _source: Optional[type] = None
+    _fields: tuple = ()
+    _lazy = False
+
+    def __getattr__(self, attr: str) -> Any:
+        """Only called for attributes that aren't set slots, i.e. keys that
+        aren't in the type hints or keys missing from the response.
+        """
+        if attr != '_extra' and not attr.startswith('__'):
+            extra = self._extra
+            if extra is not None and attr in extra:
+                return extra[attr]
+        raise AttributeError(
+            f"'{type(self).__name__}' object has no attribute '{attr}'"
+        )
+
+    def _set_fields(self) -> List[str]:
+        fields = []
+        for field in self._fields:
+            try:
+                getattr(self, field)
+            except AttributeError:
+                continue
+            fields.append(field)
+        return fields
+
+    def __dir__(self) -> List[str]:
+        return sorted(set(super().__dir__()) | set(self._extra or ()))
+
+    @property
+    def pokeapi_attrs(self) -> List[str]:
+        """Returns all PokéAPI attributes of the object."""
+        return sorted(set(self._set_fields()) | set(self._extra or ()))
+
+    @property
+    def is_resource(self) -> bool:
+        return bool(getattr(self, 'url', None))
+
+    as_resource = PokeAPIMetaData.as_resource
+
+    def __reduce__(self):
+        state = {field: getattr(self, field) for field in self._set_fields()}
+        return _unpickle_model, (self._source, state, self._extra)
+
+    def __str__(self) -> str:
+        name = getattr(self, 'name', None)
+        return name if isinstance(name, str) else type(self).__name__
+
+    def __repr__(self) -> str:
+        if self._endpoint is not None:
+            return f'<{self._endpoint} {getattr(self, "name", None)}>'
+        return f'<{type(self).__name__} model>'
+
+
+def _unpickle_model(source: type, state: dict, extra: Optional[dict]
+                    ) -> PokeAPIModel:
+    model = build_model(source)
+    obj = object.__new__(model)
+    for field, value in state.items():
+        setattr(obj, field, value)
+    obj._extra = extra
+    return obj
+
+
+def _wrap_extra(data: dict, known: frozenset,
+                pool: Optional[InternPool] = None) -> Optional[dict]:
+    """Sanitizes and wraps the keys of `data` that the type hints don't
+    cover.
+    """
+    extra = {}
+    for key in data.keys() - known:
+        attr = sanitize_attribute(key)
+        extra[attr] = new_pokeapimetadata(attr, data[key], pool=pool)
+    return extra
+
+
+def _immutable_setattr(self, attr: str, value: Any) -> None:
+    raise AttributeError(
+        f'{type(self).__name__} objects are shared and immutable.'
+    )
+
+
+def _immutable_delattr(self, attr: str) -> None:
+    raise AttributeError(
+        f'{type(self).__name__} objects are shared and immutable.'
+    )
+
+
+def _reference_factory(model: type) -> Callable[[dict, str], PokeAPIModel]:
+    """Makes the InternPool factory of a `{name, url}` model. Shared objects
+    get switched to an immutable subclass with the same slot layout.
+    """
+    shared_model = type(model.__name__, (model,), {
+        '__slots__': (),
+        '__module__': __name__,
+        '__setattr__': _immutable_setattr,
+        '__delattr__': _immutable_delattr,
+    })
+
+    def factory(data: dict, key: str) -> PokeAPIModel:
+        reference = model.from_dict(data)
+        reference.__class__ = shared_model
+        return reference
+
+    return factory
+
+
+def _is_model_source(hint: Any) -> bool:
+    """Whether a type hint is one of the annotated endpoint classes."""
+    return (
+        isinstance(hint, type) and hint not in _PRIMITIVES
+        and bool(typing.get_type_hints(hint))
+    )
+
+
+def _raw_key(attr: str) -> str:
+    """The scraper adds a trailing underscore to keyword attributes, so the
+    raw key is the attribute without it.
+    """
+    if attr.endswith('_') and keyword.iskeyword(attr[:-1]):
+        return attr[:-1]
+    return attr
+
+
+def _field_expr(attr: str, hint: Any, namespace: dict) -> str:
+    """Returns the source of an expression converting the raw value `v` of
+    a field into its model value.
+    """
+    if typing.get_origin(hint) in (list, List):
+        args = typing.get_args(hint)
+        inner = args[0] if args else Any
+        if _is_model_source(inner):
+            name = f'M_{len(namespace)}'
+            namespace[name] = build_model(inner)
+            return (
+                f'[{name}.from_dict(x, pool) if x.__class__ is dict else x '
+                f'for x in v] if v.__class__ is list else v'
+            )
+    elif _is_model_source(hint):
+        name = f'M_{len(namespace)}'
+        namespace[name] = build_model(hint)
+        return f'{name}.from_dict(v, pool) if v.__class__ is dict else v'
+    # Primitive or unknown hint. The docs are sometimes wrong, so anything
+    # that turns out to be a dict or list still gets wrapped.
+    return (
+        f'_wrap({attr!r}, v, False, pool) '
+        'if v.__class__ is dict or v.__class__ is list else v'
+    )
+
+
+def _compile_from_dict(model: type, hints: Dict[str, Any],
+                       is_resource: bool) -> None:
+    namespace = {
+        '_MISSING': _MISSING,
+        '_new': object.__new__,
+        '_wrap': new_pokeapimetadata,
+        '_wrap_extra': _wrap_extra,
+    }
+    lines = ['def from_dict(cls, data, pool=None):']
+    if set(hints) == {'name', 'url'}:
+        namespace['_is_reference'] = is_reference
+        namespace['_reference_factory'] = _reference_factory(model)
+        lines.append('    if pool is not None and _is_reference(data):')
+        lines.append(
+            '        return pool.reference(data, _reference_factory, None)'
+        )
+    lines.append('    self = _new(cls)')
+    lines.append('    get = data.get')
+    known = set()
+    for attr, hint in hints.items():
+        key = _raw_key(attr)
+        known.add(key)
+        expr = _field_expr(attr, hint, namespace)
+        if is_resource and attr in ('id', 'name', 'url'):
+            # PokeAPIResource always has these, even if they're None
+            lines.append(f'    v = get({key!r})')
+            lines.append(f'    self.{attr} = {expr}')
+        else:
+            lines.append(f'    v = get({key!r}, _MISSING)')
+            lines.append('    if v is not _MISSING:')
+            lines.append(f'        self.{attr} = {expr}')
+    namespace['_KNOWN'] = frozenset(known)
+    lines.append('    if data.keys() <= _KNOWN:')
+    lines.append('        self._extra = None')
+    lines.append('    else:')
+    lines.append('        self._extra = _wrap_extra(data, _KNOWN, pool)')
+    lines.append('    return self')
+    source = '\n'.join(lines)
+    exec(compile(source, f'<aiokemon model {model.__name__}>', 'exec'),
+         namespace)
+    model.from_dict = classmethod(namespace['from_dict'])
+    model._from_dict_source = source
+
+
+def build_model(source: type) -> Type[PokeAPIModel]:
+    """Builds (or returns the already-built) slotted model class for one of
+    the type-hinting classes in aiokemon.endpoints.*.
+    """
+    model = _models.get(source)
+    if model is not None:
+        return model
+    hints = dict(typing.get_type_hints(source))
+    is_resource = issubclass(source, PokeAPIResource)
+    if is_resource:
+        for attr, hint in (('id', int), ('name', str), ('url', str)):
+            hints.setdefault(attr, hint)
+    attrs = {
+        '__slots__': tuple(hints),
+        '__module__': __name__,
+        '__doc__': source.__doc__,
+        '_source': source,
+        '_fields': tuple(hints),
+    }
+    if is_resource:
+        attrs['_endpoint'] = endpoint_of(source)
+    model = type(source.__name__, (PokeAPIModel,), attrs)
+    # Register before compiling so self-referencing classes (i.e. ChainLink)
+    # find themselves instead of recursing forever
+    _models[source] = model
+    _compile_from_dict(model, hints, is_resource)
+    return model
+
+
+def endpoint_of(source: type) -> Optional[str]:
+    """Gets the endpoint of a resource class from its name, i.e.
+    `PokemonSpecies` -> `pokemon-species`.
+    """
+    endpoint = camel_case_boundary.sub('-', source.__name__).lower()
+    return endpoint if endpoint in cmn.VALID_ENDPOINTS else None
+
+
+def endpoint_models() -> Dict[str, Type[PokeAPIModel]]:
+    """Builds models for every endpoint, keyed by endpoint."""
+    import aiokemon.endpoints as endpoints
+    models = {}
+    for class_name in endpoints.__all__:
+        source = getattr(endpoints, class_name)
+        endpoint = endpoint_of(source)
+        if endpoint is not None:
+            models[endpoint] = build_model(source)
+    return models
+
+
+_endpoint_models: Dict[str, Type[PokeAPIModel]] = {}
+
+
+def model_for(endpoint: str) -> Type[PokeAPIModel]:
+    """Gets the model class of an endpoint, building all of them on first
+    use.
+
+    ## Raises
+    `ValueError` if the endpoint has no model.
+    """
+    if not _endpoint_models:
+        _endpoint_models.update(endpoint_models())
+    try:
+        return _endpoint_models[endpoint]
+    except KeyError:
+        raise ValueError(f'endpoint "{endpoint}" has no model.') from None
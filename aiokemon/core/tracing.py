@@ -0,0 +1,183 @@
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Union
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:
+    otel_trace = None
+
+
+class Span:
+    """Timing information for a single phase of a request. Phases emitted by
+    PokeAPIClientBase are:
+
+    - `match`: fuzzy matching of the resource name (`ResourceMatcher`)
+    - `cache`: the cache `has`/`get` lookup, with `cache` set to hit or miss
+    - `network`: the HTTP request and reading the response text
+    - `cache_put`: storing a fresh response in the cache
+    - `json`: `json.loads` of the response text
+    - `hydrate`: building the `PokeAPIResource` from the JSON data
+    """
+
+    __slots__ = ('name', 'endpoint', 'url', 'attributes', 'start', 'end')
+
+    def __init__(self, name: str, endpoint: Optional[str] = None,
+                 url: Optional[str] = None, **attributes: Any) -> None:
+        self.name = name
+        self.endpoint = endpoint
+        self.url = url
+        self.attributes = attributes
+        self.start = time.perf_counter()
+        self.end = None
+
+    @property
+    def duration(self) -> float:
+        """Duration of the span in seconds (so far, if it hasn't ended)."""
+        end = time.perf_counter() if self.end is None else self.end
+        return end - self.start
+
+    @property
+    def cache(self) -> Optional[str]:
+        return self.attributes.get('cache')
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'endpoint': self.endpoint,
+            'url': self.url,
+            'duration': self.duration,
+            **self.attributes
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f'<Span {self.name} {self.endpoint} {self.url} '
+            f'{self.duration * 1000:.3f}ms>'
+        )
+
+
+class _NullSpan:
+    """Stand-in span used when tracing is off so that instrumented code
+    doesn't need to check whether a tracer exists.
+    """
+
+    __slots__ = ()
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> '_NullSpan':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+_null_span = _NullSpan()
+
+
+class BaseTracer:
+    """Base class for tracers. Any tracer that inherits this class only needs
+    to implement `emit(self, span: Span)`, which is called once per finished
+    span.
+    """
+
+    def span(self, name: str, endpoint: Optional[str] = None,
+             url: Optional[str] = None, **attributes: Any):
+        return self._span(name, endpoint, url, attributes)
+
+    @contextmanager
+    def _span(self, name: str, endpoint: Optional[str], url: Optional[str],
+              attributes: Dict[str, Any]) -> Iterator[Span]:
+        span = Span(name, endpoint, url, **attributes)
+        try:
+            yield span
+        except BaseException as e:
+            span.set('error', type(e).__name__)
+            raise
+        finally:
+            span.end = time.perf_counter()
+            self.emit(span)
+
+    def emit(self, span: Span) -> None:
+        raise NotImplementedError('Tracer needs an `emit` method to work.')
+
+
+class NullTracer(BaseTracer):
+    """Tracer used when no tracing is desired. Costs one function call per
+    phase.
+    """
+
+    def span(self, *args, **kwargs) -> _NullSpan:
+        return _null_span
+
+    def emit(self, span: Span) -> None:
+        pass
+
+
+class CallbackTracer(BaseTracer):
+    """Calls `callback(span)` for every finished span."""
+
+    def __init__(self, callback: Callable[[Span], Any]) -> None:
+        self._callback = callback
+
+    def emit(self, span: Span) -> None:
+        self._callback(span)
+
+
+class OpenTelemetryTracer(BaseTracer):
+    """Reports every phase as an OpenTelemetry span named `aiokemon.<phase>`.
+    Spans are started as the current span, so they nest under whatever span
+    the caller has open. An optional callback still receives each Span.
+    Requires opentelemetry-api.
+    """
+
+    def __init__(self, tracer_provider=None,
+                 callback: Optional[Callable[[Span], Any]] = None) -> None:
+        if otel_trace is None:
+            raise NameError(
+                'Module "opentelemetry" is not available. Please install '
+                'opentelemetry-api if you would like to use '
+                'OpenTelemetryTracer.'
+            )
+        self._tracer = otel_trace.get_tracer(
+            'aiokemon', tracer_provider=tracer_provider
+        )
+        self._callback = callback
+
+    @contextmanager
+    def _span(self, name: str, endpoint: Optional[str], url: Optional[str],
+              attributes: Dict[str, Any]) -> Iterator[Span]:
+        otel_name = f'aiokemon.{name}'
+        with self._tracer.start_as_current_span(otel_name) as otel_span:
+            with super()._span(name, endpoint, url, attributes) as span:
+                span.set('_otel_span', otel_span)
+                yield span
+
+    def emit(self, span: Span) -> None:
+        otel_span = span.attributes.pop('_otel_span')
+        for key, value in span.as_dict().items():
+            if key != 'name' and value is not None:
+                otel_span.set_attribute(f'aiokemon.{key}', value)
+        if self._callback is not None:
+            self._callback(span)
+
+
+def make_tracer(tracer: Union[BaseTracer, Callable[[Span], Any], None]
+                ) -> BaseTracer:
+    """Turns whatever was passed as a client's `tracer` into a tracer: None
+    turns tracing off and a plain callable becomes a CallbackTracer.
+    """
+    if tracer is None:
+        return NullTracer()
+    if isinstance(tracer, BaseTracer):
+        return tracer
+    if callable(tracer):
+        return CallbackTracer(tracer)
+    raise TypeError(
+        f'tracer must be a BaseTracer or a callable, not {type(tracer)}.'
+    )
@@ -0,0 +1,349 @@
+"""
+A breeding graph over species and egg groups, for finding how to pass an
+egg move down to a species. Species and egg groups are numbered and joined
+by compact adjacency arrays both ways, and a breadth-first search over them
+finds the shortest breeding chain from a species that learns the move
+itself to the target.
+
+```python
+>>> breeding = BreedingGraph.from_cache(client._cache)
+>>> breeding.breeding_chain('bullet-punch', 'riolu')
+['hitmonchan', 'riolu']
+>>> breeding.partners('magnemite')
+['ditto']
+```
+"""
+
+import pickle
+from array import array
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Union
+
+from aiokemon.core.cache import BaseCache
+from aiokemon.data.common import (DATA_DIR, cached_resources, name_of,
+                                  resources_from_cache, resources_from_client)
+from aiokemon.data.learnsets import LearnsetIndex
+
+BREEDING_FILE = DATA_DIR / 'breeding.pickle'
+# Undiscovered species can't breed at all, and Ditto passes on no moves
+NO_EGGS_GROUP = 'no-eggs'
+DITTO_GROUP = 'ditto'
+DITTO = 'ditto'
+EGG_METHOD = 'egg'
+FEMALE_ONLY, GENDERLESS = 8, -1
+
+
+def _adjacency(lists: Sequence[Iterable[int]]):
+    """Packs lists of numbers into `(offsets, values)` arrays, where list
+    `i` is `values[offsets[i]:offsets[i + 1]]`.
+    """
+    offsets = array('i', [0])
+    values = array('H')
+    for numbers in lists:
+        values.extend(numbers)
+        offsets.append(len(values))
+    return offsets, values
+
+
+class BreedingGraph:
+    """Species and the egg groups they belong to, as adjacency arrays both
+    ways, plus who can breed with species other than Ditto (`can_breed`),
+    who can only breed with Ditto (`ditto_only`, i.e. genderless species)
+    and who can father a child (`can_father`) and so pass down a move.
+    Moves come from a `LearnsetIndex`, with `pokemon_species` mapping its
+    Pokémon to their species. `pre_evolutions` maps species to the species
+    they evolve from.
+
+    A father passes an egg move to a child of any species he shares an egg
+    group with, as long as that species has it as an egg move; the child's
+    mother is a female of that species, or of its evolution family for
+    babies that can't breed themselves.
+    """
+
+    def __init__(self, species: List[str], groups: List[str],
+                 species_groups: Sequence[Iterable[int]],
+                 can_breed: bytes, can_father: bytes, ditto_only: bytes,
+                 learnsets: LearnsetIndex,
+                 pokemon_species: Dict[str, str],
+                 pre_evolutions: Dict[str, str]) -> None:
+        self.species = species
+        self.groups = groups
+        self.can_breed = bytearray(can_breed)
+        self.can_father = bytearray(can_father)
+        self.ditto_only = bytearray(ditto_only)
+        self.learnsets = learnsets
+        self.pokemon_species = pokemon_species
+        self.pre_evolutions = pre_evolutions
+        self._numbers = {name: i for i, name in enumerate(species)}
+        self._evolutions: Dict[int, List[int]] = {}
+        for name, pre_evolution in pre_evolutions.items():
+            if name in self._numbers and pre_evolution in self._numbers:
+                self._evolutions.setdefault(
+                    self._numbers[pre_evolution], []
+                ).append(self._numbers[name])
+        self._species_offsets, self._species_groups = _adjacency(
+            species_groups
+        )
+        members: List[List[int]] = [[] for _ in groups]
+        for number in range(len(species)):
+            for group in self._groups_of(number):
+                members[group].append(number)
+        self._group_offsets, self._group_species = _adjacency(members)
+
+    def __len__(self) -> int:
+        return len(self.species)
+
+    def _groups_of(self, number: int):
+        return self._species_groups[
+            self._species_offsets[number]:self._species_offsets[number + 1]
+        ]
+
+    def _members_of(self, group: int):
+        return self._group_species[
+            self._group_offsets[group]:self._group_offsets[group + 1]
+        ]
+
+    @classmethod
+    def from_resources(cls, species: Iterable[dict], pokemon: Iterable[dict],
+                       learnsets: Optional[LearnsetIndex] = None
+                       ) -> 'BreedingGraph':
+        """Builds the graph from `pokemon-species` and `pokemon` JSON data.
+        The learnsets are built from the same Pokémon unless given.
+        """
+        pokemon = list(pokemon)
+        if learnsets is None:
+            learnsets = LearnsetIndex.from_resources(pokemon)
+        pokemon_species = {
+            data['name']: name_of(data.get('species'))
+            for data in pokemon
+            if data.get('name') and data.get('species')
+            and data.get('is_default', True)
+        }
+        species = sorted(
+            {data['name']: data for data in species if data.get('name')}
+            .values(),
+            key=lambda data: data.get('id') or 0
+        )
+        group_numbers: Dict[str, int] = {}
+        species_groups = []
+        can_breed = bytearray()
+        can_father = bytearray()
+        ditto_only = bytearray()
+        pre_evolutions = {}
+        for data in species:
+            groups = [name_of(group) for group in data.get('egg_groups') or ()]
+            breeds = bool(groups) and NO_EGGS_GROUP not in groups \
+                and DITTO_GROUP not in groups
+            gender_rate = data.get('gender_rate', 0)
+            can_breed.append(breeds and gender_rate != GENDERLESS)
+            can_father.append(breeds and gender_rate not in (FEMALE_ONLY,
+                                                             GENDERLESS))
+            ditto_only.append(breeds and gender_rate == GENDERLESS)
+            species_groups.append([
+                group_numbers.setdefault(group, len(group_numbers))
+                for group in groups
+            ])
+            if data.get('evolves_from_species'):
+                pre_evolutions[data['name']] = name_of(
+                    data['evolves_from_species']
+                )
+        return cls([data['name'] for data in species], list(group_numbers),
+                   species_groups, bytes(can_breed), bytes(can_father),
+                   bytes(ditto_only), learnsets, pokemon_species,
+                   pre_evolutions)
+
+    @classmethod
+    def from_cache(cls, cache: BaseCache) -> 'BreedingGraph':
+        """Builds the graph from every cached `pokemon-species` and
+        `pokemon`.
+        """
+        return cls.from_resources(
+            resources_from_cache(cache, 'pokemon-species'),
+            cached_resources(cache, 'pokemon')
+        )
+
+    @classmethod
+    async def from_client(cls, client) -> 'BreedingGraph':
+        """Builds the graph from every `pokemon-species` and `pokemon`,
+        fetched in bulk.
+        """
+        species = await resources_from_client(client, 'pokemon-species')
+        pokemon = await resources_from_client(client, 'pokemon')
+        return cls.from_resources(species, pokemon)
+
+    def save(self, file_path: Union[str, Path] = BREEDING_FILE) -> None:
+        file_path = Path(file_path)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        species_groups = [self._groups_of(i).tolist()
+                          for i in range(len(self.species))]
+        data = (self.species, self.groups, species_groups,
+                bytes(self.can_breed), bytes(self.can_father),
+                bytes(self.ditto_only),
+                (self.learnsets.names, self.learnsets.columns),
+                self.pokemon_species, self.pre_evolutions)
+        with open(file_path, 'wb') as pickle_file:
+            pickle.dump(data, pickle_file, pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, file_path: Union[str, Path] = BREEDING_FILE
+             ) -> 'BreedingGraph':
+        with open(file_path, 'rb') as pickle_file:
+            (species, groups, species_groups, can_breed, can_father,
+             ditto_only, learnsets, pokemon_species,
+             pre_evolutions) = pickle.load(pickle_file)
+        return cls(species, groups, species_groups, can_breed, can_father,
+                   ditto_only, LearnsetIndex(*learnsets), pokemon_species,
+                   pre_evolutions)
+
+    def number_of(self, species: str) -> int:
+        """## Raises
+        `ValueError` if the species isn't in the graph.
+        """
+        try:
+            return self._numbers[species]
+        except KeyError:
+            raise ValueError(
+                f'species "{species}" is not in the breeding graph.'
+            ) from None
+
+    def egg_groups(self, species: str) -> List[str]:
+        return [self.groups[group]
+                for group in self._groups_of(self.number_of(species))]
+
+    def compatible(self, first: str, second: str) -> bool:
+        """Whether two species can breed with each other, not counting
+        Ditto. Genderless species are never compatible with anything but
+        Ditto.
+        """
+        a = self.number_of(first)
+        b = self.number_of(second)
+        return bool(self.can_breed[a] and self.can_breed[b]
+                    and set(self._groups_of(a)) & set(self._groups_of(b)))
+
+    def partners(self, species: str) -> List[str]:
+        """Every other species that shares an egg group with a species.
+        Ditto breeds with any species that can breed at all, so it's only
+        listed for species that can breed with nothing else.
+        """
+        number = self.number_of(species)
+        if self.ditto_only[number]:
+            return [DITTO] if DITTO in self._numbers else []
+        if not self.can_breed[number]:
+            return []
+        found: Dict[int, None] = {}
+        for group in self._groups_of(number):
+            for other in self._members_of(group):
+                if other != number and self.can_breed[other]:
+                    found.setdefault(other)
+        return [self.species[other] for other in sorted(found)]
+
+    def _mother(self, number: int) -> Optional[int]:
+        """The species whose females lay eggs of a species: itself, or the
+        closest member of its evolution family that can breed for babies
+        that can't (i.e. pikachu for pichu). None if there's none.
+        """
+        queue = deque([number])
+        seen = {number}
+        while queue:
+            current = queue.popleft()
+            if self.can_breed[current]:
+                return current
+            for evolution in self._evolutions.get(current, ()):
+                if evolution not in seen:
+                    seen.add(evolution)
+                    queue.append(evolution)
+        return None
+
+    def _learners(self, move: str, version_group: Optional[str],
+                  egg: bool) -> Set[int]:
+        """The species numbers that learn a move as an egg move, or by any
+        other method.
+        """
+        learnsets = self.learnsets
+        numbers = set()
+        for method in learnsets.names['method']:
+            if (method == EGG_METHOD) != egg:
+                continue
+            try:
+                pokemon = learnsets.learners(move, version_group, method)
+            except ValueError:
+                # the move or version group isn't in the learnsets at all
+                return set()
+            for name in pokemon:
+                number = self._numbers.get(
+                    self.pokemon_species.get(name, name)
+                )
+                if number is not None:
+                    numbers.add(number)
+        return numbers
+
+    def breeding_chain(self, move: str, target: str,
+                       version_group: Optional[str] = None
+                       ) -> Optional[List[str]]:
+        """The shortest chain of species that passes a move down to a
+        target species, starting from one that learns it by other means
+        than breeding, i.e. `['hitmonchan', 'riolu']`. Each species
+        fathers the next one; the target's mother is of its own species or,
+        for babies that can't breed, of its evolution family. Returns
+        `[target]` if the target learns the move itself and None if the
+        move can't be bred onto it (which includes genderless species,
+        since Ditto passes on no moves).
+        """
+        goal = self.number_of(target)
+        sources = self._learners(move, version_group, egg=False)
+        if goal in sources:
+            return [target]
+        carriers = self._learners(move, version_group, egg=True)
+        mother = self._mother(goal)
+        if goal not in carriers or mother is None:
+            return None
+        goal_groups = set(self._groups_of(mother))
+
+        # Breadth-first from every source at once, so the first father that
+        # shares an egg group with the mother ends the shortest chain. Each
+        # egg group is expanded once, since everyone in it is reached at the
+        # same depth
+        parents: Dict[int, int] = {}
+        queue = deque()
+        for source in sorted(sources):
+            if self.can_father[source]:
+                parents[source] = -1
+                queue.append(source)
+        expanded = set()
+        while queue:
+            father = queue.popleft()
+            if goal_groups.intersection(self._groups_of(father)):
+                chain = [father]
+                while parents[chain[-1]] >= 0:
+                    chain.append(parents[chain[-1]])
+                return [self.species[i] for i in reversed(chain)] + [target]
+            for group in self._groups_of(father):
+                if group in expanded:
+                    continue
+                expanded.add(group)
+                for child in self._members_of(group):
+                    if child in parents or child not in carriers \
+                            or not self.can_father[child]:
+                        continue
+                    parents[child] = father
+                    queue.append(child)
+        return None
+
+    def fathers(self, move: str, target: str,
+                version_group: Optional[str] = None) -> List[str]:
+        """Every species that can pass a move to a target directly, because
+        it learns the move by other means than breeding and shares an egg
+        group with the target's mother.
+        """
+        mother = self._mother(self.number_of(target))
+        if mother is None:
+            return []
+        groups = set(self._groups_of(mother))
+        return [
+            self.species[number]
+            for number in sorted(self._learners(move, version_group,
+                                                egg=False))
+            if self.can_father[number]
+            and groups & set(self._groups_of(number))
+        ]
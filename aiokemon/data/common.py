@@ -0,0 +1,108 @@
+"""
+Shared helpers for the precomputed indexes in aiokemon.data. Every index is
+built from plain PokéAPI JSON data, which can come from a cache (so building
+never touches the network) or from a client's bulk fetcher, and can be saved
+to and loaded from a file under `DATA_DIR`.
+"""
+
+import json
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from aiokemon.core.cache import BASE_CACHE_DIR, BaseCache
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DATA_DIR = BASE_CACHE_DIR / 'data'
+ROMAN_NUMERALS = {'i': 1, 'v': 5, 'x': 10}
+trailing_id = re.compile(r'/(\d+)/?$')
+
+
+def require_numpy(feature: str) -> None:
+    """## Raises
+    `NameError` if NumPy isn't installed.
+    """
+    if np is None:
+        raise NameError(
+            'Module "numpy" is not available. Please install it if you would '
+            f'like to use {feature}.'
+        )
+
+
+def id_from_url(url: str) -> Optional[int]:
+    """Gets the id at the end of a resource URL, i.e.
+    `https://pokeapi.co/api/v2/type/10/` -> `10`.
+    """
+    match = trailing_id.search(url or '')
+    return int(match.group(1)) if match else None
+
+
+def generation_number(name: str) -> int:
+    """Turns a generation name into its number, i.e. `generation-iv` -> `4`.
+
+    ## Raises
+    `ValueError` if the name doesn't end in a roman numeral.
+    """
+    numeral = name.rsplit('-', 1)[-1].lower()
+    if not numeral or any(char not in ROMAN_NUMERALS for char in numeral):
+        raise ValueError(f'"{name}" is not a generation name.')
+    total = 0
+    for i, char in enumerate(numeral):
+        value = ROMAN_NUMERALS[char]
+        if i + 1 < len(numeral) and ROMAN_NUMERALS[numeral[i + 1]] > value:
+            total -= value
+        else:
+            total += value
+    return total
+
+
+def name_of(resource: Optional[Dict[str, Any]]) -> Optional[str]:
+    """The name of a `{name, url}` reference, or None."""
+    return resource.get('name') if resource else None
+
+
+def is_listing(data: Any) -> bool:
+    """Whether some JSON data is an endpoint listing rather than a
+    resource.
+    """
+    return isinstance(data, dict) and 'results' in data and 'count' in data
+
+
+def cached_resources(cache: BaseCache, endpoint: str) -> Iterator[dict]:
+    """Yields the JSON data of every cached resource of an endpoint, skipping
+    listings.
+
+    ## Raises
+    `NotImplementedError` if the cache has no `values` method.
+    """
+    for text in cache.values(endpoint):
+        data = json.loads(text)
+        if isinstance(data, dict) and not is_listing(data):
+            yield data
+
+
+def unique_by_id(resources: Iterable[dict]) -> List[dict]:
+    """A resource can be cached under both its name and its id, so this
+    keeps one copy of each, sorted by id.
+    """
+    by_id = {}
+    for data in resources:
+        key = data.get('id', data.get('name'))
+        by_id.setdefault(key, data)
+    return sorted(by_id.values(), key=lambda d: (d.get('id') or 0))
+
+
+def resources_from_cache(cache: BaseCache, endpoint: str) -> List[dict]:
+    return unique_by_id(cached_resources(cache, endpoint))
+
+
+async def resources_from_client(client, endpoint: str,
+                                concurrency: Optional[int] = None
+                                ) -> List[dict]:
+    """Gets every resource of an endpoint with the client's bulk fetcher."""
+    kwargs = {} if concurrency is None else {'concurrency': concurrency}
+    return unique_by_id(await client.get_all_json(endpoint, **kwargs))
+
@@ -0,0 +1,291 @@
+"""
+Type coverage search. Every attacking type's super-effective matchups are a
+bitset over the defending types (or every typing Pokémon actually have), so
+a move set's coverage is the OR of its types' bitsets and a team's is the OR
+of its members'. Branch and bound then finds the k moves or k members that
+cover the most.
+
+```python
+>>> coverage = CoverageOptimizer.from_cache(client._cache)
+>>> coverage.coverage(['ground', 'ice']).covered
+9
+>>> coverage.best_types(k=2).picks
+('fighting', 'ice')
+>>> chomp = CoverageOptimizer(coverage.chart, coverage.targets, {'garchomp': {
+...     'ground': 'earthquake', 'dragon': 'draco-meteor', 'fire': 'fire-blast',
+...     'steel': 'iron-head', 'rock': 'stone-edge'}})
+>>> chomp.best_moves('garchomp', k=4).picks
+('earthquake', 'fire-blast', 'stone-edge', 'iron-head')
+```
+"""
+
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from aiokemon.core.cache import BaseCache
+from aiokemon.data.common import (name_of, require_numpy,
+                                  resources_from_cache,
+                                  resources_from_client)
+from aiokemon.data.type_chart import Generation, TypeChart
+
+
+class Coverage(NamedTuple):
+    """The picked types, moves or Pokémon, how many defending types or
+    typings they hit super-effectively out of `total`, and the ones they
+    don't.
+    """
+    picks: Tuple[str, ...]
+    covered: int
+    total: int
+    uncovered: Tuple[str, ...]
+
+
+def popcount(bits: int) -> int:
+    return bin(bits).count('1')
+
+
+def undominated(bitsets: Iterable[int]) -> List[int]:
+    """The distinct nonzero bitsets that aren't a subset of another one, most
+    bits first. Only those can be part of a best cover.
+    """
+    unique = sorted({bits for bits in bitsets if bits},
+                    key=popcount, reverse=True)
+    kept: List[int] = []
+    for bits in unique:
+        if not any(bits | other == other for other in kept):
+            kept.append(bits)
+    return kept
+
+
+def best_cover(bitsets: Sequence[int], k: int) -> Tuple[int, ...]:
+    """The indexes of at most `k` bitsets whose union has the most bits.
+    Depth-first branch and bound: a branch is dropped as soon as even its
+    best possible remaining picks (each remaining bitset's new bits, the
+    largest first) can't beat the best cover so far. Ties go to the cover
+    found first, which favors bitsets with more bits and lower indexes.
+    """
+    order = sorted(range(len(bitsets)), key=lambda i: -popcount(bitsets[i]))
+    candidates = [bitsets[i] for i in order]
+    full = 0
+    for bits in candidates:
+        full |= bits
+    target = popcount(full)
+    best_count = -1
+    best_picks: Tuple[int, ...] = ()
+
+    def search(start: int, picks: Tuple[int, ...], covered: int) -> bool:
+        nonlocal best_count, best_picks
+        count = popcount(covered)
+        if count > best_count:
+            best_count, best_picks = count, picks
+            if count == target:
+                return True
+        remaining = k - len(picks)
+        if not remaining or start == len(candidates):
+            return False
+        gains = sorted((popcount(bits & ~covered)
+                        for bits in candidates[start:]), reverse=True)
+        if count + sum(gains[:remaining]) <= best_count:
+            return False
+        for i in range(start, len(candidates)):
+            new = candidates[i] & ~covered
+            if new and search(i + 1, picks + (i,), covered | new):
+                return True
+        return False
+
+    search(0, (), 0)
+    return tuple(order[i] for i in best_picks)
+
+
+class CoverageOptimizer:
+    """Super-effective coverage of the attacking types in `chart` against
+    `targets`, the defending typings (as tuples of one or two types).
+
+    `learnable[pokemon]` maps each attacking type a Pokémon can learn a
+    damaging move of to its strongest such move.
+    """
+
+    def __init__(self, chart: TypeChart, targets: Sequence[Tuple[str, ...]],
+                 learnable: Dict[str, Dict[str, str]],
+                 generation: Generation = None) -> None:
+        require_numpy('CoverageOptimizer')
+        self.chart = chart
+        self.targets = [tuple(target) for target in targets]
+        self.learnable = learnable
+        self.generation = generation
+        multipliers = chart.team_multipliers(self.targets, generation)
+        self._hits = {}
+        for attack, row in zip(chart.types, multipliers):
+            bits = 0
+            for j, multiplier in enumerate(row):
+                if multiplier > 1:
+                    bits |= 1 << j
+            self._hits[attack] = bits
+        # the best coverage of each set of learnable types, by moves per
+        # member, for team searches
+        self._member_covers: Dict[tuple, Tuple[Tuple[str, ...], int]] = {}
+
+    @classmethod
+    def from_resources(cls, moves: Iterable[dict], pokemon: Iterable[dict],
+                       chart: TypeChart, generation: Generation = None,
+                       typings: bool = False) -> 'CoverageOptimizer':
+        """Builds the optimizer from `move` and `pokemon` JSON data and a
+        type chart. With `typings`, the targets are every typing the Pokémon
+        have (i.e. `('water', 'ground')`) instead of the single types.
+        """
+        move_data = {}
+        for move in moves:
+            power = move.get('power') or 0
+            damage_class = name_of(move.get('damage_class'))
+            move_type = name_of(move.get('type'))
+            if power and damage_class != 'status' \
+                    and move_type in chart.types:
+                move_data[move['name']] = (move_type, power)
+        learnable: Dict[str, Dict[str, str]] = {}
+        pokemon_typings = set()
+        for data in pokemon:
+            name = data.get('name')
+            if not name or name in learnable:
+                continue
+            strongest: Dict[str, Tuple[int, str]] = {}
+            for entry in data.get('moves') or ():
+                move = name_of(entry.get('move'))
+                if move not in move_data:
+                    continue
+                move_type, power = move_data[move]
+                if (power, move) > strongest.get(move_type, (0, '')):
+                    strongest[move_type] = (power, move)
+            learnable[name] = {move_type: move for move_type, (_, move)
+                               in strongest.items()}
+            types = sorted(data.get('types') or (),
+                           key=lambda entry: entry.get('slot') or 0)
+            typing = tuple(name_of(entry['type']) for entry in types)
+            if typing and all(t in chart.types for t in typing):
+                pokemon_typings.add(typing)
+        if typings:
+            targets = sorted(pokemon_typings)
+        else:
+            targets = [(name,) for name in chart.types_in(generation)]
+        return cls(chart, targets, learnable, generation)
+
+    @classmethod
+    def from_cache(cls, cache: BaseCache, generation: Generation = None,
+                   typings: bool = False) -> 'CoverageOptimizer':
+        """Builds the optimizer from every cached `move`, `pokemon` and
+        `type`.
+        """
+        return cls.from_resources(resources_from_cache(cache, 'move'),
+                                  resources_from_cache(cache, 'pokemon'),
+                                  TypeChart.from_cache(cache), generation,
+                                  typings)
+
+    @classmethod
+    async def from_client(cls, client, generation: Generation = None,
+                          typings: bool = False) -> 'CoverageOptimizer':
+        """Builds the optimizer from every `move`, `pokemon` and `type`,
+        fetched in bulk.
+        """
+        moves = await resources_from_client(client, 'move')
+        pokemon = await resources_from_client(client, 'pokemon')
+        return cls.from_resources(moves, pokemon,
+                                  await TypeChart.from_client(client),
+                                  generation, typings)
+
+    def hits(self, attack: str) -> int:
+        """The bitset of targets an attacking type hits super-effectively.
+
+        ## Raises
+        `ValueError` if the type doesn't exist.
+        """
+        try:
+            return self._hits[attack]
+        except KeyError:
+            raise ValueError(f'type "{attack}" does not exist.') from None
+
+    def _result(self, picks: Iterable[str], covered: int) -> Coverage:
+        uncovered = tuple(
+            '/'.join(target) for j, target in enumerate(self.targets)
+            if not covered >> j & 1
+        )
+        return Coverage(tuple(picks), popcount(covered), len(self.targets),
+                        uncovered)
+
+    def coverage(self, attacks: Iterable[str]) -> Coverage:
+        """The coverage of a set of attacking types."""
+        attacks = list(attacks)
+        covered = 0
+        for attack in attacks:
+            covered |= self.hits(attack)
+        return self._result(attacks, covered)
+
+    def _best_types(self, types: Sequence[str],
+                    k: int) -> Tuple[Tuple[str, ...], int]:
+        """The best `k` of some attacking types and their coverage bitset.
+        Types that only hit a subset of what another type hits are never
+        needed, so they're dropped before the search.
+        """
+        by_bits: Dict[int, str] = {}
+        for attack in types:
+            by_bits.setdefault(self.hits(attack), attack)
+        candidates = undominated(by_bits)
+        picks = tuple(by_bits[candidates[i]]
+                      for i in best_cover(candidates, k))
+        covered = 0
+        for attack in picks:
+            covered |= self._hits[attack]
+        return picks, covered
+
+    def best_types(self, k: int = 4,
+                   types: Optional[Iterable[str]] = None) -> Coverage:
+        """The `k` attacking types (out of every type, or the given ones)
+        that together hit the most targets super-effectively.
+        """
+        types = list(self.chart.types if types is None else types)
+        return self._result(*self._best_types(types, k))
+
+    def _learnable(self, pokemon: str) -> Dict[str, str]:
+        """## Raises
+        `ValueError` if the Pokémon isn't in the optimizer.
+        """
+        try:
+            return self.learnable[pokemon]
+        except KeyError:
+            raise ValueError(
+                f'pokemon "{pokemon}" is not in the coverage optimizer.'
+            ) from None
+
+    def best_moves(self, pokemon: str, k: int = 4) -> Coverage:
+        """The `k` damaging moves a Pokémon can learn with the best
+        coverage, i.e. its strongest move of each of the best `k` attacking
+        types it can learn.
+        """
+        learnable = self._learnable(pokemon)
+        types, covered = self._best_types(sorted(learnable), k)
+        return self._result((learnable[t] for t in types), covered)
+
+    def _member_cover(self, pokemon: str,
+                      moves_per_member: int) -> Tuple[Tuple[str, ...], int]:
+        types = tuple(sorted(self._learnable(pokemon)))
+        key = (types, moves_per_member)
+        if key not in self._member_covers:
+            self._member_covers[key] = self._best_types(types,
+                                                        moves_per_member)
+        return self._member_covers[key]
+
+    def best_team(self, k: int = 6, pool: Optional[Iterable[str]] = None,
+                  moves_per_member: int = 4) -> Coverage:
+        """The `k` Pokémon (out of every Pokémon, or the given ones) whose
+        best `moves_per_member` moves together hit the most targets
+        super-effectively. Pokémon that cover the same targets are
+        interchangeable, so the first one (alphabetically) is picked.
+        """
+        by_bits: Dict[int, str] = {}
+        for pokemon in sorted(self.learnable if pool is None else pool):
+            _, covered = self._member_cover(pokemon, moves_per_member)
+            by_bits.setdefault(covered, pokemon)
+        candidates = undominated(by_bits)
+        picks = tuple(by_bits[candidates[i]]
+                      for i in best_cover(candidates, k))
+        covered = 0
+        for pokemon in picks:
+            covered |= self._member_cover(pokemon, moves_per_member)[1]
+        return self._result(picks, covered)
@@ -0,0 +1,283 @@
+"""
+A vectorized damage calculator. Move power, damage class and type, every
+Pokémon's typing and base stats and the type chart are precomputed into
+arrays, so damage ranges for whole matrices of attacker x defender x move
+matchups are computed in one NumPy pass, entirely from cached data.
+
+```python
+>>> damage = DamageCalculator.from_cache(client._cache)
+>>> damage.damage('garchomp', 'blissey', 'earthquake', level=100)
+(array(568), array(669))
+>>> low, high = damage.matchups(['garchomp', 'dragonite'],
+...                             ['blissey', 'skarmory'],
+...                             ['earthquake', 'outrage'])
+>>> high.shape
+(2, 2, 2)
+```
+"""
+
+from pathlib import Path
+from typing import Iterable, Sequence, Tuple, Union
+
+from aiokemon.core.cache import BaseCache
+from aiokemon.data.common import (DATA_DIR, generation_number, name_of, np,
+                                  require_numpy, resources_from_cache,
+                                  resources_from_client)
+from aiokemon.data.stat_calculator import MAX_IV, StatCalculator
+from aiokemon.data.stats import StatMatrix
+from aiokemon.data.type_chart import Generation, TypeChart
+
+DAMAGE_FILE = DATA_DIR / 'damage.npz'
+STATUS, PHYSICAL, SPECIAL = 0, 1, 2
+DAMAGE_CLASSES = {'status': STATUS, 'physical': PHYSICAL, 'special': SPECIAL}
+# damage is multiplied by a random roll between 85% and 100%
+MIN_ROLL, MAX_ROLL = 85, 100
+# critical hits did double damage before generation VI
+HALF_CRITICAL_GENERATION = 6
+Names = Union[str, Sequence[str], object]
+
+
+class DamageCalculator:
+    """Damage with the formula used since generation V, modifiers applied
+    in the games' order: critical hit, random roll, STAB and type
+    effectiveness. Abilities, items, weather and stat stages are left out.
+
+    Every Pokémon's stats are computed from its base stats at the given
+    level with neutral natures, unless the actual attacking and defending
+    stats are passed in.
+    """
+
+    def __init__(self, moves: Sequence[str], power, damage_classes,
+                 move_types, stats: StatMatrix, first_types, second_types,
+                 chart: TypeChart) -> None:
+        require_numpy('DamageCalculator')
+        self.moves = list(moves)
+        self.power = np.asarray(power, dtype=np.int32)
+        self.damage_classes = np.asarray(damage_classes, dtype=np.int8)
+        self.move_types = np.asarray(move_types, dtype=np.intp)
+        self.stats = stats
+        self.first_types = np.asarray(first_types, dtype=np.intp)
+        self.second_types = np.asarray(second_types, dtype=np.intp)
+        self.chart = chart
+        self._move_index = {name: i for i, name in enumerate(self.moves)}
+        self._calculator = StatCalculator.neutral()
+        self._columns = [stats.stats.index(stat)
+                         for stat in self._calculator.stats]
+        stat_index = {stat: i for i, stat in enumerate(self._calculator.stats)}
+        self._hp = stat_index['hp']
+        self._attack = stat_index['attack']
+        self._special_attack = stat_index['special-attack']
+        self._defense = stat_index['defense']
+        self._special_defense = stat_index['special-defense']
+
+    @classmethod
+    def from_resources(cls, moves: Iterable[dict], pokemon: Iterable[dict],
+                       chart: TypeChart) -> 'DamageCalculator':
+        """Builds the calculator from `move` and `pokemon` JSON data and a
+        type chart. Types the chart doesn't have (i.e. `shadow`) are
+        neutral.
+        """
+        require_numpy('DamageCalculator')
+        moves = sorted(
+            {move['name']: move for move in moves if move.get('name')}
+            .values(),
+            key=lambda move: move.get('id') or 0
+        )
+        type_index = {name: i for i, name in enumerate(chart.types)}
+
+        def index_of(type_name):
+            return type_index.get(type_name, chart.NONE)
+
+        pokemon = list(pokemon)
+        stats = StatMatrix.from_resources(pokemon)
+        typings = {}
+        for data in pokemon:
+            types = sorted(data.get('types') or (),
+                           key=lambda entry: entry.get('slot') or 0)
+            typings.setdefault(
+                data.get('name'), [name_of(entry['type']) for entry in types]
+            )
+        first_types = []
+        second_types = []
+        for name in stats.pokemon:
+            types = typings[name] + [None, None]
+            first_types.append(index_of(types[0]))
+            second_types.append(index_of(types[1]))
+        return cls(
+            [move['name'] for move in moves],
+            [move.get('power') or 0 for move in moves],
+            [DAMAGE_CLASSES.get(name_of(move.get('damage_class')), STATUS)
+             for move in moves],
+            [index_of(name_of(move.get('type'))) for move in moves],
+            stats, first_types, second_types, chart
+        )
+
+    @classmethod
+    def from_cache(cls, cache: BaseCache) -> 'DamageCalculator':
+        """Builds the calculator from every cached `move`, `pokemon` and
+        `type`, without any requests.
+        """
+        return cls.from_resources(resources_from_cache(cache, 'move'),
+                                  resources_from_cache(cache, 'pokemon'),
+                                  TypeChart.from_cache(cache))
+
+    @classmethod
+    async def from_client(cls, client) -> 'DamageCalculator':
+        """Builds the calculator from every `move`, `pokemon` and `type`,
+        fetched in bulk.
+        """
+        moves = await resources_from_client(client, 'move')
+        pokemon = await resources_from_client(client, 'pokemon')
+        return cls.from_resources(moves, pokemon,
+                                  await TypeChart.from_client(client))
+
+    def save(self, file_path: Union[str, Path] = DAMAGE_FILE) -> None:
+        file_path = Path(file_path)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            file_path, moves=np.array(self.moves), power=self.power,
+            damage_classes=self.damage_classes, move_types=self.move_types,
+            pokemon=np.array(self.stats.pokemon),
+            stats=np.array(self.stats.stats), values=self.stats.values,
+            first_types=self.first_types, second_types=self.second_types,
+            types=np.array(self.chart.types), charts=self.chart.charts,
+            introduced=self.chart.introduced
+        )
+
+    @classmethod
+    def load(cls, file_path: Union[str, Path] = DAMAGE_FILE
+             ) -> 'DamageCalculator':
+        require_numpy('DamageCalculator')
+        with np.load(file_path, allow_pickle=False) as data:
+            stats = StatMatrix(data['pokemon'].tolist(),
+                               data['stats'].tolist(), data['values'])
+            chart = TypeChart(data['types'].tolist(), data['charts'],
+                              data['introduced'])
+            return cls(data['moves'].tolist(), data['power'],
+                       data['damage_classes'], data['move_types'], stats,
+                       data['first_types'], data['second_types'], chart)
+
+    def move_index(self, move: str) -> int:
+        """## Raises
+        `ValueError` if the move isn't in the calculator.
+        """
+        try:
+            return self._move_index[move]
+        except KeyError:
+            raise ValueError(
+                f'move "{move}" is not in the damage calculator.'
+            ) from None
+
+    @staticmethod
+    def _encode(names: Names, index_of):
+        """Turns a name, a list of names or an index array into an index
+        array.
+        """
+        if isinstance(names, str):
+            return np.asarray(index_of(names))
+        names = np.asarray(names)
+        if names.dtype.kind in 'US':
+            return np.vectorize(index_of, otypes=[np.intp])(names)
+        return names.astype(np.intp)
+
+    def encode_pokemon(self, pokemon: Names):
+        return self._encode(pokemon, self.stats.index_of)
+
+    def encode_moves(self, moves: Names):
+        return self._encode(moves, self.move_index)
+
+    def _battle_stats(self, pokemon, level, ivs, evs):
+        base = self.stats.values[pokemon][..., self._columns]
+        return self._calculator.calculate(base, level, ivs, evs)
+
+    def rolls(self, attackers: Names, defenders: Names, moves: Names,
+              level=50, defender_level=None, critical: bool = False,
+              generation: Generation = None, ivs=MAX_IV, evs=0,
+              attack=None, defense=None):
+        """Every possible damage roll, with one more axis (of 16 rolls,
+        lowest first) than the broadcast attackers, defenders and moves.
+
+        `attack` and `defense` override the attacking and defending stats
+        (i.e. computed by a `StatCalculator` with natures), and must
+        broadcast against the matchups. Status moves, moves without a fixed
+        power and immune defenders take 0 damage.
+        """
+        attackers = self.encode_pokemon(attackers)
+        defenders = self.encode_pokemon(defenders)
+        moves = self.encode_moves(moves)
+        if defender_level is None:
+            defender_level = level
+        physical = self.damage_classes[moves] == PHYSICAL
+        if attack is None:
+            attacker_stats = self._battle_stats(attackers, level, ivs, evs)
+            attack = np.where(physical, attacker_stats[..., self._attack],
+                              attacker_stats[..., self._special_attack])
+        if defense is None:
+            defender_stats = self._battle_stats(defenders, defender_level,
+                                                ivs, evs)
+            defense = np.where(
+                physical, defender_stats[..., self._defense],
+                defender_stats[..., self._special_defense]
+            )
+        power = self.power[moves]
+        level = np.asarray(level, dtype=np.int64)
+        base = ((2 * level // 5 + 2) * power * np.asarray(attack, np.int64)
+                // np.maximum(defense, 1) // 50 + 2)
+        if critical:
+            if isinstance(generation, str):
+                generation = generation_number(generation)
+            if generation is not None \
+                    and generation < HALF_CRITICAL_GENERATION:
+                base = base * 2
+            else:
+                base = base * 3 // 2
+        damage = base[..., None] * np.arange(MIN_ROLL, MAX_ROLL + 1) // 100
+
+        move_types = self.move_types[moves]
+        stab = (move_types != self.chart.NONE) & (
+            (move_types == self.first_types[attackers])
+            | (move_types == self.second_types[attackers])
+        )
+        damage = np.where(stab[..., None], damage * 3 // 2, damage)
+        effectiveness = self.chart.lookup(
+            move_types, self.first_types[defenders],
+            self.second_types[defenders], generation
+        )[..., None]
+        damage = np.floor(damage * effectiveness).astype(np.int64)
+        hits = (power > 0) & (self.damage_classes[moves] != STATUS)
+        return np.where(hits[..., None] & (effectiveness > 0),
+                        np.maximum(damage, 1), 0)
+
+    def damage(self, attackers: Names, defenders: Names, moves: Names,
+               **kwargs) -> Tuple[object, object]:
+        """The lowest and highest damage of every matchup, as two arrays
+        in the broadcast shape of the attackers, defenders and moves. Takes
+        the same keyword arguments as `rolls`.
+        """
+        rolls = self.rolls(attackers, defenders, moves, **kwargs)
+        return rolls[..., 0], rolls[..., -1]
+
+    def matchups(self, attackers: Sequence[str], defenders: Sequence[str],
+                 moves: Sequence[str], **kwargs) -> Tuple[object, object]:
+        """Like `damage`, for every combination of the attackers,
+        defenders and moves, as `(attackers, defenders, moves)` arrays.
+        """
+        attackers = self.encode_pokemon(attackers)[:, None, None]
+        defenders = self.encode_pokemon(defenders)[None, :, None]
+        moves = self.encode_moves(moves)[None, None, :]
+        return self.damage(attackers, defenders, moves, **kwargs)
+
+    def percentages(self, attackers: Names, defenders: Names, moves: Names,
+                    **kwargs) -> Tuple[object, object]:
+        """Like `damage`, as percentages of the defenders' HP (computed the
+        same way as their defending stats).
+        """
+        low, high = self.damage(attackers, defenders, moves, **kwargs)
+        level = kwargs.get('defender_level')
+        if level is None:
+            level = kwargs.get('level', 50)
+        hp = self._battle_stats(
+            self.encode_pokemon(defenders), level,
+            kwargs.get('ivs', MAX_IV), kwargs.get('evs', 0)
+        )[..., self._hp]
+        return 100 * low / hp, 100 * high / hp
@@ -0,0 +1,287 @@
+"""
+An index of where and how to catch every Pokémon in every version, built
+from `location-area` resources (`LocationArea.pokemon_encounters`). The raw
+encounter slots are kept, and the chance of finding each Pokémon is
+precomputed per area and rolled up to locations and regions.
+
+```python
+>>> encounters = EncounterIndex.from_cache(client._cache)
+>>> encounters.locations('pikachu', 'red')[0]
+EncounterRate(place='viridian-forest', min_level=3, max_level=5, chance=5,
+rates={'walk': 5}, levels={'walk': (3, 5)})
+>>> encounters.pokemon_in('viridian-forest', 'red')
+['caterpie', 'metapod', 'weedle', 'kakuna', 'pikachu']
+```
+"""
+
+import pickle
+from pathlib import Path
+from typing import (Dict, Iterable, List, NamedTuple, Optional, Tuple,
+                    Union)
+
+from aiokemon.core.cache import BaseCache
+from aiokemon.data.common import (DATA_DIR, name_of, resources_from_cache,
+                                  resources_from_client)
+
+ENCOUNTERS_FILE = DATA_DIR / 'encounters.pickle'
+MAX_CHANCE = 100
+
+
+class EncounterSlot(NamedTuple):
+    """One `Encounter` of a Pokémon in a version."""
+    area: str
+    method: str
+    min_level: int
+    max_level: int
+    conditions: Tuple[str, ...]
+    chance: int
+
+
+class EncounterRate(NamedTuple):
+    """Every encounter of a Pokémon in an area, location or region. `rates`
+    is the chance of each method and `chance` the best of them, and `levels`
+    the level range of each method.
+    """
+    place: str
+    min_level: int
+    max_level: int
+    chance: int
+    rates: Dict[str, int]
+    levels: Dict[str, Tuple[int, int]]
+
+
+def method_rates(slots: Iterable[EncounterSlot]) -> Dict[str, int]:
+    """The chance of meeting a Pokémon with each method in one area. Slots
+    with the same conditions add up, but different conditions (i.e. times
+    of day or a swarm) are alternatives, so each method's rate is that of
+    its best set of conditions.
+    """
+    totals: Dict[Tuple[str, Tuple[str, ...]], int] = {}
+    for slot in slots:
+        key = (slot.method, slot.conditions)
+        totals[key] = totals.get(key, 0) + slot.chance
+    rates: Dict[str, int] = {}
+    for (method, _), chance in totals.items():
+        rates[method] = min(max(rates.get(method, 0), chance), MAX_CHANCE)
+    return rates
+
+
+def _merge_levels(levels: Dict[str, Tuple[int, int]], method: str,
+                  min_level: int, max_level: int) -> None:
+    low, high = levels.get(method, (min_level, max_level))
+    levels[method] = (min(low, min_level), max(high, max_level))
+
+
+def _rate(place: str, rates: Dict[str, int],
+          levels: Dict[str, Tuple[int, int]]) -> EncounterRate:
+    return EncounterRate(
+        place,
+        min(low for low, _ in levels.values()),
+        max(high for _, high in levels.values()),
+        max(rates.values(), default=0),
+        rates,
+        levels
+    )
+
+
+def roll_up(place: str, rates: Iterable[EncounterRate]) -> EncounterRate:
+    """Combines the rates of several places into the rate of the place that
+    holds them. Each method's rate is that of the best place to use it.
+    """
+    combined: Dict[str, int] = {}
+    levels: Dict[str, Tuple[int, int]] = {}
+    for rate in rates:
+        for method, chance in rate.rates.items():
+            combined[method] = max(combined.get(method, 0), chance)
+            _merge_levels(levels, method, *rate.levels[method])
+    return _rate(place, combined, levels)
+
+
+def _best_first(rates: Iterable[EncounterRate]) -> List[EncounterRate]:
+    return sorted(rates, key=lambda rate: (-rate.chance, rate.place))
+
+
+class EncounterIndex:
+    """Encounter slots keyed by `(pokemon, version)`, with the precomputed
+    rates of each area, location and region. Regions are only known for
+    locations whose `location` resource was given.
+    """
+
+    def __init__(self, slots: Dict[Tuple[str, str], List[EncounterSlot]],
+                 area_locations: Dict[str, str],
+                 location_regions: Dict[str, str]) -> None:
+        self.slots = slots
+        self.area_locations = area_locations
+        self.location_regions = location_regions
+        self._areas: Dict[Tuple[str, str], List[EncounterRate]] = {}
+        self._locations: Dict[Tuple[str, str], List[EncounterRate]] = {}
+        self._regions: Dict[Tuple[str, str], List[EncounterRate]] = {}
+        self._versions: Dict[str, List[str]] = {}
+        # (place, version) -> pokemon, for areas and locations alike
+        self._inhabitants: Dict[Tuple[str, str], Dict[str, None]] = {}
+        for key, pokemon_slots in slots.items():
+            self._precompute(key, pokemon_slots)
+        for versions in self._versions.values():
+            versions.sort()
+
+    def _precompute(self, key: Tuple[str, str],
+                    pokemon_slots: List[EncounterSlot]) -> None:
+        pokemon, version = key
+        self._versions.setdefault(pokemon, []).append(version)
+        by_area: Dict[str, List[EncounterSlot]] = {}
+        for slot in pokemon_slots:
+            by_area.setdefault(slot.area, []).append(slot)
+        areas = []
+        for area, area_slots in by_area.items():
+            levels: Dict[str, Tuple[int, int]] = {}
+            for slot in area_slots:
+                _merge_levels(levels, slot.method, slot.min_level,
+                              slot.max_level)
+            areas.append(_rate(area, method_rates(area_slots), levels))
+            self._inhabitants.setdefault(
+                (area, version), {}
+            ).setdefault(pokemon)
+
+        by_location: Dict[str, List[EncounterRate]] = {}
+        for rate in areas:
+            location = self.area_locations.get(rate.place)
+            if location is not None:
+                by_location.setdefault(location, []).append(rate)
+        locations = []
+        for location, area_rates in by_location.items():
+            locations.append(roll_up(location, area_rates))
+            self._inhabitants.setdefault(
+                (location, version), {}
+            ).setdefault(pokemon)
+
+        by_region: Dict[str, List[EncounterRate]] = {}
+        for rate in locations:
+            region = self.location_regions.get(rate.place)
+            if region is not None:
+                by_region.setdefault(region, []).append(rate)
+
+        self._areas[key] = _best_first(areas)
+        self._locations[key] = _best_first(locations)
+        self._regions[key] = _best_first(
+            roll_up(region, location_rates)
+            for region, location_rates in by_region.items()
+        )
+
+    @classmethod
+    def from_resources(cls, areas: Iterable[dict],
+                       locations: Iterable[dict] = ()) -> 'EncounterIndex':
+        """Builds the index from `location-area` JSON data and, for region
+        rollups, `location` JSON data.
+        """
+        slots: Dict[Tuple[str, str], List[EncounterSlot]] = {}
+        area_locations = {}
+        for area in areas:
+            area_name = area.get('name')
+            if not area_name:
+                continue
+            location = name_of(area.get('location'))
+            if location is not None:
+                area_locations[area_name] = location
+            for encounter in area.get('pokemon_encounters') or ():
+                pokemon = name_of(encounter.get('pokemon'))
+                for version_detail in encounter.get('version_details') or ():
+                    key = (pokemon, name_of(version_detail.get('version')))
+                    pokemon_slots = slots.setdefault(key, [])
+                    for detail in (version_detail.get('encounter_details')
+                                   or ()):
+                        pokemon_slots.append(EncounterSlot(
+                            area_name,
+                            name_of(detail.get('method')),
+                            detail.get('min_level') or 0,
+                            detail.get('max_level') or 0,
+                            tuple(sorted(
+                                name_of(condition) for condition
+                                in detail.get('condition_values') or ()
+                            )),
+                            detail.get('chance') or 0
+                        ))
+        location_regions = {
+            location['name']: name_of(location.get('region'))
+            for location in locations
+            if location.get('name') and location.get('region')
+        }
+        return cls({key: value for key, value in slots.items() if value},
+                   area_locations, location_regions)
+
+    @classmethod
+    def from_cache(cls, cache: BaseCache) -> 'EncounterIndex':
+        """Builds the index from every cached `location-area` and
+        `location`.
+        """
+        return cls.from_resources(resources_from_cache(cache, 'location-area'),
+                                  resources_from_cache(cache, 'location'))
+
+    @classmethod
+    async def from_client(cls, client) -> 'EncounterIndex':
+        """Builds the index from every `location-area` and `location`,
+        fetched in bulk.
+        """
+        areas = await resources_from_client(client, 'location-area')
+        locations = await resources_from_client(client, 'location')
+        return cls.from_resources(areas, locations)
+
+    def save(self, file_path: Union[str, Path] = ENCOUNTERS_FILE) -> None:
+        file_path = Path(file_path)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        data = (self.slots, self.area_locations, self.location_regions)
+        with open(file_path, 'wb') as pickle_file:
+            pickle.dump(data, pickle_file, pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, file_path: Union[str, Path] = ENCOUNTERS_FILE
+             ) -> 'EncounterIndex':
+        with open(file_path, 'rb') as pickle_file:
+            return cls(*pickle.load(pickle_file))
+
+    def versions(self, pokemon: str) -> List[str]:
+        """Every version the Pokémon can be found in."""
+        return list(self._versions.get(pokemon, ()))
+
+    def encounters(self, pokemon: str, version: str,
+                   method: Optional[str] = None) -> List[EncounterSlot]:
+        """Every encounter slot of a Pokémon in a version."""
+        return [slot for slot in self.slots.get((pokemon, version), ())
+                if method is None or slot.method == method]
+
+    @staticmethod
+    def _with_method(rates: List[EncounterRate],
+                     method: Optional[str]) -> List[EncounterRate]:
+        if method is None:
+            return list(rates)
+        return _best_first(
+            _rate(rate.place, {method: rate.rates[method]},
+                  {method: rate.levels[method]})
+            for rate in rates if method in rate.rates
+        )
+
+    def areas(self, pokemon: str, version: str,
+              method: Optional[str] = None) -> List[EncounterRate]:
+        """Every area a Pokémon can be found in, best chance first."""
+        return self._with_method(
+            self._areas.get((pokemon, version), ()), method
+        )
+
+    def locations(self, pokemon: str, version: str,
+                  method: Optional[str] = None) -> List[EncounterRate]:
+        """Like `areas`, rolled up to locations."""
+        return self._with_method(
+            self._locations.get((pokemon, version), ()), method
+        )
+
+    def regions(self, pokemon: str, version: str,
+                method: Optional[str] = None) -> List[EncounterRate]:
+        """Like `areas`, rolled up to regions."""
+        return self._with_method(
+            self._regions.get((pokemon, version), ()), method
+        )
+
+    def pokemon_in(self, place: str, version: str) -> List[str]:
+        """Every Pokémon that can be found in an area or location in a
+        version.
+        """
+        return list(self._inhabitants.get((place, version), ()))
@@ -0,0 +1,234 @@
+"""
+A flattened index of every evolution chain. `EvolutionChain.chain` is a tree
+of `ChainLink`s, so answering anything about a species' family means getting
+the chain and walking it. This index stores every chain's species in
+preorder in flat integer arrays instead, which makes a species' family and
+descendants contiguous slices and ancestry checks a pair of comparisons.
+
+```python
+>>> evolutions = await EvolutionIndex.from_client(client)
+>>> evolutions.family('ivysaur')
+['bulbasaur', 'ivysaur', 'venusaur']
+>>> evolutions.is_ancestor('bulbasaur', 'venusaur')
+True
+>>> evolutions.how_to_evolve('eevee')['espeon']
+({'trigger': 'level-up', 'min_happiness': 160, 'time_of_day': 'day'},)
+```
+"""
+
+import pickle
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from aiokemon.core.cache import BaseCache
+from aiokemon.data.common import (DATA_DIR, id_from_url, resources_from_cache,
+                                  resources_from_client)
+
+EVOLUTION_FILE = DATA_DIR / 'evolution.pickle'
+Conditions = Tuple[Dict[str, Any], ...]
+
+
+def compact_details(details: Iterable[dict]) -> Conditions:
+    """Shrinks `EvolutionDetail`s down to the conditions that apply: unset
+    (null, false or empty) fields are dropped and references become their
+    names.
+    """
+    compacted = []
+    for detail in details:
+        conditions = {}
+        for key, value in detail.items():
+            if value is None or value is False or value == '':
+                continue
+            if isinstance(value, dict):
+                value = value.get('name')
+            conditions[key] = value
+        compacted.append(conditions)
+    return tuple(compacted)
+
+
+class EvolutionIndex:
+    """Every species of every evolution chain, numbered in preorder (chains
+    in id order, then each chain depth-first). For the species numbered `i`:
+
+    - `parents[i]` is the number of the species it evolves from, or -1
+    - `stages[i]` is 0 for a chain's base species, 1 for its evolutions...
+    - `ends[i]` is the number of its last descendant (or `i`), so its
+    descendants are exactly `i + 1` through `ends[i]`
+    - `chains[i]` is the id of its evolution chain
+    - `details[i]` are the compacted conditions of evolving into it
+    """
+
+    def __init__(self, species: List[str], parents: array, stages: array,
+                 ends: array, chains: array, babies: array,
+                 details: List[Conditions]) -> None:
+        self.species = species
+        self.parents = parents
+        self.stages = stages
+        self.ends = ends
+        self.chains = chains
+        self.babies = babies
+        self.details = details
+        self._numbers = {name: i for i, name in enumerate(species)}
+        # chain id -> (first species number, last species number)
+        self._chain_ranges = {}
+        for i, chain_id in enumerate(chains):
+            if chain_id not in self._chain_ranges:
+                self._chain_ranges[chain_id] = (i, ends[i])
+
+    def __len__(self) -> int:
+        return len(self.species)
+
+    def __contains__(self, species: str) -> bool:
+        return species in self._numbers
+
+    @classmethod
+    def from_resources(cls, chains: Iterable[dict]) -> 'EvolutionIndex':
+        species = []
+        parents = array('i')
+        stages = array('b')
+        ends = array('i')
+        chain_ids = array('i')
+        babies = array('b')
+        details = []
+        for chain in sorted(chains, key=lambda c: c.get('id') or 0):
+            root = chain.get('chain')
+            if not root:
+                continue
+            # (link, parent number, stage); ends are filled in on the way
+            # back up, once every descendant has a number
+            stack = [(root, -1, 0)]
+            open_links = []
+            while stack:
+                link, parent, stage = stack.pop()
+                while open_links and stages[open_links[-1]] >= stage:
+                    ends[open_links.pop()] = len(species) - 1
+                number = len(species)
+                species.append(link['species']['name'])
+                parents.append(parent)
+                stages.append(stage)
+                ends.append(number)
+                chain_ids.append(chain.get('id') or 0)
+                babies.append(bool(link.get('is_baby')))
+                details.append(
+                    compact_details(link.get('evolution_details') or ())
+                )
+                open_links.append(number)
+                for child in reversed(link.get('evolves_to') or ()):
+                    stack.append((child, number, stage + 1))
+            while open_links:
+                ends[open_links.pop()] = len(species) - 1
+        return cls(species, parents, stages, ends, chain_ids, babies, details)
+
+    @classmethod
+    def from_cache(cls, cache: BaseCache) -> 'EvolutionIndex':
+        """Builds the index from every cached `evolution-chain`."""
+        return cls.from_resources(
+            resources_from_cache(cache, 'evolution-chain')
+        )
+
+    @classmethod
+    async def from_client(cls, client) -> 'EvolutionIndex':
+        """Builds the index from every `evolution-chain`, fetched in bulk."""
+        return cls.from_resources(
+            await resources_from_client(client, 'evolution-chain')
+        )
+
+    def save(self, file_path: Union[str, Path] = EVOLUTION_FILE) -> None:
+        file_path = Path(file_path)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        data = (self.species, self.parents, self.stages, self.ends,
+                self.chains, self.babies, self.details)
+        with open(file_path, 'wb') as pickle_file:
+            pickle.dump(data, pickle_file, pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, file_path: Union[str, Path] = EVOLUTION_FILE
+             ) -> 'EvolutionIndex':
+        with open(file_path, 'rb') as pickle_file:
+            return cls(*pickle.load(pickle_file))
+
+    def number_of(self, species: str) -> int:
+        """## Raises
+        `ValueError` if the species isn't in any evolution chain.
+        """
+        try:
+            return self._numbers[species]
+        except KeyError:
+            raise ValueError(
+                f'species "{species}" is not in the evolution index.'
+            ) from None
+
+    def chain_id(self, species: str) -> int:
+        return self.chains[self.number_of(species)]
+
+    def family(self, species: str) -> List[str]:
+        """Every species in the same evolution chain, in preorder."""
+        first, last = self._chain_ranges[self.chain_id(species)]
+        return self.species[first:last + 1]
+
+    def parent(self, species: str) -> Optional[str]:
+        parent = self.parents[self.number_of(species)]
+        return None if parent < 0 else self.species[parent]
+
+    def children(self, species: str) -> List[str]:
+        """The species that this species directly evolves into."""
+        number = self.number_of(species)
+        children = []
+        child = number + 1
+        while child <= self.ends[number]:
+            children.append(self.species[child])
+            child = self.ends[child] + 1
+        return children
+
+    def stage(self, species: str) -> int:
+        """0 for a chain's base species, 1 for its evolutions and so on."""
+        return self.stages[self.number_of(species)]
+
+    def is_baby(self, species: str) -> bool:
+        return bool(self.babies[self.number_of(species)])
+
+    def is_ancestor(self, ancestor: str, descendant: str) -> bool:
+        """Whether `descendant` is (eventually) evolved from `ancestor`."""
+        a = self.number_of(ancestor)
+        d = self.number_of(descendant)
+        return a < d <= self.ends[a]
+
+    def ancestors(self, species: str) -> List[str]:
+        """The species this one evolves from, base species first."""
+        ancestors = []
+        parent = self.parents[self.number_of(species)]
+        while parent >= 0:
+            ancestors.append(self.species[parent])
+            parent = self.parents[parent]
+        return ancestors[::-1]
+
+    def descendants(self, species: str) -> List[str]:
+        """Every species this one can eventually evolve into."""
+        number = self.number_of(species)
+        return self.species[number + 1:self.ends[number] + 1]
+
+    def evolution_details(self, species: str) -> Conditions:
+        """The conditions of evolving into a species (empty for base
+        species). There can be several ways to evolve into a species, i.e.
+        different items or locations in different games.
+        """
+        return self.details[self.number_of(species)]
+
+    def how_to_evolve(self, species: str) -> Dict[str, Conditions]:
+        """Every species this one directly evolves into, with the conditions
+        for each.
+        """
+        return {child: self.evolution_details(child)
+                for child in self.children(species)}
+
+    def evolved_by(self, **conditions: Any) -> List[str]:
+        """Every species that evolves under all the given conditions, i.e.
+        `evolved_by(trigger='use-item', item='moon-stone')`.
+        """
+        return [
+            self.species[i] for i, details in enumerate(self.details)
+            if any(all(detail.get(key) == value
+                       for key, value in conditions.items())
+                   for detail in details)
+        ]
@@ -0,0 +1,179 @@
+"""
+Experience tables of every growth rate as one NumPy array, joined to the
+species that use them. Level <-> experience conversions are array indexing
+and binary searches over whole batches instead of scans of
+`GrowthRate.levels`.
+
+```python
+>>> growth = GrowthRates.from_cache(client._cache)
+>>> growth.rate_of('garchomp')
+'slow'
+>>> growth.exp_for_level('garchomp', [50, 100])
+array([ 156250, 1250000])
+>>> growth.level_for_exp(['garchomp', 'pikachu'], 200000)
+array([54, 58])
+```
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, Sequence, Union
+
+from aiokemon.core.cache import BaseCache
+from aiokemon.data.common import (DATA_DIR, name_of, np, require_numpy,
+                                  resources_from_cache,
+                                  resources_from_client)
+
+GROWTH_FILE = DATA_DIR / 'growth.npz'
+MAX_LEVEL = 100
+Growth = Union[str, Sequence[str], object]
+
+
+class GrowthRates:
+    """`experience[r, level - 1]` is the total experience a Pokémon with
+    growth rate `rates[r]` needs to reach a level, and `species_rates[s]`
+    is the growth rate index of `species[s]`.
+    """
+
+    def __init__(self, rates: Sequence[str], experience,
+                 species: Sequence[str], species_rates) -> None:
+        require_numpy('GrowthRates')
+        self.rates = list(rates)
+        self.experience = np.asarray(experience, dtype=np.int64)
+        self.species = list(species)
+        self.species_rates = np.asarray(species_rates, dtype=np.intp)
+        self._rate_index = {name: i for i, name in enumerate(self.rates)}
+        self._species_index = {name: i for i, name in enumerate(self.species)}
+        # Every rate's table shifted past the previous one's, so one sorted
+        # array answers binary searches for a batch of different rates
+        self._offset = int(self.experience.max(initial=0)) + 1
+        self._flat = (self.experience
+                      + self._offset * np.arange(len(self.rates))[:, None]
+                      ).ravel()
+
+    @classmethod
+    def from_resources(cls, rates: Iterable[dict],
+                       species: Iterable[dict] = ()) -> 'GrowthRates':
+        """Builds the tables from `growth-rate` JSON data. Species come from
+        each rate's `pokemon_species` and from the `growth_rate` of any
+        `pokemon-species` JSON data given.
+        """
+        require_numpy('GrowthRates')
+        rates = sorted(rates, key=lambda d: d.get('id') or 0)
+        experience = np.zeros((len(rates), MAX_LEVEL), dtype=np.int64)
+        species_rates: Dict[str, int] = {}
+        for r, rate in enumerate(rates):
+            for entry in rate.get('levels') or ():
+                level = entry.get('level') or 0
+                if 1 <= level <= MAX_LEVEL:
+                    experience[r, level - 1] = entry.get('experience') or 0
+            for entry in rate.get('pokemon_species') or ():
+                species_rates[entry['name']] = r
+        rate_index = {rate['name']: r for r, rate in enumerate(rates)}
+        for data in species:
+            rate = name_of(data.get('growth_rate'))
+            if data.get('name') and rate in rate_index:
+                species_rates[data['name']] = rate_index[rate]
+        names = sorted(species_rates)
+        return cls([rate['name'] for rate in rates], experience, names,
+                    [species_rates[name] for name in names])
+
+    @classmethod
+    def from_cache(cls, cache: BaseCache) -> 'GrowthRates':
+        """Builds the tables from every cached `growth-rate` and
+        `pokemon-species`.
+        """
+        return cls.from_resources(
+            resources_from_cache(cache, 'growth-rate'),
+            resources_from_cache(cache, 'pokemon-species')
+        )
+
+    @classmethod
+    async def from_client(cls, client) -> 'GrowthRates':
+        """Builds the tables from every `growth-rate`, fetched in bulk.
+        Each rate lists its species, so no species need to be fetched.
+        """
+        return cls.from_resources(
+            await resources_from_client(client, 'growth-rate')
+        )
+
+    def save(self, file_path: Union[str, Path] = GROWTH_FILE) -> None:
+        file_path = Path(file_path)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(file_path, rates=np.array(self.rates),
+                            experience=self.experience,
+                            species=np.array(self.species),
+                            species_rates=self.species_rates)
+
+    @classmethod
+    def load(cls, file_path: Union[str, Path] = GROWTH_FILE
+             ) -> 'GrowthRates':
+        require_numpy('GrowthRates')
+        with np.load(file_path, allow_pickle=False) as data:
+            return cls(data['rates'].tolist(), data['experience'],
+                       data['species'].tolist(), data['species_rates'])
+
+    def rate_index(self, name: str) -> int:
+        """The index of a growth rate, or of a species' growth rate.
+
+        ## Raises
+        `ValueError` if there's no growth rate or species with that name.
+        """
+        if name in self._rate_index:
+            return self._rate_index[name]
+        if name in self._species_index:
+            return int(self.species_rates[self._species_index[name]])
+        raise ValueError(
+            f'"{name}" is not a growth rate or a species with one.'
+        )
+
+    def rate_of(self, species: str) -> str:
+        return self.rates[self.rate_index(species)]
+
+    def encode(self, growth: Growth):
+        """Turns growth rate or species names (or a list of them) into an
+        array of growth rate indexes. Index arrays are returned as is.
+        """
+        if isinstance(growth, str):
+            return np.asarray(self.rate_index(growth))
+        growth = np.asarray(growth)
+        if growth.dtype.kind in 'US':
+            return np.vectorize(self.rate_index, otypes=[np.intp])(growth)
+        return growth.astype(np.intp)
+
+    def exp_for_level(self, growth: Growth, level):
+        """The total experience needed to reach each level. Growth rates
+        (or species) and levels broadcast against each other.
+
+        ## Raises
+        `ValueError` if a level is out of range.
+        """
+        level = np.asarray(level, dtype=np.intp)
+        if level.size and (level.min() < 1 or level.max() > MAX_LEVEL):
+            raise ValueError(f'levels must be between 1 and {MAX_LEVEL}.')
+        return self.experience[self.encode(growth), level - 1]
+
+    def level_for_exp(self, growth: Growth, experience):
+        """The level reached with some total experience, by binary search.
+        Growth rates (or species) and experience broadcast against each
+        other.
+        """
+        rates, experience = np.broadcast_arrays(
+            self.encode(growth), np.asarray(experience, dtype=np.int64)
+        )
+        experience = np.clip(experience, 0, self._offset - 1)
+        positions = np.searchsorted(
+            self._flat, experience + self._offset * rates, side='right'
+        )
+        return np.maximum(positions - MAX_LEVEL * rates, 1)
+
+    def exp_to_next_level(self, growth: Growth, experience):
+        """The experience still needed to reach the next level, 0 at the
+        last level.
+        """
+        rates, experience = np.broadcast_arrays(
+            self.encode(growth), np.asarray(experience, dtype=np.int64)
+        )
+        level = self.level_for_exp(rates, experience)
+        following = self.experience[rates, np.minimum(level, MAX_LEVEL - 1)]
+        return np.where(level >= MAX_LEVEL, 0,
+                        np.maximum(following - experience, 0))
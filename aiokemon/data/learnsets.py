@@ -0,0 +1,293 @@
+"""
+An inverted index of every Pokémon's learnset. Each
+`(pokemon, move, version group, learn method, level)` entry of every
+`Pokemon.moves[*].version_group_details` becomes one row of a few small
+integer arrays, built in a single streaming pass over the raw JSON so no
+resource objects are ever created.
+
+```python
+>>> learnsets = LearnsetIndex.from_cache(client._cache)
+>>> learnsets.learners('vine-whip', 'red-blue', 'level-up')
+['bellsprout', 'bulbasaur', 'ivysaur', 'venusaur', 'weepinbell']
+>>> learnsets.moves_of('bulbasaur', 'red-blue', 'level-up', max_level=15)
+['growl', 'tackle', 'leech-seed', 'vine-whip']
+```
+"""
+
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Union
+
+from aiokemon.core.cache import BaseCache
+from aiokemon.data.common import (DATA_DIR, cached_resources, np,
+                                  require_numpy, resources_from_client)
+
+LEARNSET_FILE = DATA_DIR / 'learnsets.npz'
+COLUMNS = ('pokemon', 'move', 'version_group', 'method', 'level')
+
+
+class LearnEntry(NamedTuple):
+    move: str
+    version_group: str
+    method: str
+    level: int
+
+
+class _Vocabulary:
+    """Numbers names in the order they're first seen."""
+
+    def __init__(self) -> None:
+        self.numbers: Dict[str, int] = {}
+
+    def __call__(self, name: str) -> int:
+        number = self.numbers.get(name)
+        if number is None:
+            number = self.numbers[name] = len(self.numbers)
+        return number
+
+    def sorted_remap(self):
+        """Returns the names sorted alphabetically and an array that maps
+        each first-seen number to its sorted number.
+        """
+        names = sorted(self.numbers)
+        remap = np.empty(len(names), dtype=np.int32)
+        for i, name in enumerate(names):
+            remap[self.numbers[name]] = i
+        return names, remap
+
+
+class LearnsetIndex:
+    """Every learnset entry as a row of the integer arrays in `columns`
+    (`pokemon`, `move`, `version_group`, `method` and `level`), with names
+    numbered alphabetically in `names[column]`.
+
+    Rows are sorted by move, version group, learn method and Pokémon, so
+    "who learns this move" is one binary search. `_by_pokemon` holds the
+    row numbers sorted by Pokémon instead, for "what does this learn".
+    """
+
+    def __init__(self, names: Dict[str, List[str]],
+                 columns: Dict[str, object]) -> None:
+        require_numpy('LearnsetIndex')
+        self.names = names
+        self.columns = columns
+        self._numbers = {
+            column: {name: i for i, name in enumerate(values)}
+            for column, values in names.items()
+        }
+        self._key = self._inverse_key(
+            columns['move'], columns['version_group'], columns['method']
+        )
+        self._by_pokemon = np.lexsort((
+            columns['move'], columns['level'], columns['method'],
+            columns['version_group'], columns['pokemon']
+        ))
+        self._pokemon_sorted = columns['pokemon'][self._by_pokemon]
+
+    def __len__(self) -> int:
+        return len(self._key)
+
+    def _inverse_key(self, moves, version_groups, methods):
+        n_groups = max(len(self.names['version_group']), 1)
+        n_methods = max(len(self.names['method']), 1)
+        return (
+            (np.asarray(moves, dtype=np.int64) * n_groups + version_groups)
+            * n_methods + methods
+        )
+
+    @classmethod
+    def from_resources(cls, pokemon: Iterable[dict]) -> 'LearnsetIndex':
+        """Builds the index in one pass over Pokémon JSON data. Pokémon seen
+        twice (i.e. cached under both their name and id) are only counted
+        once.
+        """
+        require_numpy('LearnsetIndex')
+        vocabularies = {column: _Vocabulary() for column in COLUMNS[:-1]}
+        get_pokemon, get_move, get_group, get_method = (
+            vocabularies[column] for column in COLUMNS[:-1]
+        )
+        rows = {column: array('i') for column in COLUMNS}
+        seen = set()
+        for data in pokemon:
+            name = data.get('name')
+            if name is None or name in seen:
+                continue
+            seen.add(name)
+            pokemon_number = get_pokemon(name)
+            for move in data.get('moves') or ():
+                move_number = get_move(move['move']['name'])
+                for detail in move.get('version_group_details') or ():
+                    rows['pokemon'].append(pokemon_number)
+                    rows['move'].append(move_number)
+                    rows['version_group'].append(
+                        get_group(detail['version_group']['name'])
+                    )
+                    rows['method'].append(
+                        get_method(detail['move_learn_method']['name'])
+                    )
+                    rows['level'].append(detail.get('level_learned_at') or 0)
+
+        names = {}
+        columns = {}
+        for column in COLUMNS[:-1]:
+            names[column], remap = vocabularies[column].sorted_remap()
+            raw = np.frombuffer(rows[column], dtype=np.int32)
+            columns[column] = remap[raw].astype(
+                np.int16 if len(names[column]) < 2 ** 15 else np.int32
+            )
+        columns['level'] = np.frombuffer(
+            rows['level'], dtype=np.int32
+        ).astype(np.int16)
+
+        order = np.lexsort((
+            columns['level'], columns['pokemon'], columns['method'],
+            columns['version_group'], columns['move']
+        ))
+        return cls(names, {column: values[order]
+                           for column, values in columns.items()})
+
+    @classmethod
+    def from_cache(cls, cache: BaseCache) -> 'LearnsetIndex':
+        """Builds the index by streaming every cached `pokemon` resource."""
+        return cls.from_resources(cached_resources(cache, 'pokemon'))
+
+    @classmethod
+    async def from_client(cls, client) -> 'LearnsetIndex':
+        """Builds the index from every `pokemon`, fetched in bulk."""
+        return cls.from_resources(
+            await resources_from_client(client, 'pokemon')
+        )
+
+    def save(self, file_path: Union[str, Path] = LEARNSET_FILE) -> None:
+        file_path = Path(file_path)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        arrays = {f'names_{column}': np.array(values)
+                  for column, values in self.names.items()}
+        arrays.update(self.columns)
+        np.savez_compressed(file_path, **arrays)
+
+    @classmethod
+    def load(cls, file_path: Union[str, Path] = LEARNSET_FILE
+             ) -> 'LearnsetIndex':
+        require_numpy('LearnsetIndex')
+        with np.load(file_path, allow_pickle=False) as data:
+            names = {column: data[f'names_{column}'].tolist()
+                     for column in COLUMNS[:-1]}
+            columns = {column: data[column] for column in COLUMNS}
+        return cls(names, columns)
+
+    def _number(self, column: str, name: Optional[str]) -> Optional[int]:
+        """## Raises
+        `ValueError` if the name isn't in the index.
+        """
+        if name is None:
+            return None
+        try:
+            return self._numbers[column][name]
+        except KeyError:
+            raise ValueError(
+                f'{column.replace("_", " ")} "{name}" is not in the learnset '
+                'index.'
+            ) from None
+
+    def _filter(self, rows, version_group: Optional[str],
+                method: Optional[str], min_level: Optional[int],
+                max_level: Optional[int]):
+        """Narrows an array of row numbers down to the given filters."""
+        columns = self.columns
+        mask = np.ones(len(rows), dtype=bool)
+        group = self._number('version_group', version_group)
+        if group is not None:
+            mask &= columns['version_group'][rows] == group
+        method_number = self._number('method', method)
+        if method_number is not None:
+            mask &= columns['method'][rows] == method_number
+        if min_level is not None:
+            mask &= columns['level'][rows] >= min_level
+        if max_level is not None:
+            mask &= columns['level'][rows] <= max_level
+        return rows[mask]
+
+    def _move_rows(self, move: str, version_group: Optional[str],
+                   method: Optional[str]):
+        """Row numbers of a move, found by binary search on the sorted
+        move/version group/method key. A method without a version group
+        spans every group's range, so it's filtered afterwards.
+        """
+        move_number = self._number('move', move)
+        group = self._number('version_group', version_group)
+        method_number = self._number('method', method)
+        n_groups = max(len(self.names['version_group']), 1)
+        n_methods = max(len(self.names['method']), 1)
+        if group is None:
+            low = move_number * n_groups * n_methods
+            high = low + n_groups * n_methods
+        elif method_number is None:
+            low = (move_number * n_groups + group) * n_methods
+            high = low + n_methods
+        else:
+            low = (move_number * n_groups + group) * n_methods + method_number
+            high = low + 1
+        start, end = np.searchsorted(self._key, (low, high))
+        rows = np.arange(start, end)
+        if group is None and method_number is not None:
+            rows = rows[self.columns['method'][rows] == method_number]
+        return rows
+
+    def _pokemon_rows(self, pokemon: str):
+        number = self._number('pokemon', pokemon)
+        start, end = np.searchsorted(self._pokemon_sorted,
+                                     (number, number + 1))
+        return self._by_pokemon[start:end]
+
+    def learners(self, move: str, version_group: Optional[str] = None,
+                 method: Optional[str] = None,
+                 min_level: Optional[int] = None,
+                 max_level: Optional[int] = None) -> List[str]:
+        """Every Pokémon that learns a move, optionally only in a version
+        group, by a learn method or between levels, sorted by name.
+        """
+        rows = self._move_rows(move, version_group, method)
+        rows = self._filter(rows, None, None, min_level, max_level)
+        numbers = np.unique(self.columns['pokemon'][rows])
+        return [self.names['pokemon'][i] for i in numbers]
+
+    def learnset(self, pokemon: str, version_group: Optional[str] = None,
+                 method: Optional[str] = None,
+                 min_level: Optional[int] = None,
+                 max_level: Optional[int] = None) -> List[LearnEntry]:
+        """Every learnset entry of a Pokémon that matches the filters,
+        sorted by version group, method, level and move.
+        """
+        rows = self._filter(self._pokemon_rows(pokemon), version_group,
+                            method, min_level, max_level)
+        names = self.names
+        columns = self.columns
+        return [
+            LearnEntry(names['move'][move], names['version_group'][group],
+                       names['method'][method_number], int(level))
+            for move, group, method_number, level in zip(
+                columns['move'][rows], columns['version_group'][rows],
+                columns['method'][rows], columns['level'][rows]
+            )
+        ]
+
+    def moves_of(self, pokemon: str, version_group: Optional[str] = None,
+                 method: Optional[str] = None,
+                 min_level: Optional[int] = None,
+                 max_level: Optional[int] = None) -> List[str]:
+        """The distinct moves a Pokémon learns, in learnset order (by level,
+        then name, within a version group and method).
+        """
+        moves = {}
+        for entry in self.learnset(pokemon, version_group, method,
+                                   min_level, max_level):
+            moves.setdefault(entry.move, None)
+        return list(moves)
+
+    def can_learn(self, pokemon: str, move: str,
+                  version_group: Optional[str] = None,
+                  method: Optional[str] = None) -> bool:
+        rows = self._move_rows(move, version_group, method)
+        number = self._number('pokemon', pokemon)
+        return bool((self.columns['pokemon'][rows] == number).any())
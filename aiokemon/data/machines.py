@@ -0,0 +1,171 @@
+"""
+An index of every TM, HM and TR. `Move.machines` and `Item.machines` are
+only URLs of `machine` resources, so finding out what "TM26 in platinum"
+teaches otherwise means fetching them one by one. This index maps
+`(item, version group)` to moves and back with dictionary lookups.
+
+```python
+>>> machines = await MachineIndex.from_client(client)
+>>> machines.move_for('TM26', 'platinum')
+'earthquake'
+>>> machines.machines_for('earthquake', 'platinum')
+[('tm26', 'platinum')]
+```
+"""
+
+import pickle
+import re
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from aiokemon.core.cache import BaseCache
+from aiokemon.data.common import (DATA_DIR, id_from_url, name_of,
+                                  resources_from_cache,
+                                  resources_from_client)
+
+MACHINES_FILE = DATA_DIR / 'machines.pickle'
+machine_name = re.compile(r'^\s*(tm|hm|tr)\s*-?\s*0*(\d+)\s*$', re.IGNORECASE)
+
+
+def parse_machine(name: str) -> Optional[Tuple[str, int]]:
+    """Splits a machine item's name into its kind and number, i.e. `TM26`,
+    `tm026` and `tm26` -> `('tm', 26)`. Returns None for other names.
+    """
+    match = machine_name.match(name)
+    if match is None:
+        return None
+    return match.group(1).lower(), int(match.group(2))
+
+
+class MachineIndex:
+    """Every machine as a row of the arrays `items`, `version_groups`,
+    `moves` and `ids`, which hold numbers of the names in `names[column]`
+    (and machine ids).
+    """
+
+    def __init__(self, names: Dict[str, List[str]], items: array,
+                 version_groups: array, moves: array, ids: array) -> None:
+        self.names = names
+        self.items = items
+        self.version_groups = version_groups
+        self.moves = moves
+        self.ids = ids
+        self._numbers = {column: {name: i for i, name in enumerate(values)}
+                         for column, values in names.items()}
+        # (machine kind, number, version group number) -> row, so TM26 and
+        # tm026 find the same machine
+        self._by_item: Dict[Tuple[str, int, int], int] = {}
+        self._by_name: Dict[Tuple[int, int], int] = {}
+        self._by_move: Dict[int, List[int]] = {}
+        for row, (item, group, move) in enumerate(
+                zip(items, version_groups, moves)):
+            self._by_name[item, group] = row
+            parsed = parse_machine(names['item'][item])
+            if parsed is not None:
+                self._by_item[parsed + (group,)] = row
+            self._by_move.setdefault(move, []).append(row)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_resources(cls, machines: Iterable[dict]) -> 'MachineIndex':
+        columns = ('item', 'version_group', 'move')
+        numbers = {column: {} for column in columns}
+        rows = {column: array('H') for column in columns}
+        ids = array('i')
+        seen = set()
+        for machine in sorted(machines, key=lambda d: d.get('id') or 0):
+            machine_id = machine.get('id') or id_from_url(machine.get('url'))
+            if machine_id in seen:
+                continue
+            seen.add(machine_id)
+            for column in columns:
+                name = name_of(machine.get(column))
+                rows[column].append(
+                    numbers[column].setdefault(name, len(numbers[column]))
+                )
+            ids.append(machine_id or 0)
+        names = {column: list(numbers[column]) for column in columns}
+        return cls(names, rows['item'], rows['version_group'], rows['move'],
+                   ids)
+
+    @classmethod
+    def from_cache(cls, cache: BaseCache) -> 'MachineIndex':
+        """Builds the index from every cached `machine`."""
+        return cls.from_resources(resources_from_cache(cache, 'machine'))
+
+    @classmethod
+    async def from_client(cls, client) -> 'MachineIndex':
+        """Builds the index from every `machine`, fetched in bulk."""
+        return cls.from_resources(
+            await resources_from_client(client, 'machine')
+        )
+
+    def save(self, file_path: Union[str, Path] = MACHINES_FILE) -> None:
+        file_path = Path(file_path)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        data = (self.names, self.items, self.version_groups, self.moves,
+                self.ids)
+        with open(file_path, 'wb') as pickle_file:
+            pickle.dump(data, pickle_file, pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, file_path: Union[str, Path] = MACHINES_FILE
+             ) -> 'MachineIndex':
+        with open(file_path, 'rb') as pickle_file:
+            return cls(*pickle.load(pickle_file))
+
+    def _row(self, item: str, version_group: str) -> Optional[int]:
+        group = self._numbers['version_group'].get(version_group)
+        if group is None:
+            return None
+        number = self._numbers['item'].get(item)
+        if number is not None:
+            return self._by_name.get((number, group))
+        parsed = parse_machine(item)
+        if parsed is None:
+            return None
+        return self._by_item.get(parsed + (group,))
+
+    def move_for(self, item: str, version_group: str) -> Optional[str]:
+        """The move a machine item (i.e. `tm26` or `TM26`) teaches in a
+        version group, or None if it doesn't exist there.
+        """
+        row = self._row(item, version_group)
+        return None if row is None else self.names['move'][self.moves[row]]
+
+    def machine_id(self, item: str, version_group: str) -> Optional[int]:
+        """The id of the `machine` resource of an item in a version
+        group.
+        """
+        row = self._row(item, version_group)
+        return None if row is None else self.ids[row]
+
+    def machines_for(self, move: str, version_group: Optional[str] = None
+                     ) -> List[Tuple[str, str]]:
+        """Every `(item, version group)` that teaches a move, optionally in
+        one version group only.
+        """
+        number = self._numbers['move'].get(move)
+        names = self.names
+        return [
+            (names['item'][self.items[row]],
+             names['version_group'][self.version_groups[row]])
+            for row in self._by_move.get(number, ())
+            if version_group is None
+            or names['version_group'][self.version_groups[row]]
+            == version_group
+        ]
+
+    def machine_moves(self, version_group: str) -> Dict[str, str]:
+        """Every machine item of a version group and the move it teaches."""
+        group = self._numbers['version_group'].get(version_group)
+        names = self.names
+        return {
+            names['item'][item]: names['move'][move]
+            for item, row_group, move in zip(self.items, self.version_groups,
+                                              self.moves)
+            if row_group == group
+        }
@@ -0,0 +1,215 @@
+"""
+Vectorized in-game stat calculation. Base stats, levels, IVs, EVs and
+natures are all NumPy arrays that broadcast against each other, so whole
+sweeps of combinations are computed at once, and the inverse solver finds
+which IVs could have produced some observed stats.
+
+```python
+>>> calculator = StatCalculator.from_cache(client._cache)
+>>> stats = StatMatrix.from_cache(client._cache)
+>>> calculator.calculate_for(stats, 'garchomp', level=100, evs=[0, 252, 0, 0,
+... 4, 252], nature='jolly')
+array([357, 359, 226, 176, 207, 333], dtype=int32)
+>>> calculator.calculate_for(stats, 'garchomp', level=np.arange(1, 101))
+array([[ 13,   7,   7,   6,   7,   7],
+       [ 16,  10,   9,   8,   9,   9],
+       ...
+       [357, 296, 226, 196, 206, 240]], dtype=int32)
+>>> calculator.iv_ranges([289, 278, 193, 135, 171, 171], [108, 130, 95, 80,
+... 85, 102], level=78, evs=[74, 190, 91, 48, 84, 23], nature='adamant')
+(array([24, 11, 30, 14, 22,  4]), array([24, 12, 30, 16, 23,  5]))
+```
+"""
+
+from pathlib import Path
+from typing import Iterable, Optional, Sequence, Tuple, Union
+
+from aiokemon.core.cache import BaseCache
+from aiokemon.data.common import (DATA_DIR, name_of, np, require_numpy,
+                                  resources_from_cache,
+                                  resources_from_client)
+
+NATURES_FILE = DATA_DIR / 'natures.npz'
+STATS = ('hp', 'attack', 'defense', 'special-attack', 'special-defense',
+         'speed')
+MAX_IV = 31
+MAX_EV = 255
+MAX_LEVEL = 100
+# nature modifiers are kept in tenths so stats stay integer arithmetic
+NEUTRAL, INCREASED, DECREASED = 10, 11, 9
+Nature = Union[str, int, Sequence, None]
+
+
+class StatCalculator:
+    """Computes stats with the formulas used since generation III, i.e.
+    `floor((floor((2 * base + iv + floor(ev / 4)) * level / 100) + 5) *
+    nature)` for every stat but HP.
+
+    `modifiers[n, s]` is nature `natures[n]`'s modifier of stat `stats[s]`
+    in tenths (9, 10 or 11).
+    """
+
+    def __init__(self, natures: Sequence[str], modifiers,
+                 stats: Sequence[str] = STATS) -> None:
+        require_numpy('StatCalculator')
+        self.natures = list(natures)
+        self.stats = list(stats)
+        self.modifiers = np.asarray(modifiers, dtype=np.int32)
+        self._index = {name: i for i, name in enumerate(self.natures)}
+        self._is_hp = np.array([stat == 'hp' for stat in self.stats])
+
+    @classmethod
+    def from_resources(cls, natures: Iterable[dict],
+                       stats: Sequence[str] = STATS) -> 'StatCalculator':
+        require_numpy('StatCalculator')
+        natures = sorted(natures, key=lambda d: d.get('id') or 0)
+        stat_index = {stat: i for i, stat in enumerate(stats)}
+        modifiers = np.full((len(natures), len(stats)), NEUTRAL,
+                            dtype=np.int32)
+        for n, nature in enumerate(natures):
+            increased = name_of(nature.get('increased_stat'))
+            decreased = name_of(nature.get('decreased_stat'))
+            # neutral natures raise and lower the same stat, or none at all
+            if increased == decreased:
+                continue
+            if increased in stat_index:
+                modifiers[n, stat_index[increased]] = INCREASED
+            if decreased in stat_index:
+                modifiers[n, stat_index[decreased]] = DECREASED
+        return cls([nature['name'] for nature in natures], modifiers, stats)
+
+    @classmethod
+    def neutral(cls, stats: Sequence[str] = STATS) -> 'StatCalculator':
+        """A calculator without any nature data, for neutral natures
+        only.
+        """
+        require_numpy('StatCalculator')
+        return cls((), np.empty((0, len(stats)), dtype=np.int32), stats)
+
+    @classmethod
+    def from_cache(cls, cache: BaseCache) -> 'StatCalculator':
+        """Gets the nature modifiers from every cached `nature`."""
+        return cls.from_resources(resources_from_cache(cache, 'nature'))
+
+    @classmethod
+    async def from_client(cls, client) -> 'StatCalculator':
+        """Gets the nature modifiers from every `nature`, fetched in bulk."""
+        return cls.from_resources(
+            await resources_from_client(client, 'nature')
+        )
+
+    def save(self, file_path: Union[str, Path] = NATURES_FILE) -> None:
+        file_path = Path(file_path)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(file_path, natures=np.array(self.natures),
+                 modifiers=self.modifiers, stats=np.array(self.stats))
+
+    @classmethod
+    def load(cls, file_path: Union[str, Path] = NATURES_FILE
+             ) -> 'StatCalculator':
+        require_numpy('StatCalculator')
+        with np.load(file_path, allow_pickle=False) as data:
+            return cls(data['natures'].tolist(), data['modifiers'],
+                       data['stats'].tolist())
+
+    def nature_index(self, nature: Optional[str]) -> Optional[int]:
+        """## Raises
+        `ValueError` if the nature doesn't exist.
+        """
+        if nature is None:
+            return None
+        try:
+            return self._index[nature]
+        except KeyError:
+            raise ValueError(f'nature "{nature}" does not exist.') from None
+
+    def nature_modifiers(self, nature: Nature = None):
+        """The modifiers (in tenths) of a nature name, a nature index or an
+        array of either, with the stats as the last axis. None is a neutral
+        nature.
+
+        ## Raises
+        `ValueError` if a nature doesn't exist.
+        """
+        if nature is None:
+            return np.full(len(self.stats), NEUTRAL, dtype=np.int32)
+        indexes = np.asarray(nature)
+        if indexes.dtype.kind in 'US':
+            indexes = np.vectorize(self.nature_index,
+                                   otypes=[np.intp])(indexes)
+        return self.modifiers[indexes]
+
+    @staticmethod
+    def _stats(base, level, ivs, evs, modifiers, is_hp):
+        core = (2 * base + ivs + evs // 4) * level // 100
+        stats = (core + 5) * modifiers // NEUTRAL
+        # a base HP of 1 (Shedinja) always means 1 HP
+        hp = np.where(base == 1, 1, core + level + 10)
+        return np.where(is_hp, hp, stats)
+
+    def calculate(self, base, level=MAX_LEVEL, ivs=MAX_IV, evs=0,
+                  nature: Nature = None):
+        """Computes stats for every combination at once. `base`, `ivs` and
+        `evs` have the stats as their last axis (or are scalars), while
+        `level` and `nature` have one value per combination; everything
+        broadcasts like NumPy arrays do.
+
+        ## Raises
+        `ValueError` if a level, IV or EV is out of range.
+        """
+        base = np.asarray(base, dtype=np.int32)
+        level = np.asarray(level, dtype=np.int32)[..., None]
+        ivs = np.asarray(ivs, dtype=np.int32)
+        evs = np.asarray(evs, dtype=np.int32)
+        for name, values, low, high in (('level', level, 1, MAX_LEVEL),
+                                        ('IV', ivs, 0, MAX_IV),
+                                        ('EV', evs, 0, MAX_EV)):
+            if values.size and (values.min() < low or values.max() > high):
+                raise ValueError(
+                    f'{name}s must be between {low} and {high}.'
+                )
+        return self._stats(base, level, ivs, evs,
+                           self.nature_modifiers(nature), self._is_hp)
+
+    def calculate_for(self, matrix, pokemon: Union[str, Sequence[str]],
+                      level=MAX_LEVEL, ivs=MAX_IV, evs=0,
+                      nature: Nature = None):
+        """Like `calculate`, with the base stats of one or more Pokémon
+        from a `StatMatrix`. Several Pokémon are the first axis.
+        """
+        columns = [matrix.stats.index(stat) for stat in self.stats]
+        if isinstance(pokemon, str):
+            rows = matrix.index_of(pokemon)
+        else:
+            rows = np.array([matrix.index_of(name) for name in pokemon],
+                            dtype=np.intp)
+        base = matrix.values[rows][..., columns]
+        return self.calculate(base, level, ivs, evs, nature)
+
+    def possible_ivs(self, observed, base, level=MAX_LEVEL, evs=0,
+                     nature: Nature = None):
+        """Which IVs could have produced some observed stats, as a boolean
+        array with one more axis than the stats: `possible[..., s, iv]`.
+        """
+        stats = self._stats(
+            np.asarray(base, dtype=np.int32)[..., None],
+            np.asarray(level, dtype=np.int32)[..., None, None],
+            np.arange(MAX_IV + 1, dtype=np.int32),
+            np.asarray(evs, dtype=np.int32)[..., None],
+            self.nature_modifiers(nature)[..., None],
+            self._is_hp[:, None]
+        )
+        return stats == np.asarray(observed, dtype=np.int32)[..., None]
+
+    def iv_ranges(self, observed, base, level=MAX_LEVEL, evs=0,
+                  nature: Nature = None) -> Tuple[object, object]:
+        """The lowest and highest IV of every stat that could have produced
+        the observed stats, as two arrays. Both are -1 for stats that no IV
+        can produce, which means the level, EVs or nature are wrong.
+        """
+        possible = self.possible_ivs(observed, base, level, evs, nature)
+        found = possible.any(axis=-1)
+        low = np.where(found, possible.argmax(axis=-1), -1)
+        high = np.where(found, MAX_IV - possible[..., ::-1].argmax(axis=-1),
+                        -1)
+        return low, high
@@ -0,0 +1,223 @@
+"""
+Every Pokémon's base stats as one NumPy matrix (Pokémon x stat), so ranking,
+filtering and "similar stat spread" searches are vectorized instead of loops
+over `Pokemon.stats[*].base_stat`.
+
+```python
+>>> stats = StatMatrix.from_cache(client._cache)
+>>> stats.top_k('speed', k=3)
+[('regieleki', 200.0), ('deoxys-speed', 180.0), ('ninjask', 160.0)]
+>>> stats.top_k({'attack': 1, 'speed': 1}, k=1, ranges={'total': (None, 500)})
+[('ninjask', 250.0)]
+>>> dragons = StatMatrix(['garchomp', 'salamence', 'dragonite'], stats.stats,
+... [[108, 130, 95, 80, 85, 102], [95, 135, 80, 110, 80, 100],
+... [91, 134, 95, 100, 100, 80]])
+>>> dragons.nearest('garchomp', k=2)
+[('salamence', 36.71511950137164), ('dragonite', 37.603191353926334)]
+```
+"""
+
+from pathlib import Path
+from typing import (Dict, Iterable, List, Mapping, Optional, Sequence, Tuple,
+                    Union)
+
+from aiokemon.core.cache import BaseCache
+from aiokemon.data.common import (DATA_DIR, cached_resources, id_from_url, np,
+                                  require_numpy, resources_from_client)
+
+STAT_MATRIX_FILE = DATA_DIR / 'stats.npz'
+TOTAL = 'total'
+Score = Union[str, Mapping[str, float]]
+Ranges = Mapping[str, Tuple[Optional[float], Optional[float]]]
+
+
+class StatMatrix:
+    """`values[p, s]` is the base stat `stats[s]` of the Pokémon
+    `pokemon[p]`. Stats are ordered by id (hp, attack, defense...), and
+    `total` can be used wherever a stat name can.
+    """
+
+    def __init__(self, pokemon: Sequence[str], stats: Sequence[str],
+                 values) -> None:
+        require_numpy('StatMatrix')
+        self.pokemon = list(pokemon)
+        self.stats = list(stats)
+        self.values = np.asarray(values, dtype=np.int16)
+        self.totals = self.values.sum(axis=1, dtype=np.int32)
+        self._index = {name: i for i, name in enumerate(self.pokemon)}
+        self._stat_index = {name: i for i, name in enumerate(self.stats)}
+
+    def __len__(self) -> int:
+        return len(self.pokemon)
+
+    @classmethod
+    def from_resources(cls, pokemon: Iterable[dict]) -> 'StatMatrix':
+        """Builds the matrix in one pass over Pokémon JSON data. Pokémon seen
+        twice (i.e. cached under both their name and id) are only counted
+        once, and Pokémon without stats are left out.
+        """
+        require_numpy('StatMatrix')
+        rows: Dict[str, Dict[str, int]] = {}
+        stat_ids: Dict[str, int] = {}
+        ids: Dict[str, int] = {}
+        for data in pokemon:
+            name = data.get('name')
+            if not name or name in rows or not data.get('stats'):
+                continue
+            row = rows[name] = {}
+            ids[name] = data.get('id') or 0
+            for entry in data['stats']:
+                stat = entry['stat']
+                row[stat['name']] = entry.get('base_stat') or 0
+                stat_ids.setdefault(stat['name'],
+                                    id_from_url(stat.get('url')) or 0)
+        names = sorted(rows, key=lambda name: (ids[name], name))
+        stats = sorted(stat_ids, key=lambda stat: (stat_ids[stat], stat))
+        values = np.zeros((len(names), len(stats)), dtype=np.int16)
+        for p, name in enumerate(names):
+            for s, stat in enumerate(stats):
+                values[p, s] = rows[name].get(stat, 0)
+        return cls(names, stats, values)
+
+    @classmethod
+    def from_cache(cls, cache: BaseCache) -> 'StatMatrix':
+        """Builds the matrix by streaming every cached `pokemon` resource."""
+        return cls.from_resources(cached_resources(cache, 'pokemon'))
+
+    @classmethod
+    async def from_client(cls, client) -> 'StatMatrix':
+        """Builds the matrix from every `pokemon`, fetched in bulk."""
+        return cls.from_resources(
+            await resources_from_client(client, 'pokemon')
+        )
+
+    def save(self, file_path: Union[str, Path] = STAT_MATRIX_FILE) -> None:
+        file_path = Path(file_path)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(file_path, pokemon=np.array(self.pokemon),
+                            stats=np.array(self.stats), values=self.values)
+
+    @classmethod
+    def load(cls, file_path: Union[str, Path] = STAT_MATRIX_FILE
+             ) -> 'StatMatrix':
+        require_numpy('StatMatrix')
+        with np.load(file_path, allow_pickle=False) as data:
+            return cls(data['pokemon'].tolist(), data['stats'].tolist(),
+                       data['values'])
+
+    def index_of(self, pokemon: str) -> int:
+        """## Raises
+        `ValueError` if the Pokémon isn't in the matrix.
+        """
+        try:
+            return self._index[pokemon]
+        except KeyError:
+            raise ValueError(
+                f'pokemon "{pokemon}" is not in the stat matrix.'
+            ) from None
+
+    def column(self, stat: str):
+        """Every Pokémon's value of a stat (or `total`).
+
+        ## Raises
+        `ValueError` if the stat doesn't exist.
+        """
+        if stat == TOTAL:
+            return self.totals
+        try:
+            return self.values[:, self._stat_index[stat]]
+        except KeyError:
+            raise ValueError(f'stat "{stat}" does not exist.') from None
+
+    def stats_of(self, pokemon: str) -> Dict[str, int]:
+        row = self.values[self.index_of(pokemon)]
+        return {stat: int(value) for stat, value in zip(self.stats, row)}
+
+    def scores(self, score: Score):
+        """Every Pokémon's score as a float array. A score is a stat name,
+        `total` or a weighted sum of stats like
+        `{'attack': 1.0, 'speed': 0.5}`.
+        """
+        if isinstance(score, str):
+            return self.column(score).astype(np.float64)
+        result = np.zeros(len(self.pokemon), dtype=np.float64)
+        for stat, weight in score.items():
+            result += weight * self.column(stat)
+        return result
+
+    def mask(self, ranges: Optional[Ranges] = None):
+        """A boolean array of the Pokémon whose stats are within the
+        inclusive ranges, i.e. `{'speed': (100, None), 'hp': (None, 60)}`.
+        """
+        result = np.ones(len(self.pokemon), dtype=bool)
+        for stat, (low, high) in (ranges or {}).items():
+            column = self.column(stat)
+            if low is not None:
+                result &= column >= low
+            if high is not None:
+                result &= column <= high
+        return result
+
+    def filter(self, ranges: Ranges) -> List[str]:
+        """Every Pokémon whose stats are within the ranges (see `mask`)."""
+        return [self.pokemon[i] for i in np.flatnonzero(self.mask(ranges))]
+
+    def _top(self, values, candidates, k: int) -> List[Tuple[str, float]]:
+        """The `k` candidates with the lowest values, lowest first (ties by
+        Pokémon id).
+        """
+        if len(candidates) > k:
+            part = np.argpartition(values[candidates], k - 1)[:k]
+            candidates = candidates[part]
+        order = np.lexsort((candidates, values[candidates]))
+        return [(self.pokemon[i], float(values[i]))
+                for i in candidates[order]]
+
+    def top_k(self, score: Score = TOTAL, k: int = 10,
+              ranges: Optional[Ranges] = None,
+              ascending: bool = False) -> List[Tuple[str, float]]:
+        """The `k` Pokémon with the highest (or lowest) score among those
+        within the ranges, best first.
+        """
+        scores = self.scores(score)
+        candidates = np.flatnonzero(self.mask(ranges))
+        if k <= 0 or not len(candidates):
+            return []
+        if ascending:
+            return self._top(scores, candidates, k)
+        return [(name, -value)
+                for name, value in self._top(-scores, candidates, k)]
+
+    def nearest(self, spread: Union[str, Mapping[str, int]], k: int = 5,
+                ranges: Optional[Ranges] = None,
+                proportional: bool = False) -> List[Tuple[str, float]]:
+        """The `k` Pokémon with the stat spreads closest (by Euclidean
+        distance) to a Pokémon's or to a `{stat: value}` spread (missing
+        stats count as 0), closest first. A Pokémon is never its own
+        neighbour. With `proportional`, spreads are divided by their totals
+        first, so the shape of the spread counts rather than how strong it
+        is.
+
+        ## Raises
+        `ValueError` if the Pokémon or a stat doesn't exist.
+        """
+        target = np.zeros(len(self.stats), dtype=np.float64)
+        mask = self.mask(ranges)
+        if isinstance(spread, str):
+            index = self.index_of(spread)
+            target[:] = self.values[index]
+            mask[index] = False
+        else:
+            for stat, value in spread.items():
+                if stat not in self._stat_index:
+                    raise ValueError(f'stat "{stat}" does not exist.')
+                target[self._stat_index[stat]] = value
+        values = self.values.astype(np.float64)
+        if proportional:
+            values /= np.maximum(values.sum(axis=1, keepdims=True), 1)
+            target /= max(target.sum(), 1)
+        distances = np.sqrt(((values - target) ** 2).sum(axis=1))
+        candidates = np.flatnonzero(mask)
+        if k <= 0 or not len(candidates):
+            return []
+        return self._top(distances, candidates, k)
@@ -0,0 +1,248 @@
+"""
+Type effectiveness as precomputed NumPy matrices, one per generation, built
+from every `type` resource (including `past_damage_relations`). Lookups are
+array indexing instead of scanning `damage_relations` lists, and the whole
+chart saves to a small .npz file that loads instantly.
+
+```python
+>>> chart = await TypeChart.from_client(client)
+>>> chart.save()
+>>> chart = TypeChart.load()
+>>> chart.multiplier('fire', ['grass', 'steel'])
+4.0
+>>> chart.multiplier('ghost', 'steel', generation=4)
+0.5
+```
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+from aiokemon.core.cache import BaseCache
+from aiokemon.data.common import (DATA_DIR, generation_number, name_of, np,
+                                  require_numpy, resources_from_cache,
+                                  resources_from_client)
+
+TYPE_CHART_FILE = DATA_DIR / 'type_chart.npz'
+# PokéAPI's `unknown`, `shadow` and `stellar` types have ids above this and
+# don't take part in type matchups
+MAX_TYPE_ID = 10000
+RELATION_MULTIPLIERS = {'no_damage': 0.0, 'half_damage': 0.5,
+                        'double_damage': 2.0}
+Generation = Union[int, str, None]
+Typing = Union[str, Sequence[str], None]
+
+
+def _relations_for(type_data: dict, generation: int) -> dict:
+    """The damage relations a type had in a generation. Each entry of
+    `past_damage_relations` holds the relations used up to and including its
+    generation.
+    """
+    past = sorted(
+        (generation_number(entry['generation']['name']),
+         entry['damage_relations'])
+        for entry in type_data.get('past_damage_relations') or ()
+    )
+    for last_generation, relations in past:
+        if generation <= last_generation:
+            return relations
+    return type_data.get('damage_relations') or {}
+
+
+class TypeChart:
+    """Attacking type x defending type multipliers for every generation.
+
+    `charts[g - 1, a, d]` is the multiplier of attacking type `a` against
+    defending type `d` in generation `g`, indexed like `types`. Every chart
+    has one extra row and column, `NONE`, full of 1.0s, which stands for "no
+    second type" so that single and dual types can be looked up the same
+    way.
+    """
+
+    def __init__(self, types: Sequence[str], charts,
+                 introduced: Sequence[int]) -> None:
+        require_numpy('TypeChart')
+        self.types = list(types)
+        self.charts = np.asarray(charts, dtype=np.float32)
+        self.introduced = np.asarray(introduced, dtype=np.int16)
+        self.NONE = len(self.types)
+        self._index = {name: i for i, name in enumerate(self.types)}
+
+    @property
+    def generations(self) -> int:
+        """The last generation with its own chart. Later generations use
+        its chart.
+        """
+        return len(self.charts)
+
+    @classmethod
+    def from_resources(cls, types: Iterable[dict]) -> 'TypeChart':
+        require_numpy('TypeChart')
+        types = sorted(
+            (data for data in types
+             if (data.get('id') or 0) < MAX_TYPE_ID),
+            key=lambda d: d.get('id') or 0
+        )
+        names = [data['name'] for data in types]
+        index = {name: i for i, name in enumerate(names)}
+        introduced = [
+            generation_number(data['generation']['name'])
+            if data.get('generation') else 1
+            for data in types
+        ]
+        last_generation = max(introduced, default=1)
+        for data in types:
+            for entry in data.get('past_damage_relations') or ():
+                last_generation = max(
+                    last_generation,
+                    generation_number(entry['generation']['name']) + 1
+                )
+
+        size = len(names) + 1
+        charts = np.ones((last_generation, size, size), dtype=np.float32)
+        for generation in range(1, last_generation + 1):
+            chart = charts[generation - 1]
+            for i, data in enumerate(types):
+                relations = _relations_for(data, generation)
+                for prefix, multiplier in RELATION_MULTIPLIERS.items():
+                    for other in relations.get(f'{prefix}_to') or ():
+                        j = index.get(name_of(other))
+                        if j is not None:
+                            chart[i, j] = multiplier
+                    for other in relations.get(f'{prefix}_from') or ():
+                        j = index.get(name_of(other))
+                        if j is not None:
+                            chart[j, i] = multiplier
+        return cls(names, charts, introduced + [0])
+
+    @classmethod
+    def from_cache(cls, cache: BaseCache) -> 'TypeChart':
+        """Builds the chart from every cached `type` resource."""
+        return cls.from_resources(resources_from_cache(cache, 'type'))
+
+    @classmethod
+    async def from_client(cls, client) -> 'TypeChart':
+        """Builds the chart from every `type` resource, fetched in bulk."""
+        return cls.from_resources(await resources_from_client(client, 'type'))
+
+    def save(self, file_path: Union[str, Path] = TYPE_CHART_FILE) -> None:
+        file_path = Path(file_path)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(file_path, types=np.array(self.types), charts=self.charts,
+                 introduced=self.introduced)
+
+    @classmethod
+    def load(cls, file_path: Union[str, Path] = TYPE_CHART_FILE
+             ) -> 'TypeChart':
+        require_numpy('TypeChart')
+        with np.load(file_path, allow_pickle=False) as data:
+            return cls(data['types'].tolist(), data['charts'],
+                       data['introduced'])
+
+    def _chart(self, generation: Generation):
+        if generation is None:
+            return self.charts[-1]
+        if isinstance(generation, str):
+            generation = generation_number(generation)
+        return self.charts[min(max(generation, 1), self.generations) - 1]
+
+    def index_of(self, type_name: Optional[str]) -> int:
+        """The row/column of a type, or `NONE` for None.
+
+        ## Raises
+        `ValueError` if the type doesn't exist.
+        """
+        if type_name is None:
+            return self.NONE
+        try:
+            return self._index[type_name]
+        except KeyError:
+            raise ValueError(f'type "{type_name}" does not exist.') from None
+
+    def encode(self, type_names: Iterable[Optional[str]]):
+        """Turns type names into an array of indexes for vectorized
+        lookups.
+        """
+        return np.array([self.index_of(name) for name in type_names],
+                        dtype=np.intp)
+
+    def _typing(self, typing: Typing) -> List[int]:
+        if typing is None or isinstance(typing, str):
+            return [self.index_of(typing)]
+        return [self.index_of(name) for name in typing] or [self.NONE]
+
+    def types_in(self, generation: Generation = None) -> List[str]:
+        """The types that existed in a generation (the latest by
+        default).
+        """
+        if generation is None:
+            return list(self.types)
+        if isinstance(generation, str):
+            generation = generation_number(generation)
+        return [name for name, introduced in zip(self.types, self.introduced)
+                if introduced <= generation]
+
+    def multiplier(self, attack: str, defense: Typing,
+                   generation: Generation = None) -> float:
+        """The multiplier of an attacking type against a single type or a
+        list of types (i.e. `['grass', 'steel']`).
+        """
+        chart = self._chart(generation)
+        row = chart[self.index_of(attack)]
+        result = 1.0
+        for i in self._typing(defense):
+            result *= float(row[i])
+        return result
+
+    def defense_multipliers(self, defense: Typing,
+                            generation: Generation = None):
+        """The multipliers of every attacking type against a defender at
+        once, as an array in the order of `types`.
+        """
+        chart = self._chart(generation)
+        return chart[:-1, self._typing(defense)].prod(axis=1)
+
+    def attack_multipliers(self, attack: str,
+                           generation: Generation = None):
+        """The multipliers of an attacking type against every single type,
+        as an array in the order of `types`.
+        """
+        return self._chart(generation)[self.index_of(attack), :-1].copy()
+
+    def team_multipliers(self, team: Sequence[Typing],
+                         generation: Generation = None):
+        """Multipliers of every attacking type against every member of a
+        team, as a `(len(types), len(team))` array. Each member is a type
+        or a list of up to two types.
+        """
+        first = []
+        second = []
+        for typing in team:
+            indexes = self._typing(typing)
+            if len(indexes) > 2:
+                raise ValueError('Pokémon have at most two types.')
+            first.append(indexes[0])
+            second.append(indexes[1] if len(indexes) > 1 else self.NONE)
+        return self.lookup(np.arange(self.NONE)[:, None], np.array(first),
+                           np.array(second), generation)
+
+    def lookup(self, attacks, defenses, second_defenses=None,
+               generation: Generation = None):
+        """Fully vectorized lookup on index arrays (see `encode`). The
+        arrays broadcast against each other like any NumPy arrays; use
+        `NONE` in `second_defenses` for single-typed defenders.
+        """
+        chart = self._chart(generation)
+        result = chart[attacks, defenses]
+        if second_defenses is not None:
+            result = result * chart[attacks, second_defenses]
+        return result
+
+    def weaknesses(self, defense: Typing,
+                   generation: Generation = None) -> Dict[str, float]:
+        """Every attacking type that isn't neutral against a defender, with
+        its multiplier.
+        """
+        multipliers = self.defense_multipliers(defense, generation)
+        return {name: float(m) for name, m in zip(self.types, multipliers)
+                if m != 1.0}
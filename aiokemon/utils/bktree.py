@@ -0,0 +1,184 @@
+import heapq
+from typing import Callable, Iterable, List, Optional, Tuple
+
+Metric = Callable[[str, str], int]
+
+
+class _Worst:
+    """Heap entry that orders higher scores (then later words) first, so a
+    plain min-heap of them pops the worst of the k best words.
+    """
+
+    __slots__ = ('score', 'word')
+
+    def __init__(self, score: int, word: str) -> None:
+        self.score = score
+        self.word = word
+
+    def __lt__(self, other: '_Worst') -> bool:
+        return (self.score, self.word) > (other.score, other.word)
+
+
+class BKTree:
+    """Burkhard-Keller tree for fast fuzzy lookups of strings under an edit
+    distance. Every child of a node sits at a known distance from it, so by
+    the triangle inequality whole subtrees can be skipped during a search.
+
+    The tree's `metric` must be a true metric. Searches can still rank
+    results by a different `score`, as long as
+    `metric(a, b) <= slack * score(a, b)` for all strings. For example, OSA
+    distance isn't a metric, but Levenshtein distance never exceeds twice
+    the OSA distance.
+    """
+
+    def __init__(self, metric: Metric, words: Iterable[str] = ()) -> None:
+        self._metric = metric
+        # Each node is [word, {distance: child node}]
+        self._root = None
+        self._size = 0
+        for word in words:
+            self.add(word)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, word: str) -> None:
+        if self._root is None:
+            self._root = [word, {}]
+            self._size = 1
+            return
+        node = self._root
+        while True:
+            distance = self._metric(word, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = [word, {}]
+                self._size += 1
+                return
+            node = child
+
+    def search(self, query: str, radius: int) -> List[Tuple[str, int]]:
+        """Returns every word within `radius` of the query, with its
+        distance, closest first.
+        """
+        results = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            word, children = stack.pop()
+            distance = self._metric(query, word)
+            if distance <= radius:
+                results.append((word, distance))
+            for child_distance, child in children.items():
+                if distance - radius <= child_distance <= distance + radius:
+                    stack.append(child)
+        results.sort(key=lambda t: (t[1], t[0]))
+        return results
+
+    def nearest(self, query: str, score: Optional[Metric] = None,
+                slack: int = 1, max_score: Optional[int] = None,
+                bounded: bool = False
+                ) -> Tuple[Optional[str], Optional[int]]:
+        """Finds the word with the lowest `score(word, query)` (the tree's
+        metric if no score is given), breaking ties alphabetically. Returns
+        `(None, None)` if no word scores `max_score` or less.
+
+        If `bounded` is True, `score` is called as
+        `score(word, query, max_distance)` with the best score so far, so it
+        can give up on words that can't win (see `levenshtein_osa`).
+
+        Every word below the edge `k` of a node is exactly `k` away from that
+        node, so `|distance - k|` is a lower bound for the whole subtree.
+        Subtrees are visited best bound first and the search stops once no
+        bound can beat the best word found so far.
+        """
+        if self._root is None:
+            return None, None
+        score = score or self._metric
+        best_word = None
+        best_score = float('inf') if max_score is None else max_score
+        # (lower bound, tiebreaker, node)
+        heap = [(0, 0, self._root)]
+        pushed = 1
+        while heap:
+            bound, _, (word, children) = heapq.heappop(heap)
+            if bound > slack * best_score:
+                break
+            distance = self._metric(query, word)
+            if distance <= slack * best_score:
+                if score is self._metric:
+                    word_score = distance
+                elif bounded and best_score != float('inf'):
+                    word_score = score(word, query, best_score)
+                else:
+                    word_score = score(word, query)
+                if (
+                    word_score < best_score
+                    or (word_score == best_score
+                        and (best_word is None or word < best_word))
+                ):
+                    best_word, best_score = word, word_score
+                    if best_score == 0:
+                        break
+            radius = slack * best_score
+            for child_distance, child in children.items():
+                child_bound = abs(distance - child_distance)
+                if child_bound <= radius:
+                    heapq.heappush(
+                        heap, (max(bound, child_bound), pushed, child)
+                    )
+                    pushed += 1
+        if best_word is None:
+            return None, None
+        return best_word, best_score
+
+    def nearest_k(self, query: str, k: int, score: Optional[Metric] = None,
+                  slack: int = 1, max_score: Optional[int] = None,
+                  bounded: bool = False) -> List[Tuple[str, int]]:
+        """Finds the `k` words with the lowest scores, closest first (ties
+        alphabetically), ignoring any that score more than `max_score`.
+        Arguments work like they do for `nearest`.
+
+        The k best words so far are kept in a bounded heap with the worst of
+        them on top, so the search radius shrinks to the k-th best score as
+        soon as k words have been found and nothing ever gets fully sorted
+        but the final k.
+        """
+        if self._root is None or k <= 0:
+            return []
+        score = score or self._metric
+        limit = float('inf') if max_score is None else max_score
+        best = []
+        heap = [(0, 0, self._root)]
+        pushed = 1
+        while heap:
+            bound, _, (word, children) = heapq.heappop(heap)
+            if bound > slack * limit:
+                break
+            distance = self._metric(query, word)
+            if distance <= slack * limit:
+                if score is self._metric:
+                    word_score = distance
+                elif bounded and limit != float('inf'):
+                    word_score = score(word, query, limit)
+                else:
+                    word_score = score(word, query)
+                if word_score <= limit:
+                    entry = _Worst(word_score, word)
+                    if len(best) < k:
+                        heapq.heappush(best, entry)
+                    elif best[0] < entry:
+                        heapq.heapreplace(best, entry)
+                    if len(best) == k:
+                        limit = best[0].score
+            radius = slack * limit
+            for child_distance, child in children.items():
+                child_bound = abs(distance - child_distance)
+                if child_bound <= radius:
+                    heapq.heappush(
+                        heap, (max(bound, child_bound), pushed, child)
+                    )
+                    pushed += 1
+        return sorted(((e.word, e.score) for e in best),
+                      key=lambda t: (t[1], t[0]))
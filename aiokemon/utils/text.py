@@ -1,7 +1,199 @@
-def levenshtein_osa(a: str, b: str) -> int:
+import unicodedata
+from typing import Dict, Iterable, List, Optional
+
+# Combining marks on characters up to the end of Latin Extended-B are
+# accents (é, ü, ñ) and get dropped; marks on anything else (i.e. kana
+# dakuten) change the letter and are kept
+_LATIN_END = '\u024f'
+_HIRAGANA = range(0x3041, 0x3097)
+_KATAKANA_OFFSET = 0x60
+
+
+def normalize_name(name: str) -> str:
+    """Normalizes a localized name so that different ways of typing it
+    compare equal: Unicode compatibility forms are unified (full-width
+    letters, half-width kana), case is folded, accents on Latin letters are
+    dropped, hiragana becomes katakana, and spaces and punctuation are
+    removed. For example `Mr. Mime`, `mr mime` and `ＭＲ．ＭＩＭＥ` all become
+    `mrmime`, and `ぴかちゅう` becomes `ピカチュウ`.
+    """
+    decomposed = unicodedata.normalize('NFKD', name.casefold())
+    chars = []
+    base = ''
+    for char in decomposed:
+        category = unicodedata.category(char)
+        if category == 'Mn':
+            if base > _LATIN_END:
+                chars.append(char)
+            continue
+        base = char
+        if category[0] in 'LNS':
+            if ord(char) in _HIRAGANA:
+                char = chr(ord(char) + _KATAKANA_OFFSET)
+            chars.append(char)
+    return unicodedata.normalize('NFKC', ''.join(chars))
+
+
+# Above this many characters in the shorter string, the banded two-row
+# algorithm beats big-int bit vectors when a small max_distance is given
+BIT_PARALLEL_MAX_LENGTH = 512
+
+
+def _match_vectors(pattern: str) -> Dict[str, int]:
+    """Bit i of a character's vector is set if pattern[i] is that
+    character.
+    """
+    vectors = {}
+    bit = 1
+    for char in pattern:
+        vectors[char] = vectors.get(char, 0) | bit
+        bit <<= 1
+    return vectors
+
+
+def _bit_parallel(vectors: Dict[str, int], m: int, text: str,
+                  transpositions: bool, max_distance: Optional[int]) -> int:
+    """Myers' bit-vector edit distance, with Hyyrö's extension for adjacent
+    transpositions (OSA distance). Column j of the DP matrix is encoded as
+    the vertical +1/-1 deltas VP/VN, so each character of `text` costs a
+    fixed handful of integer operations no matter how long the pattern is
+    (Python ints grow as needed, so there's no 64-character limit).
+
+    If `max_distance` is given, returns `max_distance + 1` as soon as the
+    distance is known to exceed it.
+    """
+    n = len(text)
+    if not m:
+        return n
+    full = (1 << m) - 1
+    last = 1 << (m - 1)
+    VP = full
+    VN = 0
+    D0 = 0
+    PM_prev = 0
+    score = m
+    for j, char in enumerate(text, start=1):
+        PM = vectors.get(char, 0)
+        if transpositions:
+            TR = (((~D0 & PM) << 1) & PM_prev)
+            PM_prev = PM
+        else:
+            TR = 0
+        D0 = ((((PM & VP) + VP) ^ VP) | PM | VN | TR) & full
+        HP = VN | (~(D0 | VP) & full)
+        HN = D0 & VP
+        if HP & last:
+            score += 1
+        elif HN & last:
+            score -= 1
+        # Each remaining character can lower the score by at most one
+        if max_distance is not None and score - (n - j) > max_distance:
+            return max_distance + 1
+        HP = ((HP << 1) | 1) & full
+        HN = (HN << 1) & full
+        VP = HN | (~(D0 | HP) & full)
+        VN = HP & D0
+    return score
+
+
+def levenshtein_osa_rows(a: str, b: str,
+                         max_distance: Optional[int] = None) -> int:
+    """OSA distance using only the last three rows of the DP matrix instead
+    of all of them. With `max_distance`, only the diagonal band of width
+    `2 * max_distance + 1` is computed and the function returns
+    `max_distance + 1` once a whole row exceeds it, so the cost is
+    O(len * max_distance) for very long strings.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    a_len = len(a)
+    b_len = len(b)
+    if max_distance is not None and a_len - b_len > max_distance:
+        return max_distance + 1
+    big = a_len + b_len + 1
+    band = big if max_distance is None else max_distance
+    prev_prev = None
+    prev = list(range(b_len + 1))
+    for i in range(1, a_len + 1):
+        row = [big] * (b_len + 1)
+        lo = max(1, i - band)
+        hi = min(b_len, i + band)
+        if lo == 1:
+            row[0] = i
+        a_char = a[i - 1]
+        for j in range(lo, hi + 1):
+            cost = a_char != b[j - 1]
+            value = min(prev[j] + 1,                    # deletion
+                        row[j - 1] + 1,                 # insertion
+                        prev[j - 1] + cost)             # substitution
+            if (
+                    i > 1 and j > 1
+                and a_char == b[j - 2] and a[i - 2] == b[j - 1]
+            ):
+                value = min(value, prev_prev[j - 2] + 1)  # transposition
+            row[j] = value
+        if max_distance is not None and min(row[lo - 1:hi + 1]) > max_distance:
+            return max_distance + 1
+        prev_prev, prev = prev, row
+    distance = prev[b_len]
+    if max_distance is not None and distance > max_distance:
+        return max_distance + 1
+    return distance
+
+
+def levenshtein_osa(a: str, b: str, max_distance: Optional[int] = None
+                    ) -> int:
     """A slightly-modified version of the traditional Levenshtein algorithm
     that considers an adjacent character swap as one operation rather than
     two.
+
+    If `max_distance` is given, any distance greater than it is returned as
+    `max_distance + 1`, which lets hopeless candidates bail out early.
+    """
+    a_len = len(a)
+    b_len = len(b)
+    if max_distance is not None:
+        if abs(a_len - b_len) > max_distance:
+            return max_distance + 1
+        if min(a_len, b_len) > BIT_PARALLEL_MAX_LENGTH:
+            return levenshtein_osa_rows(a, b, max_distance)
+    return _bit_parallel(_match_vectors(a), a_len, b, True, max_distance)
+
+
+def levenshtein(a: str, b: str, max_distance: Optional[int] = None) -> int:
+    """The classic Levenshtein distance (insertions, deletions and
+    substitutions), computed with Myers' bit-vector algorithm.
+    """
+    if max_distance is not None and abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    return _bit_parallel(_match_vectors(a), len(a), b, False, max_distance)
+
+
+def osa_distances(query: str, candidates: Iterable[str],
+                  max_distance: Optional[int] = None) -> List[int]:
+    """Scores one query against many candidates at once. The query's match
+    vectors are only built once, which is most of the setup cost of
+    `levenshtein_osa`. Distances above `max_distance` are returned as
+    `max_distance + 1`.
+    """
+    vectors = _match_vectors(query)
+    m = len(query)
+    distances = []
+    for candidate in candidates:
+        if max_distance is not None and abs(len(candidate) - m) > max_distance:
+            distances.append(max_distance + 1)
+        else:
+            distances.append(
+                _bit_parallel(vectors, m, candidate, True, max_distance)
+            )
+    return distances
+
+
+def levenshtein_osa_matrix(a: str, b: str) -> int:
+    """A slightly-modified version of the traditional Levenshtein algorithm
+    that considers an adjacent character swap as one operation rather than
+    two. This is the textbook full-matrix version of `levenshtein_osa`, kept
+    as a reference implementation and benchmark baseline.
     """
     a_len = len(a)
     b_len = len(b)
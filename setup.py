@@ -20,5 +20,8 @@ setup(
         'aiohttp-client-cache',
         'aiosqlite',
     ],
+    extras_require={
+        'data': ['numpy'],
+    },
     license='BSD-3-Clause license'
 )
@@ -0,0 +1,109 @@
+"""
+Benchmarks the edit distance functions in aiokemon.utils.text against the
+original full-matrix `levenshtein_osa_matrix`, scoring every query against
+every name the way a brute-force fuzzy match would.
+
+Usage:
+```
+python -m testing.bench_distance --names 1300 --queries 100
+python -m testing.bench_distance --max-distance 3
+```
+"""
+
+import argparse
+import random
+import time
+from typing import Callable, List, Optional
+
+from aiokemon.utils.text import (levenshtein_osa, levenshtein_osa_matrix,
+                                 levenshtein_osa_rows, osa_distances)
+
+SYLLABLES = (
+    'pi', 'ka', 'chu', 'char', 'man', 'der', 'bul', 'ba', 'saur', 'squir',
+    'tle', 'ga', 'ry', 'do', 'os', 'zel', 'eon', 'sa', 'ma', 'lo', 'ri',
+    'to', 'gar', 'chomp', 'bre', 'loom', 'aegi', 'slash', 'quil', 'fla'
+)
+FORMS = ('alola', 'galar', 'mega', 'gmax', 'shield', 'origin', 'hisui')
+
+
+def synthetic_names(n: int, seed: int = 0) -> List[str]:
+    """Makes `n` distinct Pokémon-looking names."""
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < n:
+        name = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        if rng.random() < 0.2:
+            name += '-' + rng.choice(FORMS)
+        names.add(name)
+    return sorted(names)
+
+
+def misspell(word: str, rng: random.Random) -> str:
+    """Deletes, inserts or swaps one character of a word."""
+    i = rng.randrange(len(word) - 1)
+    op = rng.randrange(3)
+    if op == 0:
+        return word[:i] + word[i + 1:]
+    if op == 1:
+        return word[:i] + rng.choice('abcdefghijklmnopqrstuvwxyz') + word[i:]
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def time_pairwise(distance: Callable, queries: List[str], names: List[str],
+                  max_distance: Optional[int]) -> float:
+    start = time.perf_counter()
+    if max_distance is None:
+        for query in queries:
+            for name in names:
+                distance(query, name)
+    else:
+        for query in queries:
+            for name in names:
+                distance(query, name, max_distance)
+    return time.perf_counter() - start
+
+
+def time_batched(queries: List[str], names: List[str],
+                 max_distance: Optional[int]) -> float:
+    start = time.perf_counter()
+    for query in queries:
+        osa_distances(query, names, max_distance)
+    return time.perf_counter() - start
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--names', type=int, default=1300)
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--max-distance', type=int, default=None,
+                        help='cutoff passed to the bounded functions')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    names = synthetic_names(args.names, args.seed)
+    queries = [misspell(rng.choice(names), rng) for _ in range(args.queries)]
+    pairs = len(names) * len(queries)
+
+    results = [
+        ('levenshtein_osa_matrix',
+         time_pairwise(levenshtein_osa_matrix, queries, names, None)),
+        ('levenshtein_osa_rows',
+         time_pairwise(levenshtein_osa_rows, queries, names,
+                       args.max_distance)),
+        ('levenshtein_osa',
+         time_pairwise(levenshtein_osa, queries, names, args.max_distance)),
+        ('osa_distances', time_batched(queries, names, args.max_distance)),
+    ]
+    baseline = results[0][1]
+    print(f'{pairs} comparisons, max_distance={args.max_distance}')
+    print(f'{"function":<24} {"total ms":>10} {"us/pair":>8} {"speedup":>8}')
+    for name, elapsed in results:
+        print(
+            f'{name:<24} {elapsed * 1000:>10.1f} '
+            f'{elapsed / pairs * 1e6:>8.2f} {baseline / elapsed:>7.1f}x'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,243 @@
+"""
+End-to-end load-test benchmark for PokeAPIClient. Runs the client against
+testing/mock_server.py so nothing ever touches pokeapi.co.
+
+Three workloads are measured:
+
+- `cold`: a fresh client and an empty cache, so every lookup hits the server
+- `warm`: the same lookups again on the now-populated cache
+- `bulk`: a fresh client that gathers every lookup at once
+
+For each one it reports throughput, p50/p95/p99 latency, error counts, how
+many sockets the server saw, the peak number of in-flight requests and the
+peak memory allocated by Python during the workload.
+
+Usage:
+```
+python -m testing.benchmark --latency 0.01 --concurrency 50
+python -m testing.benchmark --pokemon 500 --json > results.json
+python -m testing.benchmark --from-cache ~/.cache/aiokemon/pickle_cache
+```
+"""
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from aiohttp import ClientError, ClientSession, TCPConnector
+
+from aiokemon.core.cache import PickleFileCache
+from aiokemon.core.client import PokeAPIClient
+from testing.mock_server import (MockPokeAPIServer, load_pickle_cache,
+                                 synthetic_payloads)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already-sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(name: str, latencies: List[float], errors: int,
+              elapsed: float, peak_memory: int, server_stats: dict) -> dict:
+    latencies = sorted(latencies)
+    total = len(latencies) + errors
+    return {
+        'workload': name,
+        'requests': total,
+        'errors': errors,
+        'elapsed_s': elapsed,
+        'throughput_rps': total / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'peak_memory_kib': peak_memory / 1024,
+        'server_requests': server_stats['requests'],
+        'server_statuses': server_stats['statuses'],
+        'sockets': server_stats['connections'],
+        'peak_in_flight': server_stats['peak_in_flight'],
+    }
+
+
+async def run_workload(name: str, client: PokeAPIClient,
+                       server: MockPokeAPIServer, lookups: List[str],
+                       fetch: Callable, concurrency: Optional[int],
+                       trace_memory: bool = True) -> dict:
+    """Runs every lookup through `fetch` with at most `concurrency` lookups
+    in flight (or all of them at once if `concurrency` is None). tracemalloc
+    slows Python down quite a bit, so pass `trace_memory=False` when only
+    throughput and latency matter.
+    """
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency or len(lookups) or 1)
+
+    async def timed(lookup: str) -> None:
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await fetch(client, lookup)
+            except (ClientError, asyncio.TimeoutError):
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - start)
+
+    server.reset_stats()
+    peak_memory = 0
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    await asyncio.gather(*(timed(lookup) for lookup in lookups))
+    elapsed = time.perf_counter() - start
+    if trace_memory:
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return summarize(name, latencies, errors, elapsed, peak_memory,
+                     server.stats())
+
+
+class QuietPickleFileCache(PickleFileCache):
+    """PickleFileCache that dumps without printing, so nothing but the
+    report goes to stdout.
+    """
+
+    def safe_dump(self) -> None:
+        if self._has_changed:
+            self._dump_cache()
+            self._has_changed = False
+
+
+def new_client(server: MockPokeAPIServer, cache_dir: str, connections: int,
+               match: bool, max_retries: int = 0,
+               lazy: bool = False, models: bool = False) -> PokeAPIClient:
+    session = ClientSession(connector=TCPConnector(limit=connections))
+    return PokeAPIClient(
+        session, match=match, cache=QuietPickleFileCache(cache_dir),
+        base_url=server.base_url, max_retries=max_retries, lazy=lazy,
+        models=models
+    )
+
+
+async def fetch_pokemon(client: PokeAPIClient, name: str) -> None:
+    await client.pokemon(name)
+
+
+async def run_benchmark(server: MockPokeAPIServer, lookups: List[str], *,
+                        concurrency: int = 50, connections: int = 100,
+                        match: bool = False, trace_memory: bool = True,
+                        max_retries: int = 0, lazy: bool = False,
+                        models: bool = False) -> List[dict]:
+    results = []
+    with tempfile.TemporaryDirectory() as cold_dir:
+        client = new_client(
+            server, cold_dir, connections, match, max_retries, lazy, models
+        )
+        async with client:
+            results.append(await run_workload(
+                'cold', client, server, lookups, fetch_pokemon, concurrency,
+                trace_memory
+            ))
+            results.append(await run_workload(
+                'warm', client, server, lookups, fetch_pokemon, concurrency,
+                trace_memory
+            ))
+    with tempfile.TemporaryDirectory() as bulk_dir:
+        client = new_client(
+            server, bulk_dir, connections, match, max_retries, lazy, models
+        )
+        async with client:
+            results.append(await run_workload(
+                'bulk', client, server, lookups, fetch_pokemon, None,
+                trace_memory
+            ))
+    return results
+
+
+def print_report(results: List[Dict]) -> None:
+    header = (
+        f'{"workload":<8} {"reqs":>6} {"errs":>5} {"req/s":>9} '
+        f'{"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"sockets":>8} '
+        f'{"peak in":>8} {"peak KiB":>10}'
+    )
+    print(header)
+    print('-' * len(header))
+    for r in results:
+        print(
+            f'{r["workload"]:<8} {r["requests"]:>6} {r["errors"]:>5} '
+            f'{r["throughput_rps"]:>9.1f} {r["p50_ms"]:>8.2f} '
+            f'{r["p95_ms"]:>8.2f} {r["p99_ms"]:>8.2f} {r["sockets"]:>8} '
+            f'{r["peak_in_flight"]:>8} {r["peak_memory_kib"]:>10.0f}'
+        )
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--pokemon', type=int, default=300,
+                        help='number of synthetic pokemon to serve and fetch')
+    parser.add_argument('--moves-per-pokemon', type=int, default=60)
+    parser.add_argument('--from-cache', metavar='DIR',
+                        help='serve payloads dumped by a PickleFileCache '
+                        'instead of synthetic ones')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='seconds of latency the server adds per request')
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0)
+    parser.add_argument('--retry-after', type=int, default=0,
+                        help='Retry-After seconds sent with 429s')
+    parser.add_argument('--max-retries', type=int, default=0,
+                        help='client retries for 429 and 503 responses')
+    parser.add_argument('--concurrency', type=int, default=50,
+                        help='max lookups in flight for cold/warm workloads')
+    parser.add_argument('--connections', type=int, default=100,
+                        help='aiohttp connector connection limit')
+    parser.add_argument('--match', action='store_true',
+                        help='enable fuzzy resource matching')
+    parser.add_argument('--lazy', action='store_true',
+                        help='build resource attributes lazily')
+    parser.add_argument('--models', action='store_true',
+                        help='build resources as generated __slots__ models')
+    parser.add_argument('--no-memory', action='store_true',
+                        help="don't trace memory (tracemalloc is slow)")
+    parser.add_argument('--json', action='store_true',
+                        help='print results as JSON instead of a table')
+    return parser.parse_args(argv)
+
+
+async def main(argv: Optional[List[str]] = None) -> List[dict]:
+    args = parse_args(argv)
+    if args.from_cache:
+        payloads = load_pickle_cache(args.from_cache)
+    else:
+        payloads = synthetic_payloads(
+            n_pokemon=args.pokemon, moves_per_pokemon=args.moves_per_pokemon
+        )
+    lookups = [mon['name'] for mon in payloads.get('pokemon', [])]
+    server = MockPokeAPIServer(
+        payloads, latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after
+    )
+    async with server:
+        results = await run_benchmark(
+            server, lookups, concurrency=args.concurrency,
+            connections=args.connections, match=args.match,
+            trace_memory=not args.no_memory, max_retries=args.max_retries,
+            lazy=args.lazy, models=args.models
+        )
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
+    return results
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,340 @@
+"""
+A local stand-in for the PokéAPI server built on aiohttp.web. It serves either
+synthetic payloads or payloads dumped from a PickleFileCache, and it can be
+configured to add latency, random server errors and 429 rate-limit responses.
+
+It's mostly used by testing/benchmark.py so the client can be measured under
+load without hammering pokeapi.co, but it works fine on its own too:
+
+```python
+>>> async with MockPokeAPIServer(synthetic_payloads(), latency=0.01) as server:
+>>>     async with PokeAPIClient(base_url=server.base_url) as client:
+>>>         mon = await client.pokemon('pokemon-1')
+```
+"""
+
+import asyncio
+import json
+import pickle
+import random
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from aiohttp import web
+
+import aiokemon.core.common as cmn
+from aiokemon.core.cache import BASE_CACHE_DIR
+
+# endpoint -> list of raw resource dicts, plus the optional encounters dict
+# that maps a pokemon's id to its location_area_encounters list
+Payloads = Dict[str, List[dict]]
+URL_PLACEHOLDER = cmn.BASE_URL
+TYPE_NAMES = (
+    'normal', 'fighting', 'flying', 'poison', 'ground', 'rock', 'bug', 'ghost',
+    'steel', 'fire', 'water', 'grass', 'electric', 'psychic', 'ice', 'dragon',
+    'dark', 'fairy'
+)
+STAT_NAMES = (
+    'hp', 'attack', 'defense', 'special-attack', 'special-defense', 'speed'
+)
+
+
+def _named(endpoint: str, name: str, id_: int) -> dict:
+    return {'name': name, 'url': f'{URL_PLACEHOLDER}{endpoint}/{id_}/'}
+
+
+def synthetic_payloads(n_pokemon: int = 1000, n_moves: int = 800,
+                       moves_per_pokemon: int = 60,
+                       version_groups_per_move: int = 4,
+                       seed: Optional[int] = 0) -> Payloads:
+    """Generates a fake but PokéAPI-shaped dataset. Pokemon are the largest
+    payloads since each move carries a list of version group details, which
+    is exactly the shape that makes real Pokemon responses expensive.
+    """
+    rng = random.Random(seed)
+    types = [
+        {'id': i, 'name': name, 'damage_relations': {
+            key: [_named('type', TYPE_NAMES[j], j + 1)
+                  for j in rng.sample(range(len(TYPE_NAMES)), 3)]
+            for key in ('no_damage_to', 'half_damage_to', 'double_damage_to',
+                        'no_damage_from', 'half_damage_from',
+                        'double_damage_from')
+        }, 'past_damage_relations': [], 'names': [
+            {'name': name.title(), 'language': _named('language', 'en', 9)}
+        ]}
+        for i, name in enumerate(TYPE_NAMES, start=1)
+    ]
+    moves = [
+        {'id': i, 'name': f'move-{i}', 'accuracy': 100, 'pp': 10,
+         'power': rng.choice((None, 40, 60, 80, 100, 120)), 'priority': 0,
+         'type': _named('type', TYPE_NAMES[i % len(TYPE_NAMES)],
+                        i % len(TYPE_NAMES) + 1),
+         'damage_class': _named('move-damage-class', 'physical', 2),
+         'names': [{'name': f'Move {i}',
+                    'language': _named('language', 'en', 9)}]}
+        for i in range(1, n_moves + 1)
+    ]
+    pokemon = []
+    for i in range(1, n_pokemon + 1):
+        mon_moves = [
+            {'move': _named('move', f'move-{m}', m), 'version_group_details': [
+                {'level_learned_at': rng.randint(0, 100),
+                 'move_learn_method': _named('move-learn-method', 'level-up', 1),
+                 'version_group': _named('version-group', f'vg-{v}', v)}
+                for v in range(1, version_groups_per_move + 1)
+            ]}
+            for m in rng.sample(range(1, n_moves + 1),
+                                min(moves_per_pokemon, n_moves))
+        ]
+        pokemon.append({
+            'id': i,
+            'name': f'pokemon-{i}',
+            'base_experience': rng.randint(30, 300),
+            'height': rng.randint(1, 50),
+            'weight': rng.randint(1, 2000),
+            'is_default': True,
+            'order': i,
+            'abilities': [
+                {'ability': _named('ability', f'ability-{a}', a),
+                 'is_hidden': a == 3, 'slot': a}
+                for a in (1, 2, 3)
+            ],
+            'forms': [_named('pokemon-form', f'pokemon-{i}', i)],
+            'game_indices': [],
+            'held_items': [],
+            'location_area_encounters':
+                f'{URL_PLACEHOLDER}pokemon/{i}/encounters',
+            'moves': mon_moves,
+            'past_types': [],
+            'species': _named('pokemon-species', f'pokemon-{i}', i),
+            'sprites': {'front_default': None, 'back_default': None},
+            'stats': [
+                {'base_stat': rng.randint(5, 200), 'effort': 0,
+                 'stat': _named('stat', stat, s)}
+                for s, stat in enumerate(STAT_NAMES, start=1)
+            ],
+            'types': [
+                {'slot': 1, 'type': _named(
+                    'type', TYPE_NAMES[i % len(TYPE_NAMES)],
+                    i % len(TYPE_NAMES) + 1
+                )}
+            ],
+        })
+    return {'pokemon': pokemon, 'move': moves, 'type': types}
+
+
+def load_pickle_cache(cache_dir: Optional[Union[str, Path]] = None
+                      ) -> Payloads:
+    """Loads real PokéAPI payloads that were previously dumped by a
+    PickleFileCache. Listing responses are skipped since the server builds
+    its own, and pokemon encounter lists are stored under `encounters`.
+    """
+    cache_dir = Path(cache_dir or BASE_CACHE_DIR / 'pickle_cache')
+    payloads = {}
+    for file_path in cache_dir.glob('*.pickle'):
+        with open(file_path, 'rb') as pickle_file:
+            pickle_data = pickle_file.read()
+        cached = pickle.loads(pickle_data) if pickle_data else {}
+        for url, compressed in cached.items():
+            if '?' in url:
+                continue
+            endpoint, resource = cmn.break_url(url)
+            data = json.loads(zlib.decompress(compressed).decode('utf-8'))
+            if url.rstrip('/').endswith('encounters'):
+                payloads.setdefault('encounters', []).append(
+                    {'id': resource, 'encounters': data}
+                )
+            elif resource is not None:
+                payloads.setdefault(endpoint, []).append(data)
+    return payloads
+
+
+class MockPokeAPIServer:
+    """Serves PokéAPI-shaped JSON from memory on a local port.
+
+    - `latency`/`jitter`: seconds added to every response (uniform jitter)
+    - `error_rate`: fraction of requests answered with a 500
+    - `rate_limit_rate`: fraction of requests answered with a 429 and a
+    `Retry-After` header of `retry_after` seconds
+
+    Responses are serialized once when the server starts, so the server
+    itself adds as little overhead as possible to the measurements.
+    """
+
+    def __init__(self, payloads: Optional[Payloads] = None, *,
+                 host: str = '127.0.0.1', port: int = 0,
+                 latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0,
+                 retry_after: int = 1, seed: Optional[int] = None) -> None:
+        self._payloads = synthetic_payloads() if payloads is None else payloads
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self._rng = random.Random(seed)
+        self._runner = None
+        self._resources = {}
+        self._listings = {}
+        self._encounters = {}
+        self.reset_stats()
+
+    @property
+    def base_url(self) -> str:
+        return f'http://{self.host}:{self.port}/api/v2/'
+
+    def reset_stats(self) -> None:
+        """Clears the request counters, i.e. between benchmark workloads."""
+        self.requests = 0
+        self.statuses = {}
+        self.bytes_sent = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._connections = set()
+
+    @property
+    def connections(self) -> int:
+        """Number of distinct client sockets seen since the last reset."""
+        return len(self._connections)
+
+    def stats(self) -> dict:
+        return {
+            'requests': self.requests,
+            'statuses': dict(self.statuses),
+            'bytes_sent': self.bytes_sent,
+            'peak_in_flight': self.peak_in_flight,
+            'connections': self.connections,
+        }
+
+    def _prepare(self) -> None:
+        """Serializes every payload with this server's base URL."""
+        def dump(obj) -> str:
+            return json.dumps(obj).replace(URL_PLACEHOLDER, self.base_url)
+
+        for endpoint, resources in self._payloads.items():
+            if endpoint == 'encounters':
+                for entry in resources:
+                    self._encounters[str(entry['id'])] = dump(
+                        entry['encounters']
+                    )
+                continue
+            by_key = {}
+            listing = []
+            for data in sorted(resources, key=lambda d: d.get('id') or 0):
+                text = dump(data)
+                url = f'{self.base_url}{endpoint}/{data["id"]}/'
+                by_key[str(data['id'])] = text
+                if data.get('name') is not None:
+                    by_key[data['name']] = text
+                    listing.append({'name': data['name'], 'url': url})
+                else:
+                    listing.append({'url': url})
+            self._resources[endpoint] = by_key
+            self._listings[endpoint] = listing
+
+    async def _respond(self, request: web.Request, text: str) -> web.Response:
+        if self.latency or self.jitter:
+            delay = self.latency + self._rng.uniform(-self.jitter, self.jitter)
+            await asyncio.sleep(max(delay, 0.0))
+        roll = self._rng.random()
+        if roll < self.rate_limit_rate:
+            return web.Response(
+                status=429, text='Too Many Requests',
+                headers={'Retry-After': str(self.retry_after)}
+            )
+        if roll < self.rate_limit_rate + self.error_rate:
+            return web.Response(status=500, text='Internal Server Error')
+        self.bytes_sent += len(text)
+        return web.Response(text=text, content_type='application/json')
+
+    @web.middleware
+    async def _track(self, request: web.Request, handler) -> web.Response:
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        self._connections.add(id(request.transport))
+        try:
+            response = await handler(request)
+        except web.HTTPException as e:
+            response = e
+        finally:
+            self.in_flight -= 1
+        self.statuses[response.status] = (
+            self.statuses.get(response.status, 0) + 1
+        )
+        return response
+
+    async def _list_endpoint(self, request: web.Request) -> web.Response:
+        endpoint = request.match_info['endpoint']
+        if endpoint not in cmn.VALID_ENDPOINTS:
+            raise web.HTTPNotFound()
+        # Like PokéAPI, every valid endpoint has a listing, even if empty
+        listing = self._listings.get(endpoint, [])
+        offset = int(request.query.get('offset', 0))
+        limit = int(request.query.get('limit', 20))
+        body = {
+            'count': len(listing),
+            'next': None,
+            'previous': None,
+            'results': listing[offset:offset + limit]
+        }
+        return await self._respond(request, json.dumps(body))
+
+    async def _get_resource(self, request: web.Request) -> web.Response:
+        endpoint = request.match_info['endpoint']
+        resource = request.match_info['resource']
+        text = self._resources.get(endpoint, {}).get(resource)
+        if text is None:
+            raise web.HTTPNotFound()
+        return await self._respond(request, text)
+
+    async def _get_encounters(self, request: web.Request) -> web.Response:
+        text = self._encounters.get(request.match_info['resource'], '[]')
+        return await self._respond(request, text)
+
+    def make_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._track])
+        app.router.add_get('/api/v2/{endpoint}', self._list_endpoint)
+        app.router.add_get('/api/v2/{endpoint}/', self._list_endpoint)
+        app.router.add_get(
+            '/api/v2/pokemon/{resource}/encounters', self._get_encounters
+        )
+        app.router.add_get('/api/v2/{endpoint}/{resource}', self._get_resource)
+        app.router.add_get(
+            '/api/v2/{endpoint}/{resource}/', self._get_resource
+        )
+        return app
+
+    async def start(self) -> None:
+        self._runner = web.AppRunner(self.make_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        # If port 0 was given, the OS picked a free port for us
+        self.port = self._runner.addresses[0][1]
+        self._prepare()
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> 'MockPokeAPIServer':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+
+if __name__ == '__main__':
+    async def serve_forever():
+        async with MockPokeAPIServer(port=8080, latency=0.02) as server:
+            print(f'Serving synthetic PokéAPI at {server.base_url}')
+            while True:
+                await asyncio.sleep(3600)
+
+    asyncio.run(serve_forever())